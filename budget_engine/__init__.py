@@ -0,0 +1,85 @@
+"""SimBud 예산 계산 엔진 (스트림릿 없이 동작하는 계산 모듈)
+
+스트림릿, pandas, openpyxl 을 불러오지 않으므로 스크립트, 배치 작업, 작업 프로세스에서
+그대로 import 할 수 있습니다. 명령줄 사용법은 python -m budget_engine --help 를 보세요.
+"""
+from .api import (
+    DEFAULT_OPTIONS,
+    BudgetItem,
+    BudgetSolution,
+    BudgetSweep,
+    SweepPoint,
+    item_plan_count,
+    preflight,
+    solve,
+    sweep_budgets,
+    validate_problem,
+)
+from .cache import ResultCache, problem_fingerprint
+from .closed_form import solve_closed_form
+from .dense_dp import (
+    build_count_tables,
+    closest_reachable,
+    count_exact_plans,
+    count_states,
+    iter_solution_batches,
+    reconstruct_solutions,
+)
+from .distribution import QuantityDistribution, quantity_distributions
+from .duplicates import (
+    PriceGroups,
+    count_item_plans,
+    describe_grouping,
+    describe_item_count,
+    expand_group_quantities,
+    group_by_price,
+    group_quantities,
+    has_merged_items,
+)
+from .export import (
+    EXCEL_MAX_ROWS,
+    arrow_available,
+    plan_column_names,
+    plan_schema,
+    write_result_arrow,
+    write_result_csv_gz,
+    write_result_excel,
+    write_result_parquet,
+    write_sweep_csv,
+)
+from .feasibility import Feasibility, reachable_spends
+from .files import collect_problem_files, parse_problem_rows, read_problem_file, write_solution_csv
+from .matrix import SolutionMatrix, plan_totals, quantity_dtype
+from .memo_dp import solve_memo_dp
+from .mitm import prefer_meet_in_the_middle, solve_meet_in_the_middle
+from .normalize import describe_reduction, normalize_by_gcd
+from .odometer import array_odometer_search, odometer_search, parallel_odometer_search
+from .planner import (
+    ENGINE_CLOSED_FORM,
+    ENGINE_DENSE_DP,
+    ENGINE_MEMO_DP,
+    ENGINE_MITM,
+    ENGINE_ODOMETER,
+    EnginePlan,
+    choose_plan,
+    describe_plan,
+    estimate_plans,
+    odometer_cases,
+    plan_purchase,
+)
+from .progress import BackgroundSolve, SolveCancelled, SolveProgress
+from .ranking import (
+    RANK_EVEN,
+    RANK_FEWEST_ITEMS,
+    RANK_PREFERRED,
+    RANKING_OBJECTIVES,
+    Ranking,
+    top_k_from_batches,
+    top_k_plans,
+)
+from .sampling import Sampling, reservoir_sample, sample_plans
+from .solver import SolveResult, approx_result_bytes, solve_normalized
+from .stats import SolveStats, append_stats_log
+from .stream import SolutionStream
+from .unranking import PlanIndex, plan_ranks, unrank_plans
+from .viewer import PlanTable
@@ -0,0 +1,56 @@
+"""예산 문제 파일을 한꺼번에 푸는 명령줄 도구
+
+    python -m budget_engine 부서별예산/ 추가.xlsx -o 결과 --time-limit 60
+
+파일(.xlsx, .csv)이나 폴더를 여러 개 줄 수 있습니다. 파일마다 '<이름>_결과.csv'를,
+출력 폴더에 전체 요약 '요약.csv'를 씁니다. 하나라도 실패하면 종료 코드는 1입니다.
+"""
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from .api import solve
+from .cache import ResultCache
+from .files import collect_problem_files, read_problem_file, write_solution_csv
+
+SUMMARY_HEADER = ['파일', '예산', '물품 수', '계산 방법', '정확히 맞춤', '계획 수', '사용 금액', '잔액',
+                  '계산 시간(초)', '오류']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m budget_engine', description='예산 문제 파일을 한꺼번에 풉니다.')
+    parser.add_argument('paths', nargs='+', help='문제 파일(.xlsx, .csv) 또는 폴더')
+    parser.add_argument('-o', '--output', default='.', help='결과를 쓸 폴더 (기본: 현재 폴더)')
+    parser.add_argument('--time-limit', type=float, default=20, help='문제 하나의 제한 시간(초, 기본 20)')
+    parser.add_argument('--max-rows', type=int, default=None, help='파일마다 쓸 최대 계획 수 (기본: 전부)')
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    # 부서별 파일에 같은 문제가 반복되면 한 번만 풉니다.
+    cache = ResultCache()
+    summary, failed = [], 0
+    for path in collect_problem_files(args.paths):
+        try:
+            budget, items = read_problem_file(path)
+            solution = solve(budget, items, {'time_limit': args.time_limit, 'cache': cache})
+            written = write_solution_csv(output / f'{path.stem}_결과.csv', solution, args.max_rows)
+            summary.append([path.name, budget, len(items), solution.engine, solution.exact, solution.case_count,
+                            solution.best_total, solution.leftover, f'{solution.elapsed:.3f}', ''])
+            print(f'{path.name}: {solution.case_count:,d}개 계획 중 {written:,d}개 저장 '
+                  f'(잔액 {solution.leftover:,d}원, {solution.engine}, {solution.elapsed:.2f}초)')
+        except Exception as e:
+            failed += 1
+            summary.append([path.name, '', '', '', '', '', '', '', '', str(e)])
+            print(f'{path.name}: 실패 - {e}', file=sys.stderr)
+
+    with open(output / '요약.csv', 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(summary)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,434 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .cache import problem_fingerprint
+from .dense_dp import build_count_tables, count_exact_plans, count_states
+from .distribution import distributions_from_batches, expand_group_distributions, quantity_distributions
+from .feasibility import PREFLIGHT_MAX_BITS, Feasibility, closest_spend, reachable_spends
+from .duplicates import (
+    count_item_plans,
+    expand_group_quantities,
+    group_by_price,
+    group_quantities,
+    has_merged_items,
+)
+from .matrix import quantity_dtype
+from .normalize import normalize_by_gcd
+from .planner import DENSE_DP_MAX_CELLS, choose_plan
+from .ranking import Ranking, split_group_plans, top_k_from_batches, top_k_plans
+from .sampling import Sampling, reservoir_sample, sample_plans, sample_ranks
+from .solver import approx_result_bytes, solve_normalized
+from .stats import (
+    PHASE_CLOSEST,
+    PHASE_COUNT,
+    PHASE_DISTRIBUTION,
+    PHASE_PLAN,
+    PHASE_RECONSTRUCT,
+    PHASE_RANK,
+    PHASE_SAMPLE,
+    PHASE_SORT,
+    SolveStats,
+    timed_batches,
+)
+from .stream import SolutionStream
+from .unranking import level_prefix_sums, unrank_plans
+
+# 물품 한 줄 (이름, 단가, 기본 구매량, 최대 구매량)
+BudgetItem = namedtuple('BudgetItem', 'label price base_quantity limited_quantity')
+
+# solve() 결과
+# labels/prices/base_quantity/limited_quantity: 단가 내림차순으로 정렬한 물품 정보,
+# unit: 단가의 최대공약수, budget_residue: 단위로 나누어떨어지지 않는 예산 나머지,
+# plan: 플래너가 고른 엔진과 예상 시간, engine: 실제로 결과를 낸 엔진,
+# exact: 예산을 정확히 맞췄는지, best_total: 계획들이 쓰는 금액(원), leftover: 잔액(원),
+# case_count: 계획 수, state_count: 계산한 상태 수, plans: 구매 계획 스트림(SolutionStream),
+# from_cache: 캐시에서 가져온 결과인지, elapsed: 걸린 시간(초), stats: 단계별 시간과 카운터(SolveStats),
+# groups: 같은 단가끼리 묶은 결과(PriceGroups), case_count 는 묶음 기준 계획 수입니다.
+# distribution: 품목별 수량 분포(QuantityDistribution 목록, 정렬한 품목 순서, options['distribution'] 일 때만)
+# item_case_count: 같은 단가 품목을 나눠 사는 방법까지 센 계획 수 (묶인 품목이 없으면 case_count,
+# 세기에 너무 크면 None) plans 는 묶음마다 앞 품목부터 채운 대표 나눔 하나씩만 담습니다.
+# (순위를 매길 때는 품목별 수량으로 점수를 매겨 고른 나눔)
+BudgetSolution = namedtuple(
+    'BudgetSolution',
+    'labels prices base_quantity limited_quantity unit budget_residue plan engine exact '
+    'best_total leftover case_count state_count plans from_cache elapsed stats groups distribution '
+    'item_case_count',
+    defaults=(None, None))
+
+# sweep_budgets() 결과의 예산 하나
+# budget: 예산(원), exact: 정확히 맞췄는지, case_count: 가장 가까운 금액의 계획 수(묶음 기준),
+# best_total: 계획이 쓰는 금액(원), leftover: 잔액(원),
+# plan: 예시 계획 하나(사전순 첫 계획, 정렬한 품목 순서의 실제 수량 리스트)
+SweepPoint = namedtuple('SweepPoint', 'budget exact case_count best_total leftover plan')
+
+# sweep_budgets() 결과 (labels/prices/base_quantity/limited_quantity 는 solve() 와 같이 정렬한 물품 정보)
+BudgetSweep = namedtuple(
+    'BudgetSweep', 'labels prices base_quantity limited_quantity unit points state_count elapsed stats')
+
+# solve() 의 options 기본값
+# time_limit: 제한 시간(초, None 이면 무제한), progress: SolveProgress,
+# cache: ResultCache, engines: 고를 수 있는 엔진 이름들(None 이면 전부),
+# stats: 기록할 SolveStats(None 이면 새로 만듦),
+# ranking: Ranking(순위 기준, k, 선호 품목의 입력 순서 번호)을 주면 점수가 가장 좋은 k 개 계획만 남김,
+# sample: Sampling(계획 수, seed)을 주면 계획을 고르게 무작위로 그만큼만 뽑음 (ranking 과 함께 못 씀),
+# distribution: True 이면 전체 계획의 품목별·수량별 계획 수를 함께 구함,
+# level_cache: DP 단계 테이블을 담아 둘 ResultCache (품목 하나만 고쳐 다시 풀 때 바뀐 단계만 새로 쌓음)
+DEFAULT_OPTIONS = {'time_limit': 20, 'progress': None, 'cache': None, 'engines': None, 'stats': None,
+                   'ranking': None, 'sample': None, 'distribution': False, 'level_cache': None}
+
+# 같은 단가 품목을 나눠 사는 방법까지 셀 때 품목 단위로 셀 최대 칸 수(품목 수 × 금액)와,
+# 그보다 크면 묶음 계획을 하나씩 훑어 셀 최대 계획 수
+ITEM_COUNT_MAX_CELLS = 20_000_000
+ITEM_COUNT_MAX_PLANS = 1_000_000
+
+
+def validate_problem(budget, items):
+    """계산할 수 없는 입력이면 ValueError (화면의 입력 검사와 같은 기준)"""
+    if budget <= 0:
+        raise ValueError('예산을 정확히 입력하세요.(*0보다 큰 자연수)')
+    if not items:
+        raise ValueError('물품을 하나 이상 입력하세요.')
+    for item in items:
+        if item.price <= 0:
+            raise ValueError(f'{item.label} 단가가 0보다 작거나 같습니다.')
+        if not 0 <= item.base_quantity <= item.limited_quantity:
+            raise ValueError(f'{item.label} 기본 구매량이 0보다 작거나 최대 구매량보다 많습니다.')
+    fixed_budget = sum(item.price * item.base_quantity for item in items)
+    if fixed_budget > budget:
+        raise ValueError(f'최소구매금액({fixed_budget:,d}원)이 예산({budget:,d}원)보다 많아 예산 내에서 쓸 수 없습니다.')
+
+
+def sort_items(items):
+    """물품을 단가 내림차순으로 정렬하고 같은 단가끼리 묶음 (정렬 순서, 정렬한 물품, PriceGroups)"""
+    order = sorted(range(len(items)), reverse=True,
+                   key=lambda idx: (items[idx].price, items[idx].label, items[idx].base_quantity,
+                                    items[idx].limited_quantity))
+    items = [items[idx] for idx in order]
+    # 같은 단가의 품목은 기본·최대 구매량을 더한 묶음 하나로 풀어 탐색 차원을 줄입니다.
+    groups = group_by_price([item.price for item in items], [item.base_quantity for item in items],
+                            [item.limited_quantity for item in items])
+    return order, items, groups
+
+
+def rank_plans(ranking, order, groups, unit_prices, limits, solve_result, base_quantity, limited_quantity,
+               dtype, start_time, time_limit, stats, level_cache=None):
+    """사용 금액이 가장 좋은 계획들 중 순위 기준 점수가 가장 좋은 k 개만 담은 스트림
+
+    점수는 품목별 실제 수량으로 매깁니다. 카운트 테이블을 만들 수 있으면 가지치기하며 내려가고,
+    너무 크면 엔진이 나열한 계획을 훑으며 k 개만 남깁니다. 같은 단가로 묶인 품목이 있으면
+    묶음을 풀어 품목 단위 테이블로 내려가고, 테이블이 너무 크면 묶음마다 순위 기준에
+    가장 유리하게 나눈 계획으로 점수를 매깁니다.
+    """
+    if ranking.preferred is not None:
+        # 입력 순서의 품목 번호를 정렬 후 번호로 바꿉니다. (묶인 품목이 없으면 묶음 번호와 같음)
+        ranking = ranking._replace(preferred=order.index(ranking.preferred))
+    target = solve_result.best_spend
+    if len(groups.prices) != len(base_quantity):
+        return rank_item_plans(ranking, groups, unit_prices, solve_result, base_quantity, limited_quantity,
+                               dtype, start_time, time_limit, stats, level_cache)
+    with stats.phase(PHASE_RANK):
+        if solve_result.index is not None:
+            # DP 엔진이 만든 테이블은 예산 이하의 모든 금액을 세므로 그대로 씁니다.
+            ranked, _ = top_k_plans(solve_result.index.tables, unit_prices, limits, target, groups.base_quantity,
+                                    ranking, start_time, time_limit, stats)
+        elif len(unit_prices) * (target + 1) <= DENSE_DP_MAX_CELLS:
+            tables = build_count_tables(unit_prices, limits, target, start_time, time_limit, None, level_cache)
+            ranked, _ = top_k_plans(tables, unit_prices, limits, target, groups.base_quantity, ranking,
+                                    start_time, time_limit, stats)
+        else:
+            group_plans = SolutionStream(solve_result.batch_factory, solve_result.case_count, groups.base_quantity)
+            ranked, _ = top_k_from_batches(group_plans.batches(), len(unit_prices), ranking, start_time, time_limit)
+    return group_plans_stream(ranked, groups, base_quantity, limited_quantity, dtype)
+
+
+def rank_item_plans(ranking, groups, unit_prices, solve_result, base_quantity, limited_quantity,
+                    dtype, start_time, time_limit, stats, level_cache=None):
+    """같은 단가 품목이 묶여 있을 때 품목별 수량으로 점수를 매겨 k 개를 고름 (rank_plans 에서 부름)"""
+    target = solve_result.best_spend
+    item_prices, item_limits = ungrouped_problem(unit_prices, groups, base_quantity, limited_quantity)
+    with stats.phase(PHASE_RANK):
+        if len(item_prices) * (target + 1) <= DENSE_DP_MAX_CELLS:
+            tables = build_count_tables(item_prices, item_limits, target, start_time, time_limit, None, level_cache)
+            ranked, _ = top_k_plans(tables, item_prices, item_limits, target, base_quantity, ranking,
+                                    start_time, time_limit, stats)
+        else:
+            group_plans = SolutionStream(solve_result.batch_factory, solve_result.case_count, groups.base_quantity)
+            item_batches = (split_group_plans(batch, groups, base_quantity, limited_quantity, ranking)
+                            for batch in group_plans.batches())
+            ranked, _ = top_k_from_batches(item_batches, len(item_prices), ranking, start_time, time_limit)
+    return SolutionStream(lambda: iter([ranked]), len(ranked), [0] * len(base_quantity), dtype)
+
+
+def ungrouped_problem(unit_prices, groups, base_quantity, limited_quantity):
+    """묶음을 푼 품목별 (단위 단가, 추가 구매 가능 수량)
+
+    묶음은 정렬된 품목을 이어 붙인 것이므로 품목 순서대로 묶음 단가를 펼치면 품목별 단가입니다.
+    """
+    item_prices = [price for price, members in zip(unit_prices, groups.members) for _ in members]
+    item_limits = [limit - base for limit, base in zip(limited_quantity, base_quantity)]
+    return item_prices, item_limits
+
+
+def item_plan_count(groups, unit_prices, base_quantity, limited_quantity, solve_result):
+    """같은 단가 품목을 나눠 사는 방법까지 센 계획 수 (묶인 품목이 없으면 case_count, 너무 크면 None)
+
+    테이블 한 단계 크기의 배열로 품목 단위 방법 수를 세거나, 계획이 적으면 묶음 계획마다
+    나누는 방법 수를 곱해 더합니다.
+    """
+    if len(groups.prices) == len(base_quantity):
+        return solve_result.case_count
+    target = solve_result.best_spend
+    item_prices, item_limits = ungrouped_problem(unit_prices, groups, base_quantity, limited_quantity)
+    if len(item_prices) * (target + 1) <= ITEM_COUNT_MAX_CELLS:
+        return count_exact_plans(item_prices, item_limits, target)
+    if solve_result.case_count <= ITEM_COUNT_MAX_PLANS:
+        return count_item_plans(solve_result.batch_factory(), groups, base_quantity, limited_quantity)
+    return None
+
+
+def sample_group_plans(sampling, groups, unit_prices, limits, solve_result, base_quantity, limited_quantity,
+                       dtype, start_time, time_limit, stats, level_cache=None):
+    """사용 금액이 가장 좋은 계획들 중 고르게 무작위로 뽑은 계획들을 담은 스트림
+
+    카운트 테이블을 만들 수 있으면 번호를 뽑아 바로 복원하고(나열하지 않음), 너무 크면
+    엔진이 나열한 계획에서 저수지 표본 추출로 뽑습니다. 표본은 묶음(같은 단가) 단위로 고릅니다.
+    """
+    target = solve_result.best_spend
+    with stats.phase(PHASE_SAMPLE):
+        if solve_result.index is not None:
+            # DP 엔진의 색인으로 바로 복원합니다. (단가 간격 누적합도 화면의 번호 보기와 함께 씀)
+            picked = solve_result.index.plans(sample_ranks(solve_result.index.count, sampling.size, sampling.seed))
+            picked += np.asarray(groups.base_quantity, dtype=np.int64)
+        elif len(unit_prices) * (target + 1) <= DENSE_DP_MAX_CELLS:
+            tables = build_count_tables(unit_prices, limits, target, start_time, time_limit, None, level_cache)
+            picked = sample_plans(tables, unit_prices, limits, target, sampling.size, sampling.seed)
+            picked += np.asarray(groups.base_quantity, dtype=np.int64)
+        else:
+            group_plans = SolutionStream(solve_result.batch_factory, solve_result.case_count, groups.base_quantity)
+            picked = reservoir_sample(group_plans.batches(), len(unit_prices), sampling.size, sampling.seed)
+    return group_plans_stream(picked, groups, base_quantity, limited_quantity, dtype)
+
+
+def plan_distributions(groups, unit_prices, limits, solve_result, base_quantity, limited_quantity,
+                       start_time, time_limit, stats, level_cache=None):
+    """사용 금액이 가장 좋은 계획 전체의 품목별 실제 수량 분포
+
+    DP 엔진의 카운트 테이블이 있거나 새로 만들 수 있으면 계획을 나열하지 않고 세고,
+    너무 크면 엔진이 나열한 계획을 훑으며 셉니다. 계획 수는 묶음(같은 단가) 기준입니다.
+    """
+    target = solve_result.best_spend
+    with stats.phase(PHASE_DISTRIBUTION):
+        if solve_result.index is not None:
+            distributions = quantity_distributions(solve_result.index.tables, unit_prices, limits, target)
+        elif len(unit_prices) * (target + 1) <= DENSE_DP_MAX_CELLS:
+            tables = build_count_tables(unit_prices, limits, target, start_time, time_limit, None, level_cache)
+            distributions = quantity_distributions(tables, unit_prices, limits, target)
+        else:
+            distributions = distributions_from_batches(solve_result.batch_factory(), limits)
+    return expand_group_distributions(distributions, groups, base_quantity, limited_quantity)
+
+
+def group_plans_stream(plans, groups, base_quantity, limited_quantity, dtype):
+    """묶음 단위 계획(실제 수량) 행렬을 품목별로 나눠 한 배치짜리 스트림으로 감쌈"""
+    if len(groups.prices) != len(base_quantity):
+        plans = expand_group_quantities(plans, groups, base_quantity, limited_quantity)
+    return SolutionStream(lambda: iter([plans]), len(plans), [0] * len(base_quantity), dtype)
+
+
+def solve(budget, items, options=None):
+    """예산과 물품 목록으로 예산에 맞는(없으면 가장 가까운) 구매 계획을 구함
+
+    스트림릿 없이 쓰는 진입점입니다. items 는 BudgetItem 또는
+    (이름, 단가, 기본 구매량, 최대 구매량) 튜플의 목록이고, options 는 DEFAULT_OPTIONS 의
+    키를 가진 딕셔너리입니다. 시간 초과는 TimeoutError, 취소는 SolveCancelled,
+    잘못된 입력은 ValueError 로 알립니다.
+    단가가 같은 품목들은 하나의 묶음으로 합쳐 풀고, 계획을 꺼낼 때 품목별 수량으로 나눕니다.
+    options['ranking'] 을 주면 plans 에는 순위 기준으로 가장 좋은 k 개만 좋은 순서로,
+    options['sample'] 을 주면 고르게 무작위로 뽑은 계획만 사전순으로 담깁니다.
+    (case_count 는 그대로 전체 계획 수, distribution 도 전체 계획 기준)
+    DP 엔진으로 푼 결과는 plans.slice(begin, end), plans.rank(계획)로 원하는 번호의 계획을
+    나열하지 않고 바로 꺼내거나 계획의 번호를 되찾을 수 있습니다. (plans.random_access)
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    progress, cache = options['progress'], options['cache']
+    stats = options['stats'] if options['stats'] is not None else SolveStats()
+    start_time = progress.start_time if progress is not None else time.time()
+    items = [BudgetItem(str(label), int(price), int(base), int(limit)) for label, price, base, limit in items]
+    validate_problem(budget, items)
+    ranking = Ranking(*options['ranking']) if options['ranking'] is not None else None
+    sampling = Sampling(*options['sample']) if options['sample'] is not None else None
+    if ranking is not None and sampling is not None:
+        raise ValueError('순위 매기기와 무작위 표본은 함께 쓸 수 없습니다.')
+
+    with stats.phase(PHASE_SORT):
+        # 단가 내림차순으로 정렬하고, 단가의 최대공약수로 단가와 예산을 나눠 탐색 공간을 줄입니다.
+        order, items, groups = sort_items(items)
+        prices = [item.price for item in items]
+        base_quantity = [item.base_quantity for item in items]
+        limited_quantity = [item.limited_quantity for item in items]
+        unit, unit_prices, _, budget_residue = normalize_by_gcd(groups.prices, budget)
+        fixed_budget = sum(price * base for price, base in zip(prices, base_quantity))
+        remaining_budget = budget - fixed_budget
+        # 남은 예산을 단위로 바꿉니다. (나머지는 어떤 조합으로도 쓸 수 없는 금액)
+        unit_budget = remaining_budget // unit
+        limits = [limit - base for limit, base in zip(groups.limited_quantity, groups.base_quantity)]
+
+    with stats.phase(PHASE_PLAN):
+        # 품목 수, 수량 범위, 예산 크기로 엔진별 예상 시간을 따져 가장 빠른 엔진을 고릅니다.
+        plan = choose_plan(unit_prices, limits, unit_budget, options['engines'])
+    # 같은 문제(정규화 후)를 이미 푼 적이 있으면 캐시의 결과를 그대로 씁니다.
+    cache_key = problem_fingerprint(unit_prices, limits, unit_budget, budget_residue, plan.engine)
+    solve_result = cache.get(cache_key) if cache is not None else None
+    from_cache = solve_result is not None
+    if not from_cache:
+        solve_result = solve_normalized(unit_prices, limits, unit_budget, budget_residue == 0,
+                                        start_time, options['time_limit'], progress, plan, stats,
+                                        options['level_cache'])
+        if cache is not None:
+            cache.put(cache_key, solve_result, approx_result_bytes(solve_result, len(groups.prices)))
+            if solve_result.index is not None:
+                # 나중에 번호로 계획을 꺼내며 누적합이 붙으면 캐시 용량을 다시 잽니다.
+                solve_result.index.on_grow = lambda: cache.resize(
+                    cache_key, approx_result_bytes(solve_result, len(groups.prices)))
+
+    best_total = fixed_budget + solve_result.best_spend * unit
+    stats.info.update(budget=budget, item_count=len(items), group_count=len(groups.prices),
+                      engine=solve_result.solver_name,
+                      predicted_seconds=round(plan.seconds, 6), exact=solve_result.exact,
+                      case_count=solve_result.case_count, from_cache=from_cache)
+    # 구매 계획은 미리 모으지 않고, 필요할 때 배치 단위로 꺼내 씁니다.
+    # 꺼내는 데 걸린 시간은 '계획 복원' 단계로 기록됩니다.
+    # head()로 모으는 계획 행렬은 최대 구매량이 들어가는 가장 작은 정수 타입으로 담습니다.
+    dtype = quantity_dtype(max(limited_quantity))
+    group_batches = timed_batches(solve_result.batch_factory, stats)
+    index = solve_result.index
+    if len(groups.prices) == len(items):
+        # 묶인 품목이 없으면 기본 구매량만 배치마다 더합니다.
+        # DP 엔진이면 계획을 사전순 번호로 바로 꺼내고 계획에서 번호를 되찾을 수 있습니다.
+        plans = SolutionStream(group_batches, solve_result.case_count, base_quantity, dtype,
+                               index.between if index is not None else None,
+                               index.ranks if index is not None else None)
+    else:
+        group_offset = SolutionStream(group_batches, solve_result.case_count, groups.base_quantity)
+
+        def item_batches():
+            # 꺼내는 배치(화면에 올릴 행, 엑셀에 쓸 행)만 그때그때 품목별 수량으로 나눕니다.
+            for batch in group_offset.batches():
+                yield expand_group_quantities(batch, groups, base_quantity, limited_quantity)
+
+        slice_factory, rank_function = None, None
+        if index is not None:
+            group_base = np.asarray(groups.base_quantity, dtype=np.int64)
+
+            def slice_factory(begin, end):
+                return expand_group_quantities(index.between(begin, end) + group_base, groups,
+                                               base_quantity, limited_quantity)
+
+            def rank_function(item_plans):
+                # 묶음 안에서 어떻게 나눠 샀든 묶음별 합이 같으면 같은 번호입니다.
+                return index.ranks(group_quantities(item_plans, groups) - group_base)
+
+        plans = SolutionStream(item_batches, solve_result.case_count, [0] * len(items), dtype,
+                               slice_factory, rank_function)
+    if ranking is not None:
+        plans = rank_plans(ranking, order, groups, unit_prices, limits, solve_result,
+                           base_quantity, limited_quantity, dtype, start_time, options['time_limit'], stats,
+                           options['level_cache'])
+    elif sampling is not None:
+        plans = sample_group_plans(sampling, groups, unit_prices, limits, solve_result,
+                                   base_quantity, limited_quantity, dtype, start_time, options['time_limit'], stats,
+                                   options['level_cache'])
+    distribution = None
+    if options['distribution']:
+        distribution = plan_distributions(groups, unit_prices, limits, solve_result, base_quantity,
+                                          limited_quantity, start_time, options['time_limit'], stats,
+                                          options['level_cache'])
+    return BudgetSolution(
+        [item.label for item in items], prices, base_quantity, limited_quantity, unit, budget_residue, plan,
+        solve_result.solver_name, solve_result.exact, best_total, budget - best_total,
+        solve_result.case_count, solve_result.state_count, plans, from_cache, time.time() - start_time, stats,
+        groups, distribution,
+        item_plan_count(groups, unit_prices, base_quantity, limited_quantity, solve_result))
+
+
+def sweep_budgets(budgets, items, options=None):
+    """여러 예산을 카운트 테이블 한 번으로 한꺼번에 풂 (예산을 바꿔 가며 비교할 때)
+
+    가장 큰 예산까지 테이블을 쌓으면 그보다 작은 예산의 방법 수도 같은 테이블에 있으므로,
+    예산마다 정확한 계획 수, 가장 가까운 금액, 예시 계획 하나를 읽기만 합니다.
+    options 는 solve() 와 같은 딕셔너리이며 time_limit, progress, stats, level_cache 만 씁니다.
+    테이블이 너무 커서 한 번에 쌓을 수 없으면 ValueError 로 알립니다.
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    progress = options['progress']
+    stats = options['stats'] if options['stats'] is not None else SolveStats()
+    start_time = progress.start_time if progress is not None else time.time()
+    items = [BudgetItem(str(label), int(price), int(base), int(limit)) for label, price, base, limit in items]
+    budgets = sorted({int(budget) for budget in budgets})
+    if not budgets:
+        raise ValueError('예산을 하나 이상 입력하세요.')
+    # 가장 작은 예산으로 검사하면 나머지 예산도 모두 통과합니다.
+    validate_problem(budgets[0], items)
+
+    with stats.phase(PHASE_SORT):
+        _, items, groups = sort_items(items)
+        prices = [item.price for item in items]
+        base_quantity = [item.base_quantity for item in items]
+        limited_quantity = [item.limited_quantity for item in items]
+        unit, unit_prices, _, _ = normalize_by_gcd(groups.prices, budgets[-1])
+        fixed_budget = sum(price * base for price, base in zip(prices, base_quantity))
+        limits = [limit - base for limit, base in zip(groups.limited_quantity, groups.base_quantity)]
+        max_unit_budget = (budgets[-1] - fixed_budget) // unit
+    if len(unit_prices) * (max_unit_budget + 1) > DENSE_DP_MAX_CELLS:
+        raise ValueError(f'예산 범위가 너무 커서 한 번에 계산할 수 없습니다.(최대 예산 {budgets[-1]:,d}원)')
+
+    with stats.phase(PHASE_COUNT):
+        tables = build_count_tables(unit_prices, limits, max_unit_budget, start_time, options['time_limit'],
+                                    progress, options['level_cache'], stats)
+    with stats.phase(PHASE_CLOSEST):
+        # closest[r]: r 이하로 정확히 만들 수 있는 가장 큰 금액 (0원은 항상 가능)
+        reachable = np.asarray(tables[0] > 0, dtype=bool)
+        closest = np.maximum.accumulate(np.where(reachable, np.arange(len(reachable)), 0))
+    group_base = np.asarray(groups.base_quantity, dtype=np.int64)
+    merged = has_merged_items(groups)
+    points = []
+    with stats.phase(PHASE_RECONSTRUCT):
+        prefix_sums = level_prefix_sums(tables, unit_prices)
+        for budget in budgets:
+            unit_budget, residue = divmod(budget - fixed_budget, unit)
+            best_spend = int(closest[unit_budget])
+            plan = unrank_plans(tables, prefix_sums, unit_prices, limits, best_spend, [0]) + group_base
+            if merged:
+                plan = expand_group_quantities(plan, groups, base_quantity, limited_quantity)
+            best_total = fixed_budget + best_spend * unit
+            points.append(SweepPoint(budget, residue == 0 and best_spend == unit_budget,
+                                     int(tables[0][best_spend]), best_total, budget - best_total,
+                                     plan[0].tolist()))
+    stats.info.update(budget=budgets[-1], item_count=len(items), group_count=len(groups.prices),
+                      engine='예산 범위', sweep_count=len(budgets))
+    return BudgetSweep([item.label for item in items], prices, base_quantity, limited_quantity, unit, points,
+                       count_states(tables), time.time() - start_time, stats)
+
+
+def preflight(budget, items):
+    """계산하기 전에 예산을 정확히 맞출 수 있는지, 아니면 얼마나 가까이 갈 수 있는지 바로 알려 줌
+
+    계획 수는 세지 않고 만들 수 있는 금액만 큰 정수 비트셋으로 훑으므로 보통 몇 밀리초면 끝나고,
+    같은 입력은 캐시에서 꺼냅니다. 결과는 Feasibility 이며, 예산이 너무 커서 건너뛰면 None 입니다.
+    잘못된 입력은 solve() 와 같이 ValueError 로 알립니다.
+    """
+    items = [BudgetItem(str(label), int(price), int(base), int(limit)) for label, price, base, limit in items]
+    validate_problem(budget, items)
+    _, items, groups = sort_items(items)
+    unit, unit_prices, _, _ = normalize_by_gcd(groups.prices, budget)
+    fixed_budget = sum(item.price * item.base_quantity for item in items)
+    unit_budget, residue = divmod(budget - fixed_budget, unit)
+    if unit_budget > PREFLIGHT_MAX_BITS:
+        return None
+    limits = tuple(limit - base for limit, base in zip(groups.limited_quantity, groups.base_quantity))
+    bits = reachable_spends(tuple(unit_prices), limits, unit_budget)
+    best_spend = closest_spend(bits, unit_budget)
+    best_total = fixed_budget + best_spend * unit
+    return Feasibility(residue == 0 and best_spend == unit_budget, best_total, budget - best_total)
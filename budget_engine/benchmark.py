@@ -0,0 +1,319 @@
+"""모든 계산 엔진을 같은 문제, 같은 제한 시간으로 비교하는 벤치마크
+
+    python -m budget_engine.benchmark --seed 7 --count 24 --deadline 5 -o 결과.json
+    python -m budget_engine.benchmark -o 새결과.json --baseline 결과.json
+
+같은 seed 면 같은 문제들이 만들어집니다. 엔진마다 걸린 시간(개수를 세기까지와 계획을 모두
+나열하기까지), 플래너의 예상 시간, 계산한 상태 수, 최대 메모리(tracemalloc), 계획 수를 JSON 으로
+남기고 요약 표를 출력합니다. 플래너는 개수를 세는 시간만 비교하므로, 자동 선택이 가장 빠른 엔진보다
+크게 느린 문제는 그 차이가 어느 단계에서 났는지 따로 풀어 보여 줍니다.
+--baseline 을 주면 기준 결과보다 느려진(또는 새로 실패한) 항목을 찾아 종료 코드 1로 알립니다.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .closed_form import solve_closed_form
+from .dense_dp import check_time
+from .matrix import plan_totals
+from .memo_dp import solve_memo_dp
+from .mitm import MITM_MAX_HALF_STATES, choose_split, solve_meet_in_the_middle
+from .normalize import normalize_by_gcd
+from .odometer import array_odometer_search
+from .planner import (
+    DENSE_DP_MAX_CELLS,
+    ENGINE_CLOSED_FORM,
+    ENGINE_DENSE_DP,
+    ENGINE_MEMO_DP,
+    ENGINE_MITM,
+    ENGINE_ODOMETER,
+    choose_plan,
+    estimate_plans,
+)
+from .solver import solve_dense_dp, solve_normalized, solve_odometer
+
+# 문제 생성 범위
+ITEM_COUNTS = (2, 3, 5, 8, 12)
+PRICE_MAGNITUDES = (100, 10_000, 1_000_000)
+GCD_FACTORS = (1, 10, 1000)
+LIMIT_KINDS = ('작음', '보통', '무제한')
+# 기준 결과보다 이 배수 이상, 이 시간(초) 이상 느려지면 성능 저하로 봅니다.
+REGRESSION_TOLERANCE = 1.5
+REGRESSION_MIN_SECONDS = 0.05
+
+
+def _array_odometer(prices, limits, budget, start_time, time_limit):
+    """core_upgrade.py 의 NumPy 배열 오도미터 결과를 다른 엔진과 같은 형태로 맞춤"""
+    cases_count, cases_exact, cases_close = array_odometer_search(prices, limits, budget, start_time, time_limit)
+    cases = (cases_exact or cases_close).rows
+    spent = plan_totals(cases, prices)
+    best_spend = int(spent.max())
+    cases = cases[spent == best_spend]
+    return best_spend, len(cases), lambda: iter([cases]), cases_count
+
+
+def _auto(prices, limits, budget, start_time, time_limit):
+    result = solve_normalized(prices, limits, budget, True, start_time, time_limit)
+    return result.best_spend, result.case_count, result.batch_factory, result.state_count
+
+
+def _mitm_fits(prices, limits, budget):
+    return len(prices) >= 2 and choose_split(prices, limits, budget)[1] <= MITM_MAX_HALF_STATES
+
+
+# 엔진 이름: (실행 함수, 돌릴 수 있는 문제인지 판단하는 함수)
+# 실행 함수는 (사용 금액, 계획 수, 배치 생성 함수, 계산한 상태 수)를 돌려줍니다.
+ENGINES = {
+    '오도미터(simbud)': (
+        lambda p, l, b, s, t: solve_odometer(p, l, b, s, t), lambda p, l, b: len(p) >= 2),
+    '배열 오도미터(core_upgrade)': (_array_odometer, lambda p, l, b: len(p) >= 2),
+    '메모 DP': (solve_memo_dp, lambda p, l, b: True),
+    'DP': (solve_dense_dp, lambda p, l, b: len(p) * (b + 1) <= DENSE_DP_MAX_CELLS),
+    '반반 맞추기': (solve_meet_in_the_middle, _mitm_fits),
+    '두 품목 공식': (lambda p, l, b, s, t: solve_closed_form(p, l, b), lambda p, l, b: len(p) <= 2),
+    '자동 선택': (_auto, lambda p, l, b: True),
+}
+
+
+# 벤치마크 엔진 이름: 플래너가 예상 시간을 매기는 엔진 이름 (배열 오도미터는 플래너가 고르지 않음)
+PLANNER_ENGINES = {
+    '오도미터(simbud)': ENGINE_ODOMETER,
+    '메모 DP': ENGINE_MEMO_DP,
+    'DP': ENGINE_DENSE_DP,
+    '반반 맞추기': ENGINE_MITM,
+    '두 품목 공식': ENGINE_CLOSED_FORM,
+}
+AUTO_ENGINE = '자동 선택'
+
+
+def generate_instances(seed, count):
+    """seed 로 재현되는 문제 count 개 (품목 수, 단가 크기, 공약수 구조, 구매 제한, 정답 유무를 섞음)"""
+    rng = random.Random(seed)
+    instances = []
+    for idx in range(count):
+        item_count = rng.choice(ITEM_COUNTS)
+        magnitude = rng.choice(PRICE_MAGNITUDES)
+        factor = rng.choice(GCD_FACTORS)
+        limit_kind = rng.choice(LIMIT_KINDS)
+        feasible = rng.random() < 0.7
+        if not feasible and factor == 1:
+            # 공약수가 있어야 나머지를 붙여 정확히 맞출 수 없는 예산을 만들 수 있습니다.
+            factor = 10
+        # 단가는 공약수의 배수로, 서로 다르게 뽑습니다.
+        low = max(1, magnitude // (10 * factor))
+        high = max(low + item_count, magnitude // factor)
+        prices = sorted((factor * unit for unit in rng.sample(range(low, high + 1), item_count)), reverse=True)
+        if limit_kind == '작음':
+            limits = [rng.randint(1, 3) for _ in prices]
+        elif limit_kind == '보통':
+            limits = [rng.randint(5, 20) for _ in prices]
+        else:
+            limits = [None] * item_count
+        plan = [rng.randint(0, limit if limit is not None else 10) for limit in limits]
+        budget = sum(price * qty for price, qty in zip(prices, plan)) or prices[0]
+        if not feasible:
+            budget += rng.randint(1, factor - 1)
+        limits = [limit if limit is not None else budget // price for price, limit in zip(prices, limits)]
+        name = (f'{idx:02d}-n{item_count}-p{magnitude}-g{factor}-{limit_kind}-'
+                f'{"정답있음" if feasible else "정답없음"}')
+        instances.append({'name': name, 'prices': prices, 'limits': limits, 'budget': budget})
+    return instances
+
+
+def run_engine(solve_func, instance, deadline, trace_memory=False):
+    """엔진 하나로 문제 하나를 풀고 계획을 모두 꺼낼 때까지 잼 (정규화 후, 제한 시간 deadline 초)"""
+    unit, prices, budget, _ = normalize_by_gcd(instance['prices'], instance['budget'])
+    limits = instance['limits']
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.time()
+    count_seconds = None
+    try:
+        best_spend, case_count, batch_factory, state_count = solve_func(prices, limits, budget, start_time, deadline)
+        count_seconds = time.time() - start_time
+        enumerated = 0
+        for batch in batch_factory():
+            enumerated += len(batch)
+            check_time(start_time, deadline)
+        status = 'ok'
+    except TimeoutError:
+        status, best_spend, case_count, state_count, enumerated = 'timeout', None, None, None, None
+    except MemoryError:
+        status, best_spend, case_count, state_count, enumerated = 'memory', None, None, None, None
+    seconds = time.time() - start_time
+    peak_bytes = None
+    if trace_memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        'status': status, 'seconds': seconds, 'count_seconds': count_seconds, 'states': state_count,
+        'peak_bytes': peak_bytes, 'solutions': enumerated,
+        'best_total': None if best_spend is None else best_spend * unit,
+    }
+
+
+def run_benchmark(instances, engines, deadline, trace_memory=True, log=None):
+    """모든 문제 × 엔진 결과 목록 (시간은 메모리 추적 없이, 메모리는 따로 한 번 더 돌려 잼)"""
+    results = []
+    for instance in instances:
+        _, prices, budget, _ = normalize_by_gcd(instance['prices'], instance['budget'])
+        predicted = {plan.engine: plan.seconds for plan in estimate_plans(prices, instance['limits'], budget)}
+        chosen = choose_plan(prices, instance['limits'], budget).engine
+        for engine in engines:
+            solve_func, applicable = ENGINES[engine]
+            planner_engine = chosen if engine == AUTO_ENGINE else PLANNER_ENGINES.get(engine)
+            if not applicable(prices, instance['limits'], budget):
+                record = {'status': 'skipped', 'seconds': None, 'count_seconds': None, 'states': None,
+                          'peak_bytes': None, 'solutions': None, 'best_total': None}
+            else:
+                record = run_engine(solve_func, instance, deadline)
+                if trace_memory and record['status'] == 'ok':
+                    # tracemalloc 은 파이썬 코드를 느리게 만들므로 시간 측정과 따로 돌립니다.
+                    record['peak_bytes'] = run_engine(solve_func, instance, None, True)['peak_bytes']
+            record.update(instance=instance['name'], engine=engine, predicted_seconds=predicted.get(planner_engine))
+            if engine == AUTO_ENGINE:
+                record['chosen'] = chosen
+            results.append(record)
+            if log is not None:
+                log(record)
+    return results
+
+
+def find_mismatches(results):
+    """같은 문제에서 끝까지 푼 엔진들의 계획 수나 사용 금액이 다른 문제 이름들"""
+    answers = {}
+    for record in results:
+        if record['status'] == 'ok':
+            answers.setdefault(record['instance'], set()).add((record['solutions'], record['best_total']))
+    return sorted(name for name, found in answers.items() if len(found) > 1)
+
+
+def find_regressions(results, baseline, tolerance=REGRESSION_TOLERANCE, min_seconds=REGRESSION_MIN_SECONDS):
+    """기준 결과와 비교해 새로 실패했거나 tolerance 배 넘게 느려진 항목 설명 목록"""
+    previous = {(record['instance'], record['engine']): record for record in baseline['results']}
+    regressions = []
+    for record in results:
+        before = previous.get((record['instance'], record['engine']))
+        if before is None or before['status'] != 'ok':
+            continue
+        if record['status'] != 'ok':
+            regressions.append(f"{record['instance']} / {record['engine']}: {before['status']} -> {record['status']}")
+        elif (record['seconds'] > before['seconds'] * tolerance
+              and record['seconds'] - before['seconds'] > min_seconds):
+            regressions.append(f"{record['instance']} / {record['engine']}: "
+                               f"{before['seconds']:.3f}초 -> {record['seconds']:.3f}초")
+    return regressions
+
+
+def explain_auto_choices(results, tolerance=REGRESSION_TOLERANCE, min_seconds=REGRESSION_MIN_SECONDS):
+    """자동 선택이 가장 빠른 엔진보다 tolerance 배 넘게 느린 문제마다 단계별 시간 설명
+
+    플래너는 개수를 세는 시간만 예상하고, 계획을 나열하는 시간은 계획 수에 비례한다고 보고 빼므로
+    계획 하나를 나열하는 데 드는 시간이 엔진마다 크게 다를 때 이런 차이가 납니다.
+    """
+    by_instance = {}
+    for record in results:
+        if record['status'] == 'ok':
+            by_instance.setdefault(record['instance'], {})[record['engine']] = record
+
+    def phases(name, record):
+        enumerate_seconds = record['seconds'] - record['count_seconds']
+        text = f"{name} 개수 세기 {record['count_seconds']:.3f}초"
+        if record.get('predicted_seconds') is not None:
+            text += f"(예상 {record['predicted_seconds']:.3f}초)"
+        text += f" + 계획 {record['solutions']:,d}개 나열 {enumerate_seconds:.3f}초"
+        if record['solutions']:
+            text += f"(계획당 {enumerate_seconds / record['solutions'] * 1e6:,.1f}µs)"
+        return text
+
+    lines = []
+    for instance, records in by_instance.items():
+        auto = records.get(AUTO_ENGINE)
+        if auto is None:
+            continue
+        fastest_name, fastest = min(((engine, record) for engine, record in records.items() if engine != AUTO_ENGINE),
+                                    key=lambda item: item[1]['seconds'], default=(None, None))
+        if fastest is None or not (auto['seconds'] > fastest['seconds'] * tolerance
+                                   and auto['seconds'] - fastest['seconds'] > min_seconds):
+            continue
+        auto_name = f"자동 선택({auto['chosen']})"
+        lines.append(f'{instance}: {phases(auto_name, auto)} / {phases(fastest_name, fastest)}')
+    return lines
+
+
+def format_summary(results, engines):
+    """문제별(행) 엔진별(열) 걸린 시간 표"""
+    cells = {(record['instance'], record['engine']): record for record in results}
+    names = list(dict.fromkeys(record['instance'] for record in results))
+    name_width = max([len(name) for name in names] + [4])
+    width = max(len(engine) for engine in engines) + 2
+    lines = ['문제'.ljust(name_width) + ''.join(engine.rjust(width) for engine in engines)]
+    for name in names:
+        row = name.ljust(name_width)
+        for engine in engines:
+            record = cells[(name, engine)]
+            text = f"{record['seconds']:.3f}" if record['status'] == 'ok' else record['status']
+            row += text.rjust(width)
+        lines.append(row)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m budget_engine.benchmark', description='계산 엔진 벤치마크')
+    parser.add_argument('--seed', type=int, default=7, help='문제 생성 seed (기본 7)')
+    parser.add_argument('--count', type=int, default=24, help='만들 문제 수 (기본 24)')
+    parser.add_argument('--deadline', type=float, default=5, help='엔진 하나의 제한 시간(초, 기본 5)')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES), help='돌릴 엔진')
+    parser.add_argument('--no-memory', action='store_true', help='최대 메모리 측정을 건너뜀')
+    parser.add_argument('-o', '--output', help='결과 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help=f'이 배수 넘게 느려지면 성능 저하 (기본 {REGRESSION_TOLERANCE})')
+    args = parser.parse_args(argv)
+
+    instances = generate_instances(args.seed, args.count)
+    results = run_benchmark(
+        instances, args.engines, args.deadline, not args.no_memory,
+        log=lambda r: print(f"{r['instance']} / {r['engine']}: {r['status']}", file=sys.stderr))
+    report = {
+        'meta': {'seed': args.seed, 'count': args.count, 'deadline': args.deadline,
+                 'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine()},
+        'instances': instances,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+    print(format_summary(results, args.engines))
+    explanations = explain_auto_choices(results)
+    if explanations:
+        print(f'자동 선택이 가장 빠른 엔진보다 느린 문제 {len(explanations)}건 '
+              '(플래너는 개수 세기 시간만 비교하고 계획 나열 시간은 넣지 않습니다)')
+        for line in explanations:
+            print('  ' + line)
+    exit_code = 0
+    mismatches = find_mismatches(results)
+    if mismatches:
+        print('엔진마다 답이 다른 문제: ' + ', '.join(mismatches))
+        exit_code = 1
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        print(f'기준 결과 대비 성능 저하 {len(regressions)}건')
+        for line in regressions:
+            print('  ' + line)
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
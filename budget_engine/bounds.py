@@ -0,0 +1,28 @@
+import math
+
+
+def suffix_bounds(prices, limits, budget):
+    """idx번째 이후 품목들로 쓸 수 있는 최대 금액과 단가들의 최대공약수 (idx = 0..품목 수)
+
+    기본 구매량을 뺀 문제이므로 뒤 품목들이 쓰는 금액은 0 이상 max_spend[idx] 이하이고
+    항상 gcds[idx] 의 배수입니다. 마지막 자리(품목 수)는 둘 다 0 입니다.
+    """
+    item_count = len(prices)
+    max_spend, gcds = [0] * (item_count + 1), [0] * (item_count + 1)
+    for idx in range(item_count - 1, -1, -1):
+        max_spend[idx] = max_spend[idx + 1] + min(limits[idx], budget // prices[idx]) * prices[idx]
+        gcds[idx] = math.gcd(gcds[idx + 1], prices[idx])
+    return max_spend, gcds
+
+
+def can_finish(max_spend, gcds, idx, remaining):
+    """idx번째 이후 품목들로 remaining 을 정확히 쓸 가능성이 남아 있는지 (최대 금액, 나머지 검사)"""
+    if remaining < 0 or remaining > max_spend[idx]:
+        return False
+    unit = gcds[idx]
+    return remaining % unit == 0 if unit else remaining == 0
+
+
+def fewest_to_finish(max_spend, idx, remaining, price):
+    """idx번째 품목을 최소 몇 개 사야 뒤 품목들의 최대 금액 안으로 remaining 이 들어오는지"""
+    return max(0, -(-(remaining - max_spend[idx + 1]) // price))
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+
+def problem_fingerprint(unit_prices, limits, unit_budget, budget_residue, engine=None):
+    """정규화가 끝난 문제의 정규형 키
+
+    계산 순서(단가 내림차순)로 정렬된 (단가, 추가 구매 가능 수량)을 묶어 두므로
+    물품 순서를 바꾸거나 이름만 다른 표, 모든 금액에 같은 배수를 곱한 표도 같은 키가 됩니다.
+    나머지는 정확한 해가 가능한지 여부만 결과에 영향을 줍니다.
+    engine 에는 결과를 낸 엔진 이름을 넣어, 엔진을 지정한 계산이 다른 엔진의 결과를 받지 않게 합니다.
+    """
+    # 예산으로 살 수 없는 만큼의 구매 제한은 결과에 영향이 없으므로 잘라서 키에 넣습니다.
+    items = tuple((int(price), int(min(limit, unit_budget // price))) for price, limit in zip(unit_prices, limits))
+    return items, int(unit_budget), bool(budget_residue), engine
+
+
+class ResultCache:
+    """프로세스 전체에서 공유하는 계산 결과 캐시 (LRU, 항목 수·용량 제한)
+
+    여러 세션의 스레드가 동시에 쓰므로 잠금으로 보호하고, 적중/미적중 수를 셉니다.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """키에 해당하는 결과 (없으면 None), 꺼낸 항목은 가장 최근 것으로 옮김"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=0):
+        """결과 저장 후 제한을 넘으면 가장 오래 안 쓴 항목부터 버림"""
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._total_bytes += nbytes
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+
+    def resize(self, key, nbytes):
+        """보관 중인 항목의 용량을 다시 재고 제한을 넘으면 오래된 항목부터 버림 (없는 키면 무시)
+
+        결과가 캐시에 담긴 뒤 색인 등을 덧붙여 커졌을 때 부릅니다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self._total_bytes += nbytes - entry[1]
+            self._entries[key] = (entry[0], nbytes)
+            if nbytes > self.max_bytes:
+                del self._entries[key]
+                self._total_bytes -= nbytes
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+
+    def stats(self):
+        """(적중 수, 미적중 수, 보관 항목 수, 보관 용량 바이트)"""
+        with self._lock:
+            return self.hits, self.misses, len(self._entries), self._total_bytes
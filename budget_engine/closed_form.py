@@ -0,0 +1,75 @@
+from math import gcd
+
+import numpy as np
+
+from .dense_dp import SOLUTION_BATCH_SIZE
+
+# 근사치를 찾을 때 한 번에 훑는 첫 품목 수량 개수
+SCAN_CHUNK = 1 << 20
+
+
+def two_item_progression(prices, limits, target):
+    """a*p0 + b*p1 = target 을 만족하는 첫 품목 수량 a 의 등차수열 (첫 값, 마지막 값, 간격)
+
+    해가 없으면 None 입니다. 확장 유클리드 호제법으로 a 의 나머지 조건을 구하고
+    0 <= b <= 구매 제한에서 a 의 범위를 정합니다.
+    """
+    p0, p1 = prices
+    g = gcd(p0, p1)
+    if target % g:
+        return None
+    step = p1 // g
+    # a*p0 ≡ target (mod p1) 의 해: a ≡ (target/g) * (p0/g)^-1 (mod p1/g)
+    residue = (target // g) * pow(p0 // g, -1, step) % step if step > 1 else 0
+    low = max(0, -((limits[1] * p1 - target) // p0))
+    high = min(limits[0], target // p0)
+    first = low + (residue - low) % step
+    if first > high:
+        return None
+    return first, first + (high - first) // step * step, step
+
+
+def closest_two_item_spend(prices, limits, budget):
+    """두 품목으로 예산 이하에서 쓸 수 있는 가장 큰 금액 (첫 품목 수량을 NumPy 로 훑음)"""
+    p0, p1 = prices
+    top = 0
+    count = min(limits[0], budget // p0) + 1
+    for begin in range(0, count, SCAN_CHUNK):
+        qtys = np.arange(begin, min(begin + SCAN_CHUNK, count), dtype=np.int64)
+        spent = qtys * p0
+        spent += np.minimum(limits[1], (budget - spent) // p1) * p1
+        top = max(top, int(spent.max()))
+    return top
+
+
+def solve_closed_form(prices, limits, budget):
+    """품목이 한두 개일 때 수식으로 바로 푸는 엔진
+
+    (사용 금액, 계획 수, 배치 생성 함수, 계산한 상태 수)를 돌려줍니다.
+    """
+    if len(prices) == 1:
+        qty = min(limits[0], budget // prices[0])
+
+        def single_factory():
+            yield np.array([[qty]], dtype=np.int64)
+
+        return qty * prices[0], 1, single_factory, 1
+
+    progression = two_item_progression(prices, limits, budget)
+    state_count = 1
+    best_spend = budget
+    if progression is None:
+        # 정확히 맞출 수 없으면 가장 가까운 금액을 훑어 찾은 뒤 그 금액의 수열을 다시 구합니다.
+        best_spend = closest_two_item_spend(prices, limits, budget)
+        progression = two_item_progression(prices, limits, best_spend)
+        state_count += min(limits[0], budget // prices[0]) + 1
+    first, final, step = progression
+    case_count = (final - first) // step + 1
+
+    def batch_factory():
+        span = SOLUTION_BATCH_SIZE * step
+        for begin in range(first, final + 1, span):
+            qtys = np.arange(begin, min(begin + span, final + 1), step, dtype=np.int64)
+            yield np.column_stack([qtys, (best_spend - qtys * prices[0]) // prices[1]])
+
+    return best_spend, case_count, batch_factory, state_count
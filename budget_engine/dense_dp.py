@@ -0,0 +1,188 @@
+import time
+
+import numpy as np
+
+# 스트림 한 배치에 담는 구매 계획 수
+SOLUTION_BATCH_SIZE = 10_000
+# int64 누적합이 넘치지 않는다고 보장할 수 있는 해의 개수 상한
+INT64_SAFE_BOUND = 2 ** 62
+# 파이썬 정수(object) 테이블에서 칸 하나의 값 객체가 차지하는 대략의 용량
+OBJECT_CELL_BYTES = 40
+
+
+def check_time(start_time, time_limit):
+    """시간 제한 검사 (초과 시 TimeoutError)"""
+    if time_limit is not None and time.time() - start_time > time_limit:
+        raise TimeoutError(f"시간초과: {time_limit}초 경과")
+
+
+def bounded_window_sum(prev, price, limit):
+    """out[r] = prev[r] + prev[r-p] + ... + prev[r-limit*p] (슬라이딩 윈도우 누적합)"""
+    size = len(prev)
+    rows = -(-size // price)
+    # 같은 나머지(r % price)끼리 한 열에 모이도록 (rows, price) 격자로 접습니다.
+    padded = np.zeros(rows * price, dtype=prev.dtype)
+    padded[:size] = prev
+    prefix = np.cumsum(padded.reshape(rows, price), axis=0)
+    window = prefix.copy()
+    if limit + 1 < rows:
+        window[limit + 1:] -= prefix[:rows - limit - 1]
+    return window.reshape(-1)[:size]
+
+
+def strided_prefix_sum(values, price):
+    """out[r] = values[r] + values[r-p] + values[r-2p] + ... (같은 나머지끼리의 누적합)"""
+    size = len(values)
+    rows = -(-size // price)
+    padded = np.zeros(rows * price, dtype=values.dtype)
+    padded[:size] = values
+    return np.cumsum(padded.reshape(rows, price), axis=0).reshape(-1)[:size]
+
+
+def level_key(prices, limits, idx):
+    """idx번째 단계 테이블의 캐시 키 (그 단계가 기대는 idx번째 이후 품목들의 단가와 수량 범위)"""
+    return 'count_level', tuple((int(price), int(limit)) for price, limit in zip(prices[idx:], limits[idx:]))
+
+
+def build_count_tables(prices, limits, budget, start_time=None, time_limit=None, progress=None,
+                       level_cache=None, stats=None):
+    """품목별 해의 개수 테이블을 아래에서부터 쌓아 올림
+
+    tables[idx][r] 은 idx번째 이후 품목만으로 r원을 정확히 쓰는 방법의 수입니다.
+    tables[len(prices)] 는 0원일 때만 1인 기준 테이블입니다.
+    progress(SolveProgress)를 주면 품목 단계마다 진행 상황을 갱신하고 취소 여부를 확인합니다.
+    level_cache(ResultCache)를 주면 뒤쪽 품목들이 그대로인 단계는 앞서 만든 테이블을 잘라 다시 쓰므로,
+    품목 하나를 고치면 그 품목과 앞쪽(더 비싼) 품목의 단계만 새로 쌓습니다. 예산만 줄여도 그대로 씁니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    tables = [None] * (item_count + 1)
+    base = np.zeros(budget + 1, dtype=np.int64)
+    base[0] = 1
+    tables[item_count] = base
+
+    # 아래 단계의 방법 수 총합이 int64를 넘을 수 있으면 파이썬 정수(object)로 계산합니다.
+    bound = 1
+    reusing = level_cache is not None
+    for idx in range(item_count - 1, -1, -1):
+        check_time(start_time, time_limit)
+        if progress is not None:
+            progress.check()
+        prev = tables[idx + 1]
+        bound *= min(limits[idx], budget // prices[idx]) + 1
+        if reusing:
+            # 뒤쪽 단계가 한 번 새로 쌓이면 그 위 단계들은 키가 같아도 쓸 수 없으므로 더 찾지 않습니다.
+            cached = level_cache.get(level_key(prices, limits, idx))
+            reusing = cached is not None and len(cached) > budget
+            if reusing:
+                tables[idx] = cached[:budget + 1]
+                if stats is not None:
+                    stats.count('재사용한 DP 단계')
+                if progress is not None:
+                    progress.fraction = (item_count - idx) / item_count
+                continue
+        if bound >= INT64_SAFE_BOUND and prev.dtype != object:
+            prev = prev.astype(object)
+        tables[idx] = bounded_window_sum(prev, prices[idx], limits[idx])
+        if level_cache is not None:
+            level_cache.put(level_key(prices, limits, idx), tables[idx], level_table_bytes(tables[idx]))
+        if progress is not None:
+            progress.states += budget + 1
+            progress.fraction = (item_count - idx) / item_count
+    return tables
+
+
+def count_exact_plans(prices, limits, budget):
+    """카운트 테이블을 남기지 않고 budget 을 정확히 쓰는 방법 수만 셈 (한 단계 배열만 들고 감)"""
+    counts = np.zeros(budget + 1, dtype=np.int64)
+    counts[0] = 1
+    bound = 1
+    for price, limit in zip(prices, limits):
+        bound *= min(limit, budget // price) + 1
+        if bound >= INT64_SAFE_BOUND and counts.dtype != object:
+            counts = counts.astype(object)
+        counts = bounded_window_sum(counts, price, limit)
+    return int(counts[budget])
+
+
+def level_table_bytes(table):
+    """단계 테이블이 차지하는 용량 추정 (파이썬 정수 테이블은 포인터 배열에 더해 값 하나에 약 40바이트)"""
+    return table.nbytes if table.dtype != object else table.nbytes + OBJECT_CELL_BYTES * len(table)
+
+
+def count_states(tables):
+    """DP 테이블이 담고 있는 상태 수"""
+    return sum(len(table) for table in tables[:-1])
+
+
+def closest_reachable(tables, budget):
+    """카운트 테이블에서 예산 이하로 정확히 만들 수 있는 가장 큰 금액을 읽음 (0원은 항상 가능)"""
+    reachable = np.asarray(tables[0][:budget + 1] > 0, dtype=bool)
+    return int(np.flatnonzero(reachable)[-1])
+
+
+def feasible_quantities(tables, prices, limits, idx, remaining):
+    """idx번째 품목에서 해가 남아 있는 구매 수량 배열"""
+    max_qty = min(limits[idx], remaining // prices[idx])
+    qtys = np.arange(max_qty + 1, dtype=np.int64)
+    next_remaining = remaining - qtys * prices[idx]
+    alive = np.asarray(tables[idx + 1][next_remaining] > 0, dtype=bool)
+    return qtys[alive]
+
+
+def iter_solution_batches(tables, prices, limits, budget, batch_size=SOLUTION_BATCH_SIZE,
+                          start_time=None, time_limit=None, progress=None):
+    """카운트 테이블을 따라 해가 있는 가지만 내려가며 정확한 구매 계획을 batch_size 행씩 흘려보냄
+
+    계획은 품목 순서대로 사전순이며, 한 번에 들고 있는 행은 배치 하나 분량뿐입니다.
+    progress(SolveProgress)를 주면 내려가는 중에 취소 여부를 확인합니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    if tables[0][budget] == 0:
+        return
+    prefix = np.zeros(item_count, dtype=np.int64)
+    tail_idx = max(item_count - 2, 0)
+
+    def walk(idx, remaining):
+        qtys = feasible_quantities(tables, prices, limits, idx, remaining)
+        if idx == tail_idx:
+            # 마지막 두 품목은 앞 수량이 정해지면 마지막 수량이 나눗셈으로 결정되므로 한 번에 만듭니다.
+            block = np.empty((len(qtys), item_count), dtype=np.int64)
+            block[:, :idx] = prefix[:idx]
+            block[:, idx] = qtys
+            if idx + 1 < item_count:
+                block[:, idx + 1] = (remaining - qtys * prices[idx]) // prices[idx + 1]
+            yield block
+            return
+        for qty in qtys.tolist():
+            check_time(start_time, time_limit)
+            if progress is not None:
+                progress.check()
+            prefix[idx] = qty
+            yield from walk(idx + 1, remaining - qty * prices[idx])
+
+    buffer = np.empty((batch_size, item_count), dtype=np.int64)
+    filled = 0
+    for block in walk(0, budget):
+        while len(block):
+            take = min(batch_size - filled, len(block))
+            buffer[filled:filled + take] = block[:take]
+            filled += take
+            block = block[take:]
+            if filled == batch_size:
+                yield buffer.copy()
+                filled = 0
+    if filled:
+        yield buffer[:filled].copy()
+
+
+def reconstruct_solutions(tables, prices, limits, budget, start_time=None, time_limit=None):
+    """정확한 구매 계획을 모두 리스트로 복원 (적은 수의 해를 한꺼번에 쓸 때)"""
+    cases_exact = []
+    for batch in iter_solution_batches(tables, prices, limits, budget,
+                                       start_time=start_time, time_limit=time_limit):
+        cases_exact.extend(batch.tolist())
+    return cases_exact
@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .dense_dp import strided_prefix_sum
+
+# 품목 하나의 수량 분포 (quantities: 실제 수량, counts: 그 수량을 사는 계획 수)
+QuantityDistribution = namedtuple('QuantityDistribution', 'quantities counts')
+
+
+def leave_one_out_counts(full_counts, price, limit):
+    """품목 하나를 뺀 나머지 품목들로 r원을 정확히 쓰는 방법의 수 (r = 0..len-1)
+
+    전체 방법 수는 (1 + x^p + ... + x^(limit*p)) × (나머지 품목의 방법 수) 이므로,
+    (1 - x^p) 를 곱하고(차분) (1 - x^((limit+1)p)) 로 나누면(간격 누적합) 나머지만 남습니다.
+    곱셈·나눗셈 모두 정수로 정확하고 예산 크기에 비례하는 계산만 듭니다.
+    """
+    rest = full_counts.copy()
+    if price < len(rest):
+        rest[price:] -= full_counts[:-price]
+    return strided_prefix_sum(rest, (limit + 1) * price)
+
+
+def quantity_distributions(tables, prices, limits, budget):
+    """budget 을 정확히 쓰는 계획들에서 품목별·수량별 계획 수 (계획을 나열하지 않음)
+
+    idx번째 품목을 q개 사는 계획 수는 나머지 품목들로 budget - q×단가 를 정확히 쓰는 방법 수입니다.
+    돌려주는 분포의 수량은 기본 구매량을 빼고 센 수량(0부터)이며, 수량별 계획 수의 합은 전체 계획 수입니다.
+    """
+    full_counts = tables[0][:budget + 1]
+    distributions = []
+    for price, limit in zip(prices, limits):
+        rest = leave_one_out_counts(full_counts, price, limit)
+        quantities = np.arange(min(limit, budget // price) + 1, dtype=np.int64)
+        distributions.append(QuantityDistribution(quantities, rest[budget - quantities * price]))
+    return distributions
+
+
+def distributions_from_batches(batches, limits):
+    """이미 나열한 계획 배치에서 품목별·수량별 계획 수를 셈 (카운트 테이블이 없을 때)"""
+    counts = [np.zeros(limit + 1, dtype=np.int64) for limit in limits]
+    for batch in batches:
+        for idx, limit in enumerate(limits):
+            counts[idx] += np.bincount(batch[:, idx], minlength=limit + 1)[:limit + 1]
+    return [QuantityDistribution(np.arange(len(count), dtype=np.int64), count) for count in counts]
+
+
+def expand_group_distributions(distributions, groups, base_quantity, limited_quantity):
+    """묶음별 수량 분포(기본 구매량을 뺀 수량)를 품목별 실제 수량 분포로 나눔
+
+    묶음 수량을 품목별로 나누는 규칙은 expand_group_quantities 와 같습니다.
+    (앞 품목부터 최대 구매량까지 채움) 계획 수는 묶음 기준입니다.
+    """
+    base = np.asarray(base_quantity, dtype=np.int64)
+    room = np.asarray(limited_quantity, dtype=np.int64) - base
+    expanded = [None] * len(base)
+    for group, members in enumerate(groups.members):
+        extra, counts = distributions[group]
+        filled_before = np.cumsum(room[members]) - room[members]
+        for member, before in zip(members, filled_before.tolist()):
+            quantities = np.clip(extra - before, 0, room[member])
+            # 같은 품목 수량으로 모이는 묶음 수량들의 계획 수를 더합니다.
+            merged = np.zeros(int(quantities.max(initial=0)) + 1, dtype=counts.dtype)
+            np.add.at(merged, quantities, counts)
+            expanded[member] = QuantityDistribution(np.arange(len(merged), dtype=np.int64) + base[member], merged)
+    return expanded
@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .dense_dp import bounded_window_sum
+
+# 같은 단가끼리 묶은 품목들
+# prices/base_quantity/limited_quantity: 묶음별 단가와 합친 기본·최대 구매량,
+# members: 묶음별 원래 품목 번호 목록
+PriceGroups = namedtuple('PriceGroups', 'prices base_quantity limited_quantity members')
+
+
+def group_by_price(prices, base_quantity, limited_quantity):
+    """단가 내림차순으로 정렬된 품목들에서 같은 단가끼리 하나의 묶음으로 합침
+
+    같은 단가의 품목들은 어느 것을 사도 금액이 같으므로 묶음의 구매량만 정하면 됩니다.
+    묶음의 기본·최대 구매량은 품목들의 값을 더한 것입니다.
+    """
+    group_prices, group_base, group_limits, members = [], [], [], []
+    for idx, (price, base, limit) in enumerate(zip(prices, base_quantity, limited_quantity)):
+        if group_prices and group_prices[-1] == price:
+            group_base[-1] += base
+            group_limits[-1] += limit
+            members[-1].append(idx)
+        else:
+            group_prices.append(price)
+            group_base.append(base)
+            group_limits.append(limit)
+            members.append([idx])
+    return PriceGroups(group_prices, group_base, group_limits, members)
+
+
+def has_merged_items(groups):
+    return any(len(members) > 1 for members in groups.members)
+
+
+def expand_group_quantities(batch, groups, base_quantity, limited_quantity):
+    """묶음별 구매량(기본 구매량 포함) 배치를 품목별 구매량으로 나눔
+
+    묶음 안에서는 기본 구매량을 먼저 채운 뒤, 남는 수량을 앞 품목부터 최대 구매량까지 채웁니다.
+    결과는 batch 와 같은 정수 타입입니다.
+    """
+    batch = np.asarray(batch)
+    if batch.dtype.kind != 'i':
+        batch = batch.astype(np.int64)
+    base = np.asarray(base_quantity, dtype=np.int64)
+    room = np.asarray(limited_quantity, dtype=np.int64) - base
+    expanded = np.empty((len(batch), len(base)), dtype=batch.dtype)
+    for group, members in enumerate(groups.members):
+        extra = batch[:, group] - base[members].sum()
+        # 앞 품목들이 먼저 채우고 남는 만큼만 다음 품목에 들어갑니다.
+        filled_before = np.cumsum(room[members]) - room[members]
+        expanded[:, members] = base[members] + np.clip(extra[:, None] - filled_before, 0, room[members])
+    return expanded
+
+
+def split_counts(rooms):
+    """묶음의 추가 수량 e 를 품목별 추가 가능 수량(rooms) 안에서 나누는 방법 수 (e = 0..합계)
+
+    단가 1원짜리 품목들로 e원을 정확히 쓰는 방법 수와 같으므로 카운트 테이블 한 단계씩 쌓습니다.
+    """
+    counts = np.zeros(int(sum(rooms)) + 1, dtype=object)
+    counts[0] = 1
+    for room in rooms:
+        counts = bounded_window_sum(counts, 1, int(room))
+    return counts
+
+
+def count_item_plans(batches, groups, base_quantity, limited_quantity):
+    """묶음 단위 계획 배치(기본 구매량을 뺀 수량)를 품목별로 나누는 방법까지 센 계획 수
+
+    계획마다 묶음별로 나누는 방법 수를 곱해 더합니다. (묶인 품목이 없으면 계획 수와 같음)
+    """
+    room = np.asarray(limited_quantity, dtype=np.int64) - np.asarray(base_quantity, dtype=np.int64)
+    merged = [(group, split_counts(room[members].tolist()))
+              for group, members in enumerate(groups.members) if len(members) > 1]
+    total = 0
+    for batch in batches:
+        ways = np.ones(len(batch), dtype=object)
+        for group, counts in merged:
+            ways = ways * counts[batch[:, group]]
+        total += int(ways.sum())
+    return total
+
+
+def group_quantities(plans, groups):
+    """품목별 구매량 행렬을 묶음별 구매량으로 합침 (expand_group_quantities 의 반대 방향)"""
+    plans = np.asarray(plans)
+    return np.stack([plans[:, members].sum(axis=1) for members in groups.members], axis=1)
+
+
+def describe_grouping(groups, labels):
+    """같은 단가 묶음 안내 문구 (묶인 품목이 없으면 빈 문자열)"""
+    text_out = ''
+    for price, members in zip(groups.prices, groups.members):
+        if len(members) > 1:
+            names = ', '.join(labels[idx] or f'품목 #{idx + 1:02d}' for idx in members)
+            text_out += f'단가 {price:,d}원인 품목 {len(members)}개({names})를 하나로 묶어 계산했습니다.\n'
+    if text_out:
+        text_out += ('묶인 품목은 앞 품목부터 최대 구매량까지 채운 대표 나눔 하나로 보여 줍니다.\n'
+                     '(묶음 안에서는 수량을 자유롭게 나눠 사도 금액이 같습니다)\n')
+    return text_out
+
+
+def describe_item_count(item_count, group_count):
+    """품목별로 나눠 사는 방법까지 센 계획 수 안내 문구 (item_count 가 None 이면 세지 못한 경우)"""
+    if item_count is None:
+        return f'(같은 단가 묶음 기준 {group_count:,d}개이며, 품목별로 나눠 사는 방법은 더 많습니다.)\n'
+    return f'(같은 단가 품목을 나눠 사는 방법까지 센 수이며, 같은 단가 묶음 기준으로는 {group_count:,d}개입니다.)\n'
+
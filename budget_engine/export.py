@@ -0,0 +1,217 @@
+"""구매 계획 내보내기 (엑셀, 압축 CSV, Parquet, Arrow IPC)
+
+openpyxl 과 pyarrow 는 쓸 때만 불러옵니다. (계산 모듈은 둘 다 없이도 동작)
+pyarrow 가 없으면 Parquet, Arrow 내보내기만 쓸 수 없습니다. (arrow_available() 로 확인)
+"""
+import csv
+import gzip
+import importlib.util
+import io
+import json
+
+import numpy as np
+
+from .matrix import plan_totals
+
+# 엑셀 시트 하나의 최대 행 수
+EXCEL_MAX_ROWS = 1_048_576
+# 결과요약 한 줄을 병합할 열 수 (A~G)
+SUMMARY_MERGE_COLUMNS = 7
+RESULT_SHEET_TITLE = '계산결과'
+
+
+def plan_header_rows(columns, labels=None):
+    """구매 계획 위에 붙는 머리글 행들 (품목 번호, 품목 이름, 열 이름)"""
+    rows = []
+    if labels:
+        rows.append([f'#{idx + 1:02d}' for idx in range(len(labels))] + [''])
+        rows.append(list(labels) + [''])
+    rows.append(list(columns) + ['금액'])
+    return rows
+
+
+def write_result_excel(output, result_text, plans, prices, labels=None, columns=None,
+                       progress_callback=None, max_rows=EXCEL_MAX_ROWS, plan_limit=None):
+    """결과요약과 구매 계획을 쓰기 전용(write-only) 엑셀 통합 문서로 흘려 씀
+
+    plans(SolutionStream)의 배치를 받는 대로 행으로 내보내므로 계획 전체를 메모리에 모으지 않습니다.
+    셀 병합과 필터는 다시 읽지 않고 시트를 닫기 전에 범위만 지정합니다.
+    한 시트가 max_rows 행에 닿으면 머리글을 다시 붙인 '계산결과 (2)' 시트로 넘어갑니다.
+    plan_limit 을 주면 앞에서부터 그 수만큼만 쓰고, 잘랐다는 안내를 결과요약 끝에 붙입니다.
+    progress_callback(비율, 문구)로 실제로 쓴 계획 수를 알리고, 쓴 계획 수를 돌려줍니다.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    if columns is None:
+        columns = [f'{price:,d}원' for price in prices]
+    header_rows = plan_header_rows(columns, labels)
+    last_col = get_column_letter(len(columns) + 1)
+    total = plans.count if plans else 0
+    if plan_limit is not None and total > plan_limit:
+        result_text += (f'\n엑셀에는 전체 {total:,d}개 중 앞의 {plan_limit:,d}개만 담았습니다. '
+                        f'전체 계획은 CSV.gz 등 열 형식 파일로 내려받으세요.')
+        total = plan_limit
+    workbook = Workbook(write_only=True)
+
+    def open_sheet(number, lead_rows):
+        title = RESULT_SHEET_TITLE if number == 1 else f'{RESULT_SHEET_TITLE} ({number})'
+        sheet = workbook.create_sheet(title)
+        for row in lead_rows:
+            sheet.append(row)
+        return sheet, len(lead_rows)
+
+    def close_filter(sheet, used_rows, plan_rows):
+        # 열 이름 행부터 마지막 계획까지 필터를 겁니다.
+        if plan_rows > 0:
+            sheet.auto_filter.ref = f'A{used_rows - plan_rows}:{last_col}{used_rows}'
+
+    if progress_callback:
+        progress_callback(0.05, "데이터 준비 중...")
+
+    # 첫 시트: 결과요약(줄마다 A~G 병합) + 빈 행 + 머리글
+    summary_rows = [[line] for line in result_text.split('\n')] + [['']]
+    lead_rows = summary_rows + (header_rows if total else [])
+    sheet_number = 1
+    sheet, used_rows = open_sheet(sheet_number, lead_rows)
+    merge_col = get_column_letter(SUMMARY_MERGE_COLUMNS)
+    for row_idx in range(1, len(summary_rows) + 1):
+        sheet.merged_cells.add(f'A{row_idx}:{merge_col}{row_idx}')
+
+    written, plan_rows = 0, 0
+    if total:
+        for batch in plans.batches():
+            if written >= total:
+                break
+            batch = batch[:total - written]
+            amounts = plan_totals(batch, prices).tolist()
+            batch = batch.tolist()
+            begin = 0
+            while begin < len(batch):
+                if used_rows >= max_rows:
+                    # 시트가 가득 차면 머리글을 다시 붙인 새 시트로 넘어갑니다.
+                    close_filter(sheet, used_rows, plan_rows)
+                    sheet_number += 1
+                    sheet, used_rows = open_sheet(sheet_number, header_rows)
+                    plan_rows = 0
+                end = min(len(batch), begin + max_rows - used_rows)
+                for row, amount in zip(batch[begin:end], amounts[begin:end]):
+                    row.append(amount)
+                    sheet.append(row)
+                used_rows += end - begin
+                plan_rows += end - begin
+                begin = end
+            written += len(batch)
+            if progress_callback:
+                progress_callback(0.05 + 0.85 * written / total,
+                                  f"구매 계획 쓰는 중... ({written:,d}/{total:,d})")
+        close_filter(sheet, used_rows, plan_rows)
+
+    if progress_callback:
+        progress_callback(0.9, "파일 저장 중...")
+    workbook.save(output)
+    if progress_callback:
+        progress_callback(1.0, "완료!")
+    return written
+
+
+def arrow_available():
+    """pyarrow 가 설치되어 있는지 (Parquet, Arrow 내보내기 가능 여부)"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def plan_column_names(prices, labels=None, columns=None):
+    """열 형식 파일의 품목 열 이름 ('이름(단가원)', 이름이 없으면 단가 열 이름만)"""
+    if columns is None:
+        columns = [f'{price:,d}원' for price in prices]
+    if not labels:
+        return list(columns)
+    return [f'{label}({column})' if label else column for label, column in zip(labels, columns)]
+
+
+def write_result_csv_gz(output, plans, prices, labels=None, columns=None):
+    """구매 계획을 gzip 으로 압축한 CSV 로 배치 단위로 씀 (열: 품목별 수량, 금액) 쓴 계획 수를 돌려줌"""
+    written = 0
+    with gzip.GzipFile(fileobj=output, mode='wb', compresslevel=6) as raw:
+        with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(plan_column_names(prices, labels, columns) + ['금액'])
+            if plans:
+                for batch in plans.batches():
+                    amounts = plan_totals(batch, prices)
+                    writer.writerows(row + [amount] for row, amount in zip(batch.tolist(), amounts.tolist()))
+                    written += len(batch)
+    return written
+
+
+def write_sweep_csv(output, sweep):
+    """예산 범위 결과(BudgetSweep)를 CSV 로 씀 (예산마다 한 줄, 뒤에 예시 계획의 품목별 수량)"""
+    # 파일을 닫지 않고 돌려주도록 글자 층만 떼어 냅니다.
+    f = io.TextIOWrapper(output, encoding='utf-8-sig', newline='')
+    writer = csv.writer(f)
+    writer.writerow(['예산', '정확히 맞춤', '계획 수', '사용 금액', '잔액']
+                    + plan_column_names(sweep.prices, sweep.labels))
+    for point in sweep.points:
+        writer.writerow([point.budget, point.exact, point.case_count, point.best_total, point.leftover]
+                        + point.plan)
+    f.flush()
+    f.detach()
+    return len(sweep.points)
+
+
+def plan_schema(prices, labels=None, columns=None, dtype=np.int64):
+    """구매 계획 표의 Arrow 스키마 (품목 이름과 단가를 스키마·열 메타데이터로 붙임)"""
+    import pyarrow as pa
+
+    quantity_type = pa.from_numpy_dtype(np.dtype(dtype))
+    labels = list(labels) if labels else [''] * len(prices)
+    fields = [
+        pa.field(name, quantity_type, nullable=False,
+                 metadata={'label': label, 'price': str(price)})
+        for name, label, price in zip(plan_column_names(prices, labels, columns), labels, prices)
+    ]
+    fields.append(pa.field('금액', pa.int64(), nullable=False))
+    metadata = {
+        'simbud.labels': json.dumps(labels, ensure_ascii=False),
+        'simbud.prices': json.dumps([int(price) for price in prices]),
+    }
+    return pa.schema(fields, metadata=metadata)
+
+
+def _record_batches(plans, prices, schema):
+    """스트림의 배치를 스키마에 맞춘 Arrow RecordBatch 로 바꿔 차례로 돌려줌"""
+    import pyarrow as pa
+
+    if not plans:
+        return
+    quantity_dtype = schema.field(0).type.to_pandas_dtype()
+    for batch in plans.batches():
+        arrays = [pa.array(batch[:, idx].astype(quantity_dtype, copy=False)) for idx in range(batch.shape[1])]
+        arrays.append(pa.array(plan_totals(batch, prices)))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_result_parquet(output, plans, prices, labels=None, columns=None):
+    """구매 계획을 Parquet 으로 배치(행 그룹)마다 이어 씀. 쓴 계획 수를 돌려줌 (pyarrow 필요)"""
+    import pyarrow.parquet as pq
+
+    schema = plan_schema(prices, labels, columns, getattr(plans, 'dtype', np.int64))
+    written = 0
+    with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+        for record_batch in _record_batches(plans, prices, schema):
+            writer.write_batch(record_batch)
+            written += record_batch.num_rows
+    return written
+
+
+def write_result_arrow(output, plans, prices, labels=None, columns=None):
+    """구매 계획을 Arrow IPC 파일(Feather v2)로 배치 단위로 씀. 쓴 계획 수를 돌려줌 (pyarrow 필요)"""
+    import pyarrow as pa
+
+    schema = plan_schema(prices, labels, columns, getattr(plans, 'dtype', np.int64))
+    written = 0
+    with pa.ipc.new_file(output, schema) as writer:
+        for record_batch in _record_batches(plans, prices, schema):
+            writer.write_batch(record_batch)
+            written += record_batch.num_rows
+    return written
@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+from .cache import ResultCache
+
+# 미리 보기 결과 (exact: 예산을 정확히 맞출 수 있는지, best_total: 가장 가까운 사용 금액(원), leftover: 잔액(원))
+Feasibility = namedtuple('Feasibility', 'exact best_total leftover')
+
+# 비트셋으로 미리 볼 최대 예산(단위) (이보다 크면 미리 보기를 건너뜀)
+PREFLIGHT_MAX_BITS = 20_000_000
+# 엔진이 탐색 전에 비트셋으로 가장 가까운 금액을 확인할 최대 예산(단위) (수십 밀리초 이내)
+PROOF_MAX_BITS = 2_000_000
+
+# 모든 세션이 함께 쓰는 비트셋 캐시 (비트셋 하나가 최대 약 2.5MB 이므로 용량으로 제한)
+SPENDS_CACHE = ResultCache(max_entries=256, max_bytes=32 * 1024 * 1024)
+
+
+def quantity_chunks(limit):
+    """0..limit 의 모든 수량을 만들 수 있는 덩어리들 (1, 2, 4, ..., 나머지)"""
+    chunks, size = [], 1
+    while limit > 0:
+        take = min(size, limit)
+        chunks.append(take)
+        limit -= take
+        size *= 2
+    return chunks
+
+
+def reachable_spends(prices, limits, budget):
+    """budget 이하로 정확히 만들 수 있는 금액들의 비트셋 (파이썬 정수, r번째 비트 = r원 가능)
+
+    품목마다 수량을 1, 2, 4, ... 덩어리로 나눠 bits |= bits << (덩어리 × 단가) 를 하므로
+    품목 하나에 log(수량 범위) 번의 큰 정수 연산만 듭니다. 같은 입력은 다시 계산하지 않습니다.
+    결과는 비트셋 크기(바이트)로 SPENDS_CACHE 에 보관합니다.
+    """
+    key = (tuple(prices), tuple(limits), budget)
+    bits = SPENDS_CACHE.get(key)
+    if bits is not None:
+        return bits
+    mask = (1 << (budget + 1)) - 1
+    bits = 1
+    for price, limit in zip(prices, limits):
+        for chunk in quantity_chunks(min(limit, budget // price)):
+            bits |= (bits << (chunk * price)) & mask
+    SPENDS_CACHE.put(key, bits, bits.bit_length() // 8)
+    return bits
+
+
+def closest_spend(bits, budget):
+    """비트셋에서 budget 이하로 만들 수 있는 가장 큰 금액 (0원은 항상 가능)"""
+    return (bits & ((1 << (budget + 1)) - 1)).bit_length() - 1
+
+
+def proven_best_spend(prices, limits, budget, max_bits=PROOF_MAX_BITS):
+    """budget 이하로 정확히 만들 수 있는 가장 큰 금액 (예산이 max_bits 보다 커서 확인하지 않으면 None)
+
+    엔진은 이 금액을 목표로 삼아, 정확히 맞출 수 없는 가지를 처음부터 건너뜁니다.
+    """
+    if budget > max_bits:
+        return None
+    prices = tuple(int(price) for price in prices)
+    limits = tuple(int(limit) for limit in limits)
+    return closest_spend(reachable_spends(prices, limits, int(budget)), int(budget))
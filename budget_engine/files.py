@@ -0,0 +1,96 @@
+import csv
+import re
+from pathlib import Path
+
+from .api import BudgetItem
+
+# 문제 파일에서 물품 목록이 시작하는 행 (1행: 예산, 3행: 머리글, 4행부터 물품)
+ITEM_START_ROW = 3
+PROBLEM_SUFFIXES = ('.xlsx', '.csv')
+
+
+def extract_number(value):
+    """셀 값에서 숫자만 꺼냄 (원, 개 같은 단위와 쉼표 제거, 없으면 None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if value != value else value
+    nums = re.sub(r'[^\d.]', '', str(value))
+    return float(nums) if nums else None
+
+
+def parse_problem_rows(rows):
+    """엑셀 양식(예산계산 시트)과 같은 배치의 행 목록을 (예산, BudgetItem 목록)으로 바꿈
+
+    화면의 엑셀 불러오기와 같은 규칙으로 단가가 없는 행은 건너뛰고,
+    비었거나 불가능한 최소/최대 구매량은 0 / 예산으로 살 수 있는 만큼으로 고칩니다.
+    """
+    rows = [list(row) + [None] * 4 for row in rows]
+    budget = extract_number(rows[0][1]) if rows else None
+    if budget is None:
+        raise ValueError('첫 행(B1)에서 예산을 찾을 수 없습니다.')
+    budget = int(budget)
+    items = []
+    for row in rows[ITEM_START_ROW:]:
+        price = extract_number(row[1])
+        if price is None or price <= 0:
+            continue
+        price = int(price)
+        max_possible = budget // price
+        min_qty = extract_number(row[2])
+        min_qty = int(min_qty) if min_qty is not None and 0 <= min_qty <= max_possible else 0
+        max_qty = extract_number(row[3])
+        max_qty = int(max_qty) if max_qty is not None and 0 < max_qty <= max_possible else max_possible
+        if min_qty > max_qty:
+            min_qty = 0
+        label = '' if row[0] is None else str(row[0])
+        items.append(BudgetItem(label, price, min_qty, max_qty))
+    return budget, items
+
+
+def read_problem_file(path):
+    """엑셀(.xlsx, 첫 시트) 또는 CSV 문제 파일을 읽어 (예산, BudgetItem 목록)을 돌려줌"""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        # 엑셀에서 저장한 CSV 는 BOM 이 붙어 있으므로 utf-8-sig 로 읽습니다.
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = [[cell if cell != '' else None for cell in row] for row in csv.reader(f)]
+    else:
+        # openpyxl 은 엑셀 파일을 읽을 때만 불러옵니다.
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = list(workbook.worksheets[0].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    return parse_problem_rows(rows)
+
+
+def write_solution_csv(path, solution, max_rows=None):
+    """구매 계획을 CSV 로 씀 (열: 품목별 수량, 금액) 쓴 행 수를 돌려줌"""
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow([f'{label}({price:,d}원)' if label else f'{price:,d}원'
+                         for label, price in zip(solution.labels, solution.prices)] + ['금액'])
+        for batch in solution.plans.batches():
+            if max_rows is not None:
+                batch = batch[:max_rows - written]
+            amounts = batch @ solution.prices
+            writer.writerows(row + [amount] for row, amount in zip(batch.tolist(), amounts.tolist()))
+            written += len(batch)
+            if max_rows is not None and written >= max_rows:
+                break
+    return written
+
+
+def collect_problem_files(paths):
+    """파일과 폴더 목록에서 문제 파일(.xlsx, .csv)을 이름순으로 모음"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in PROBLEM_SUFFIXES
+                                and not p.name.startswith('~$')))
+        else:
+            files.append(path)
+    return files
@@ -0,0 +1,74 @@
+import numpy as np
+
+# 처음에 잡아 두는 행 수 (모자라면 두 배씩 늘립니다)
+INITIAL_CAPACITY = 1024
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def quantity_dtype(max_quantity):
+    """수량을 담을 정수 타입 (int32 로 충분하면 int32, 아니면 int64)"""
+    return np.int32 if max_quantity <= INT32_MAX else np.int64
+
+
+class SolutionMatrix:
+    """구매 계획(행)을 미리 잡아 둔 2차원 정수 배열에 차곡차곡 쌓는 행렬
+
+    리스트의 리스트 대신 써서 계획 하나가 품목 수 × 4바이트(int32)만 차지합니다.
+    자리가 모자라면 두 배로 늘리고, rows 는 채운 부분만 복사 없이 보여 줍니다.
+    """
+
+    def __init__(self, item_count, dtype=np.int32, capacity=INITIAL_CAPACITY):
+        self._data = np.empty((max(capacity, 1), item_count), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __array__(self, dtype=None, copy=None):
+        rows = self.rows
+        return rows if dtype is None else rows.astype(dtype, copy=False)
+
+    @property
+    def item_count(self):
+        return self._data.shape[1]
+
+    @property
+    def rows(self):
+        """채운 행들 (복사하지 않은 뷰)"""
+        return self._data[:self._size]
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            grown = np.empty((max(size, 2 * len(self._data)), self.item_count), dtype=self._data.dtype)
+            grown[:self._size] = self.rows
+            self._data = grown
+
+    def append(self, row):
+        self._reserve(self._size + 1)
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, block):
+        block = np.asarray(block).reshape(-1, self.item_count)
+        self._reserve(self._size + len(block))
+        self._data[self._size:self._size + len(block)] = block
+        self._size += len(block)
+
+    def add_offset(self, offset):
+        """모든 행에 기본 구매량(offset)을 제자리에서 더함 (int32 를 넘게 되면 그때만 int64 로 바꿈)"""
+        offset = np.asarray(offset, dtype=np.int64)
+        if self._size and offset.size and int(self.rows.max()) + int(offset.max()) > np.iinfo(self._data.dtype).max:
+            self._data = self._data.astype(np.int64)
+        self.rows[:] += offset.astype(self._data.dtype)
+        return self
+
+
+def plan_totals(plans, prices):
+    """계획별 금액 (행렬 × 단가 벡터 한 번, 금액은 int64 로 계산)"""
+    plans = np.asarray(plans)
+    if plans.size == 0:
+        return np.zeros(len(plans), dtype=np.int64)
+    return plans @ np.asarray(prices, dtype=np.int64)
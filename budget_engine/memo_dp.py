@@ -0,0 +1,121 @@
+import time
+
+import numpy as np
+
+from .bounds import suffix_bounds
+from .dense_dp import SOLUTION_BATCH_SIZE, check_time
+from .stats import PHASE_COUNT, measure
+
+# 시간 제한과 취소를 검사하는 상태 간격
+STATE_CHECK_INTERVAL = 4096
+
+
+def solve_memo_dp(prices, limits, budget, start_time=None, time_limit=None, progress=None, stats=None):
+    """실제로 닿는 (품목, 남은 예산) 상태만 딕셔너리에 메모하며 내려가는 top-down DP
+
+    상태마다 (예산 이하로 쓸 수 있는 가장 큰 금액, 그 금액을 쓰는 계획 수)를 저장하므로
+    정확한 해와 가장 가까운 근사치를 한 번에 구합니다. 예산이 커서 조밀한 테이블은
+    부담스럽지만 앞 품목들의 수량 조합이 만드는 잔액 종류가 적을 때 유리합니다.
+    (사용 금액, 계획 수, 배치 생성 함수, 메모한 상태 수)를 돌려줍니다.
+    뒤 품목들의 최대 금액과 단가 최대공약수로 잡은 상한이 지금까지 찾은 금액에 못 미치는 가지는
+    내려가지 않고, 남은 예산으로 뒤 품목을 모두 살 수 있는 상태는 메모 없이 바로 답합니다.
+    stats(SolveStats)를 주면 호출 수, 메모 적중 수, 가지치기 수, 최대 메모 크기를 기록합니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    last = item_count - 1
+    memo = [{} for _ in range(item_count)]
+    state_count = 0
+    calls = memo_hits = pruned = 0
+    max_spend, gcds = suffix_bounds(prices, limits, budget)
+
+    def best(idx, remaining):
+        nonlocal state_count, calls, memo_hits, pruned
+        calls += 1
+        if idx == last:
+            # 마지막 품목은 남은 예산으로 살 수 있는 만큼 사는 것이 항상 가장 가깝습니다.
+            return min(limits[last], remaining // prices[last]) * prices[last], 1
+        if remaining >= max_spend[idx]:
+            # 뒤 품목을 모두 최대로 사는 계획 하나만 가장 가깝습니다.
+            return max_spend[idx], 1
+        cached = memo[idx].get(remaining)
+        if cached is not None:
+            memo_hits += 1
+            return cached
+        state_count += 1
+        if state_count % STATE_CHECK_INTERVAL == 0:
+            check_time(start_time, time_limit)
+            if progress is not None:
+                progress.check()
+                progress.states = state_count
+        top, ways = -1, 0
+        rest_max, rest_gcd = max_spend[idx + 1], gcds[idx + 1]
+        # 많이 사는 쪽부터 보면 큰 금액을 먼저 찾아 뒤쪽 가지를 더 많이 건너뜁니다.
+        for qty in range(min(limits[idx], remaining // prices[idx]), -1, -1):
+            cost = qty * prices[idx]
+            rest = remaining - cost
+            if cost + min(rest_max, rest - rest % rest_gcd) < top:
+                pruned += 1
+                continue
+            spend, count = best(idx + 1, rest)
+            spend += cost
+            if spend > top:
+                top, ways = spend, count
+            elif spend == top:
+                ways += count
+        memo[idx][remaining] = (top, ways)
+        return top, ways
+
+    with measure(stats, PHASE_COUNT):
+        best_spend, case_count = best(0, budget)
+    if stats is not None:
+        stats.count('호출 수', calls)
+        stats.count('메모 적중', memo_hits)
+        stats.count('가지치기', pruned)
+        stats.peak('최대 메모 크기', state_count)
+    if progress is not None:
+        progress.states = state_count
+        progress.solutions = case_count
+
+    def batch_factory():
+        return _iter_memo_batches(memo, max_spend, prices, limits, budget, best_spend, SOLUTION_BATCH_SIZE)
+
+    return best_spend, case_count, batch_factory, state_count
+
+
+def _iter_memo_batches(memo, max_spend, prices, limits, budget, best_spend, batch_size):
+    """메모를 따라 best_spend 를 쓰는 계획만 품목 순서대로 사전순으로 흘려보냄"""
+    item_count = len(prices)
+    last = item_count - 1
+    quantities = [0] * item_count
+    buffer = np.empty((batch_size, item_count), dtype=np.int64)
+    filled = 0
+
+    def spend_of(idx, remaining):
+        if idx == last:
+            return min(limits[last], remaining // prices[last]) * prices[last]
+        if remaining >= max_spend[idx]:
+            return max_spend[idx]
+        # 메모에 없는 상태는 가지치기로 건너뛴 것이므로 목표 금액에 닿지 않습니다.
+        return memo[idx].get(remaining, (-1, 0))[0]
+
+    def walk(idx, remaining, target):
+        if idx == last:
+            quantities[last] = target // prices[last]
+            yield quantities
+            return
+        for qty in range(min(limits[idx], remaining // prices[idx]) + 1):
+            cost = qty * prices[idx]
+            if cost + spend_of(idx + 1, remaining - cost) == target:
+                quantities[idx] = qty
+                yield from walk(idx + 1, remaining - cost, target - cost)
+
+    for row in walk(0, budget, best_spend):
+        buffer[filled] = row
+        filled += 1
+        if filled == batch_size:
+            yield buffer.copy()
+            filled = 0
+    if filled:
+        yield buffer[:filled].copy()
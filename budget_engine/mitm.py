@@ -0,0 +1,131 @@
+import numpy as np
+
+from .bounds import suffix_bounds
+from .dense_dp import check_time
+from .feasibility import proven_best_spend
+from .stats import PHASE_CLOSEST, PHASE_COUNT, measure
+
+# 반쪽 하나에서 나열할 부분합 개수의 상한(이보다 크면 메모리가 부족해집니다)
+MITM_MAX_HALF_STATES = 2_000_000
+# 짝 맞추기 결과를 한 번에 펼칠 왼쪽 부분합 개수
+JOIN_CHUNK = 4096
+
+
+def half_state_bounds(prices, limits, budget):
+    """품목별 (가능한 수량 수)의 누적곱 (부분합 개수의 상한)"""
+    bounds = [1]
+    for price, limit in zip(prices, limits):
+        bounds.append(bounds[-1] * (min(limit, budget // price) + 1))
+    return bounds
+
+
+def choose_split(prices, limits, budget):
+    """두 반쪽의 부분합 개수가 비슷해지도록 나눌 위치와 큰 쪽 상한을 구함"""
+    item_count = len(prices)
+    prefix = half_state_bounds(prices, limits, budget)
+    suffix = half_state_bounds(prices[::-1], limits[::-1], budget)[::-1]
+    split = min(range(1, max(item_count, 2)), key=lambda i: max(prefix[i], suffix[i]))
+    return split, max(prefix[split], suffix[split])
+
+
+def prefer_meet_in_the_middle(prices, limits, budget):
+    """반쪽 부분합 나열이 감당할 만하고 DP 테이블보다 작을 때 True"""
+    if len(prices) < 2:
+        return False
+    _, half_states = choose_split(prices, limits, budget)
+    return half_states <= MITM_MAX_HALF_STATES and 2 * half_states < len(prices) * (budget + 1)
+
+
+def enumerate_half(prices, limits, budget, start_time=None, time_limit=None, progress=None, stats=None):
+    """반쪽 품목들로 예산 이하에서 만들 수 있는 (합계, 수량 조합)을 모두 NumPy 배열로 나열
+
+    stats(SolveStats)를 주면 예산을 넘어 버린 조합 수를 '가지치기'로 셉니다.
+    """
+    sums = np.zeros(1, dtype=np.int64)
+    combos = np.zeros((1, 0), dtype=np.int32)
+    for price, limit in zip(prices, limits):
+        check_time(start_time, time_limit)
+        if progress is not None:
+            progress.check()
+            progress.states += len(sums)
+        qtys = np.arange(min(limit, budget // price) + 1, dtype=np.int64)
+        new_sums = (sums[:, None] + qtys[None, :] * price).ravel()
+        keep = new_sums <= budget
+        if stats is not None:
+            stats.count('가지치기', len(keep) - int(keep.sum()))
+        parent = np.repeat(np.arange(len(sums)), len(qtys))[keep]
+        combos = np.column_stack([combos[parent], np.tile(qtys, len(sums))[keep]]).astype(np.int32)
+        sums = new_sums[keep]
+    return sums, combos
+
+
+def _match_ranges(right_sorted, need):
+    lo = np.searchsorted(right_sorted, need, side='left')
+    hi = np.searchsorted(right_sorted, need, side='right')
+    return lo, hi
+
+
+def solve_meet_in_the_middle(prices, limits, budget, start_time=None, time_limit=None, progress=None,
+                             stats=None):
+    """품목을 두 반쪽으로 나눠 부분합을 나열한 뒤 정렬된 배열 위에서 짝을 맞춤
+
+    예산을 정확히 맞추는 조합이 있으면 그 조합들을, 없으면 예산 이하에서 가장
+    가까운 합계를 내는 조합들을 대상으로
+    (사용 금액, 조합 수, 배치 생성 함수, 나열한 부분합 수)를 돌려줍니다.
+    배치 생성 함수는 부를 때마다 조합을 품목 순서대로 사전순인 배치로 새로 흘려보내므로
+    DP 역추적 결과와 순서가 같습니다.
+    progress(SolveProgress)를 주면 반쪽마다 진행 상황을 갱신하고 취소 여부를 확인합니다.
+    stats(SolveStats)를 주면 나열·짝 맞추기 시간과 가지치기 수를 기록합니다.
+    가장 가까운 금액을 비트셋으로 미리 확인했으면 그 금액으로 한 번만 짝을 맞추고,
+    오른쪽 품목들의 최대 금액과 단가 최대공약수로 짝이 될 수 없는 왼쪽 합은 미리 버립니다.
+    """
+    split, _ = choose_split(prices, limits, budget)
+    proven = proven_best_spend(prices, limits, budget)
+    with measure(stats, PHASE_COUNT):
+        left_sums, left_combos = enumerate_half(
+            prices[:split], limits[:split], budget, start_time, time_limit, progress, stats)
+        if progress is not None:
+            progress.fraction = 0.4
+        right_sums, right_combos = enumerate_half(
+            prices[split:], limits[split:], budget, start_time, time_limit, progress, stats)
+        if progress is not None:
+            progress.fraction = 0.8
+    state_count = len(left_sums) + len(right_sums)
+
+    with measure(stats, PHASE_CLOSEST):
+        target = budget if proven is None else proven
+        if proven is not None and split < len(prices):
+            # 왼쪽 행만 골라내므로 남은 왼쪽 조합의 사전순은 그대로입니다.
+            max_spend, gcds = suffix_bounds(prices, limits, budget)
+            need = target - left_sums
+            keep = (need >= 0) & (need <= max_spend[split]) & (need % gcds[split] == 0)
+            if stats is not None:
+                stats.count('가지치기', len(keep) - int(keep.sum()))
+            left_sums, left_combos = left_sums[keep], left_combos[keep]
+        order = np.argsort(right_sums, kind='stable')
+        right_sorted = right_sums[order]
+        lo, hi = _match_ranges(right_sorted, target - left_sums)
+        if proven is None and not np.any(hi > lo):
+            # 정확히 맞는 짝이 없으면 왼쪽 합마다 남은 예산 이하의 가장 큰 오른쪽 합을 붙여 봅니다.
+            # (오른쪽에는 항상 0원 조합이 있으므로 hi >= 1 입니다.)
+            target = int((left_sums + right_sorted[hi - 1]).max())
+            lo, hi = _match_ranges(right_sorted, target - left_sums)
+
+    counts = hi - lo
+    left_idx = np.nonzero(counts)[0]
+    if progress is not None:
+        progress.solutions = int(counts.sum())
+        progress.fraction = 1.0
+
+    def batches():
+        # 왼쪽 조합은 사전순으로 나열되어 있으므로 왼쪽 묶음 단위로만 정렬해도 전체가 사전순입니다.
+        for begin in range(0, len(left_idx), JOIN_CHUNK):
+            chunk = left_idx[begin:begin + JOIN_CHUNK]
+            chunk_counts = counts[chunk]
+            rows = np.repeat(chunk, chunk_counts)
+            offsets = np.arange(chunk_counts.sum()) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+            right_idx = order[np.repeat(lo[chunk], chunk_counts) + offsets]
+            block = np.hstack([left_combos[rows], right_combos[right_idx]]).astype(np.int64)
+            yield block[np.lexsort(block.T[::-1])]
+
+    return target, int(counts.sum()), batches, state_count
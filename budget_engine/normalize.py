@@ -0,0 +1,24 @@
+import math
+from functools import reduce
+
+
+def normalize_by_gcd(prices, budget):
+    """단가들의 최대공약수로 단가와 예산을 나눔
+
+    (최대공약수, 나눈 단가 리스트, 나눈 예산, 나머지)를 돌려줍니다.
+    나머지가 0이 아니면 어떤 구매 조합도 예산을 정확히 맞출 수 없습니다.
+    구매 수량은 단위와 상관이 없으므로 결과를 되돌릴 때 단가만 원래 값을 쓰면 됩니다.
+    """
+    unit = reduce(math.gcd, prices)
+    unit_prices = [price // unit for price in prices]
+    return unit, unit_prices, budget // unit, budget % unit
+
+
+def describe_reduction(unit, residue):
+    """최대공약수 정규화 결과를 결과 출력용 문장으로 만듦"""
+    text_out = ''
+    if unit > 1:
+        text_out += f'단가의 최대공약수 {unit:,d}원 단위로 계산해 탐색 범위를 1/{unit:,d}로 줄였습니다.\n'
+    if residue:
+        text_out += f'남은 예산이 {unit:,d}원 단위로 나누어떨어지지 않아(나머지 {residue:,d}원) 정확히 맞출 수 없습니다.\n'
+    return text_out
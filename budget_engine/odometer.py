@@ -0,0 +1,276 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from .bounds import can_finish, fewest_to_finish, suffix_bounds
+from .dense_dp import check_time
+from .feasibility import proven_best_spend
+from .matrix import SolutionMatrix, quantity_dtype
+
+# 시간 제한을 검사하는 케이스 간격
+TIME_CHECK_INTERVAL = 4096
+# 프로세스 하나당 나눠 줄 첫 품목 수량 구간 수 (구간마다 일의 양이 달라 잘게 나눕니다)
+SHARDS_PER_WORKER = 4
+# odometer_search 의 탐색 방식: 정확히 맞출 수 없는 가지를 건너뛰며 잔액 0인 계획만 찾기,
+# 건너뛰지 않고 전부 돌며 잔액이 남는 계획까지 모으기 (None 이면 스스로 정함)
+SEARCH_EXACT = 'exact'
+SEARCH_ALL = 'all'
+
+
+def max_quantity(prices, limits, budget):
+    """탐색 중 나올 수 있는 가장 큰 수량 (계획 행렬의 정수 타입을 고를 때 씀)"""
+    return max(min(limit, budget // price) for price, limit in zip(prices, limits))
+
+
+def exact_search_mode(prices, limits, budget, max_spend, gcds):
+    """정확히 맞출 수 없는 가지를 건너뛰며 탐색할지와, 정확한 계획이 있다고 증명되었는지
+
+    정확한 계획이 없다고 증명되면 잔액이 남는 계획을 모아야 하므로 건너뛰지 않습니다.
+    예산이 커서 증명하지 못하면 일단 건너뛰며 찾고, 못 찾으면 전부 다시 돕니다.
+    """
+    best_spend = proven_best_spend(prices, limits, budget)
+    proven = best_spend is not None and best_spend == budget
+    disproven = (best_spend is not None and best_spend < budget) or not can_finish(max_spend, gcds, 0, budget)
+    return not disproven, proven
+
+
+def odometer_search(prices, limits, budget, first_qtys=None, start_time=None, time_limit=None, progress=None,
+                    stats=None, search=None):
+    """앞 품목부터 수량을 하나씩 올려 보는 오도미터 완전 탐색
+
+    마지막 품목은 '남은 예산 // 단가'(구매 제한 이내)로 정합니다.
+    first_qtys 로 첫 품목의 수량 범위를 좁힐 수 있습니다(병렬 분할용).
+    (검토한 케이스 수, 잔액 0인 계획 행렬, 잔액이 남는 계획 행렬)을 돌려주며,
+    잔액 0인 계획이 하나라도 있으면 잔액이 남는 계획은 비워서 돌려줍니다.
+    정확한 계획을 찾는 동안은 뒤 품목들의 최대 금액이 남은 예산에 못 미치거나 남은 예산이
+    뒤 품목 단가들의 최대공약수로 나누어떨어지지 않는 가지를 건너뜁니다. (stats 에 '가지치기'로 셈)
+    progress(SolveProgress)를 주면 검토한 케이스 수를 갱신하고 취소 여부를 확인합니다.
+    search 에 SEARCH_EXACT 나 SEARCH_ALL 을 주면 그 방식으로 한 번만 돕니다. (병렬 분할처럼
+    첫 품목 수량 범위 일부만 볼 때는 전체 문제 기준으로 정해 넘겨야 합니다)
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    last = item_count - 1
+    if first_qtys is None:
+        first_qtys = range(min(limits[0], budget // prices[0]) + 1)
+    quantities = [0] * item_count
+    # 계획은 리스트 대신 미리 잡아 둔 정수 행렬에 바로 씁니다.
+    dtype = quantity_dtype(max_quantity(prices, limits, budget))
+    cases_exact, cases_close = SolutionMatrix(item_count, dtype), SolutionMatrix(item_count, dtype)
+    cases_count = 0
+    pruned = 0
+    max_spend, gcds = suffix_bounds(prices, limits, budget)
+
+    def descend_exact(idx, remaining):
+        # 정확히 맞출 수 있는 가지만 내려가므로 마지막 품목에 닿으면 항상 잔액 0입니다.
+        nonlocal cases_count, pruned
+        if idx == last:
+            quantities[last] = remaining // prices[last]
+            cases_count += 1
+            if cases_count % TIME_CHECK_INTERVAL == 0:
+                check_time(start_time, time_limit)
+                if progress is not None:
+                    progress.check()
+                    progress.states = cases_count
+            cases_exact.append(quantities)
+            return
+        price = prices[idx]
+        qtys = first_qtys if idx == 0 else range(min(limits[idx], remaining // price) + 1)
+        # 이보다 적게 사면 뒤 품목을 모두 사도 남은 예산을 다 쓸 수 없습니다.
+        fewest = fewest_to_finish(max_spend, idx, remaining, price)
+        if fewest > qtys.start:
+            pruned += min(fewest, qtys.stop) - qtys.start
+            qtys = range(fewest, qtys.stop)
+        for qty in qtys:
+            next_remaining = remaining - qty * price
+            if not can_finish(max_spend, gcds, idx + 1, next_remaining):
+                pruned += 1
+                continue
+            quantities[idx] = qty
+            descend_exact(idx + 1, next_remaining)
+
+    def descend(idx, remaining):
+        nonlocal cases_count
+        if idx == last:
+            qty = min(remaining // prices[last], limits[last])
+            quantities[last] = qty
+            cases_count += 1
+            if cases_count % TIME_CHECK_INTERVAL == 0:
+                check_time(start_time, time_limit)
+                if progress is not None:
+                    progress.check()
+                    progress.states = cases_count
+            if remaining == qty * prices[last]:
+                cases_exact.append(quantities)
+            elif not cases_exact:
+                cases_close.append(quantities)
+            return
+        qtys = first_qtys if idx == 0 else range(min(limits[idx], remaining // prices[idx]) + 1)
+        for qty in qtys:
+            quantities[idx] = qty
+            descend(idx + 1, remaining - qty * prices[idx])
+
+    if search == SEARCH_EXACT:
+        descend_exact(0, budget)
+    elif search == SEARCH_ALL:
+        descend(0, budget)
+    else:
+        prune, proven = exact_search_mode(prices, limits, budget, max_spend, gcds)
+        if prune:
+            descend_exact(0, budget)
+        if not cases_exact and not proven:
+            # 정확한 계획이 없으면 잔액이 남는 계획까지 모으도록 건너뛰지 않고 전부 돕니다.
+            descend(0, budget)
+    if stats is not None:
+        stats.count('가지치기', pruned)
+    if cases_exact:
+        cases_close = SolutionMatrix(item_count, dtype, 1)
+    return cases_count, cases_exact, cases_close
+
+
+def array_odometer_search(prices, limits, budget, start_time=None, time_limit=None, stats=None):
+    """NumPy 배열에 수량과 잔액을 담아 while 루프로 도는 오도미터 (core_upgrade.py 의 엔진)
+
+    매 케이스마다 잔액 배열 전체를 다시 계산하고 시간을 검사합니다.
+    정확한 계획을 찾는 동안은 odometer_search 와 같은 기준으로 뒤 품목들이 남은 예산을
+    정확히 쓸 수 없는 자리를 찾아 그 자리의 수량을 바로 올립니다. (stats 에 '가지치기'로 셈)
+    (검토한 케이스 수, 잔액 0인 계획 행렬, 잔액이 남는 계획 행렬)을 돌려줍니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    limits = np.asarray(limits)
+    last_index = item_count - 1
+    last_node = last_index - 1
+    dtype = quantity_dtype(max_quantity(prices, limits, budget))
+    cases_exact = SolutionMatrix(item_count, dtype)
+    cases_close = SolutionMatrix(item_count, dtype)
+    max_spend, gcds = suffix_bounds(prices, limits, budget)
+    pruned = 0
+
+    def run(prune):
+        nonlocal pruned
+        quantities = np.zeros(item_count, dtype=int)
+        balances = np.zeros(item_count, dtype=int)
+        node = last_node
+        is_overrun = False
+        cases_count = 0
+
+        while not (node == -1 and is_overrun == True):
+            execution_time = time.time() - start_time
+            if time_limit is not None and execution_time > time_limit:
+                raise TimeoutError(f"시간초과 에러 {execution_time:,.4f}초 경과")
+
+            balances[-1] = budget
+            for n in range(last_index):
+                balances[n] = balances[n - 1] - (quantities[n] * prices[n])
+
+            quantities[last_index] = min(
+                balances[last_index - 1] // prices[last_index], limits[last_index])
+            balances[last_index] = balances[last_index - 1] - \
+                (quantities[last_index] * prices[last_index])
+
+            if any(quantities[i] > limits[i] for i in range(item_count)):
+                is_overrun = True
+                quantities[node] = 0
+                node -= 1
+            elif any(balances < 0):
+                is_overrun = True
+                quantities[node] = 0
+                node -= 1
+            else:
+                is_overrun = False
+                node = last_node
+                # 가장 앞쪽의 막힌 자리를 찾아 그 뒤 수량을 비우고 그 자리부터 다시 올립니다.
+                dead = next((k for k in range(last_index) if not can_finish(max_spend, gcds, k + 1, balances[k])),
+                            None) if prune else None
+                if dead is not None:
+                    pruned += 1
+                    quantities[dead + 1:last_index] = 0
+                    node = dead
+                elif balances[last_index] == 0:
+                    cases_exact.append(quantities)
+                elif cases_exact:
+                    pass
+                else:
+                    cases_close.append(quantities)
+
+            quantities[node] += 1
+            cases_count += 1
+
+        return cases_count + 1
+
+    prune, proven = exact_search_mode(prices, limits, budget, max_spend, gcds)
+    cases_count = run(True) if prune else 0
+    if not cases_exact and not proven:
+        # 정확한 계획이 없으면 잔액이 남는 계획까지 모으도록 건너뛰지 않고 전부 돕니다.
+        cases_count += run(False)
+    if stats is not None:
+        stats.count('가지치기', pruned)
+    return cases_count, cases_exact, cases_close
+
+
+def _odometer_shard(args):
+    """프로세스 풀 작업 단위: 첫 품목 수량 구간 하나를 탐색하고 걸린 시간을 함께 돌려줌"""
+    prices, limits, budget, first_qtys, start_time, time_limit, search = args
+    shard_start = time.time()
+    cases_count, cases_exact, cases_close = odometer_search(prices, limits, budget, first_qtys, start_time, time_limit,
+                                                            search=search)
+    # 채운 부분만 돌려보내 프로세스 사이에 주고받는 양을 줄입니다.
+    return cases_count, cases_exact.rows, cases_close.rows, time.time() - shard_start
+
+
+def shard_ranges(count, parts):
+    """0..count-1 을 연속된 parts 개 구간으로 나눔"""
+    parts = max(1, min(parts, count))
+    step, extra = divmod(count, parts)
+    ranges, begin = [], 0
+    for part in range(parts):
+        end = begin + step + (1 if part < extra else 0)
+        ranges.append(range(begin, end))
+        begin = end
+    return ranges
+
+
+def parallel_odometer_search(prices, limits, budget, workers, start_time=None, time_limit=None):
+    """첫 품목 수량 범위를 나눠 여러 프로세스에서 오도미터 탐색 후 구간 순서대로 합침
+
+    구간 순서대로 이어 붙이므로 결과는 odometer_search 와 같은 순서입니다.
+    가지를 건너뛸지는 나누기 전에 전체 문제로 한 번 정하고, 건너뛰며 찾은 정확한 계획이
+    모든 구간을 합쳐 하나도 없을 때만 건너뛰지 않고 다시 돕니다.
+    (검토한 케이스 수, 잔액 0인 계획, 잔액이 남는 계획, 속도 향상 배수)를 돌려줍니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    wall_start = time.time()
+    first_count = min(limits[0], budget // prices[0]) + 1
+    shards = shard_ranges(first_count, workers * SHARDS_PER_WORKER)
+    prune, proven = exact_search_mode(prices, limits, budget, *suffix_bounds(prices, limits, budget))
+
+    def run(executor, search):
+        jobs = [(list(prices), list(limits), budget, shard, start_time, time_limit, search) for shard in shards]
+        return list(executor.map(_odometer_shard, jobs))
+
+    dtype = quantity_dtype(max_quantity(prices, limits, budget))
+    cases_exact, cases_close = SolutionMatrix(len(prices), dtype), SolutionMatrix(len(prices), dtype)
+    exact_results, close_results = [], []
+    # 스트림릿 서버 프로세스를 fork 하지 않도록 spawn 으로 새 인터프리터를 띄웁니다.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+        if prune:
+            exact_results = run(executor, SEARCH_EXACT)
+            for result in exact_results:
+                cases_exact.extend(result[1])
+        if not cases_exact and not proven:
+            # 정확한 계획이 없으면 잔액이 남는 계획까지 모으도록 건너뛰지 않고 전부 돕니다.
+            close_results = run(executor, SEARCH_ALL)
+            for result in close_results:
+                cases_close.extend(result[2])
+
+    results = exact_results + close_results
+    cases_count = sum(result[0] for result in results)
+    busy_time = sum(result[3] for result in results)
+    speedup = busy_time / max(time.time() - wall_start, 1e-9)
+    return cases_count, cases_exact, cases_close, speedup
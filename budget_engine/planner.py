@@ -0,0 +1,139 @@
+from collections import namedtuple
+
+from .dense_dp import INT64_SAFE_BOUND
+from .duplicates import group_by_price
+from .mitm import MITM_MAX_HALF_STATES, choose_split
+from .normalize import normalize_by_gcd
+
+ENGINE_CLOSED_FORM = '두 품목 공식'
+ENGINE_ODOMETER = '오도미터 완전 탐색'
+ENGINE_MEMO_DP = '메모 DP'
+ENGINE_DENSE_DP = 'DP'
+ENGINE_MITM = '반반 맞추기(meet-in-the-middle)'
+
+# 엔진별 작업 단위 하나에 걸리는 시간(초)
+# 1코어 개발 컨테이너에서 잰 값으로, 느린 컴퓨터에서도 크게 빗나가지 않도록 조금 넉넉히 잡았습니다.
+ODOMETER_SEC_PER_CASE = 1.5e-6       # 오도미터 케이스 하나 (파이썬 재귀)
+MEMO_DP_SEC_PER_STEP = 4.0e-7        # 메모 DP 상태 하나에서 수량 하나 시도
+DENSE_DP_SEC_PER_CELL = 1.7e-8       # 카운트 테이블 칸 하나 (NumPy int64)
+DENSE_DP_OBJECT_SEC_PER_CELL = 6.0e-8  # 카운트 테이블 칸 하나 (해의 개수가 커서 파이썬 정수)
+MITM_SEC_PER_HALF_STATE = 2.2e-7     # 반쪽 부분합 하나 (나열 + 정렬 + 짝 맞추기)
+CLOSED_FORM_SEC_PER_QTY = 1.0e-8     # 두 품목 근사치를 찾을 때 첫 품목 수량 하나
+
+# 조밀한 DP 테이블 칸 수 상한 (넘으면 메모리가 부족하므로 다른 엔진이 있으면 고르지 않습니다)
+DENSE_DP_MAX_CELLS = 200_000_000
+
+# 엔진 하나의 예상 비용 (engine: 엔진 이름, work: 작업 단위 수, seconds: 예상 시간(초))
+EnginePlan = namedtuple('EnginePlan', 'engine work seconds')
+
+
+def quantity_ranges(prices, limits, budget):
+    """품목별로 시도할 수 있는 수량 개수 (구매 제한과 예산 중 작은 쪽 + 1)"""
+    return [min(limit, budget // price) + 1 for price, limit in zip(prices, limits)]
+
+
+def odometer_cases(prices, limits, budget):
+    """오도미터가 검토할 케이스 수의 상한 (마지막 품목은 나눗셈으로 정하므로 제외)"""
+    cases = 1
+    for count in quantity_ranges(prices, limits, budget)[:-1]:
+        cases *= count
+    return cases
+
+
+def memo_dp_steps(prices, limits, budget):
+    """메모 DP 가 시도할 (상태, 수량) 쌍 수의 상한
+
+    idx번째 품목의 상태 수는 앞 품목들의 수량 조합 수와 예산+1 중 작은 쪽을 넘지 않습니다.
+    """
+    steps, prefix = 0, 1
+    for count in quantity_ranges(prices, limits, budget)[:-1]:
+        steps += min(prefix, budget + 1) * count
+        prefix *= count
+    return steps
+
+
+def estimate_plans(prices, limits, budget):
+    """정규화된 문제(단가 내림차순)에 쓸 수 있는 엔진들의 예상 비용을 빠른 순으로 돌려줌
+
+    해를 나열하는 시간은 해의 개수를 알아야 매길 수 있어 넣지 않았습니다. 계획 하나를 꺼내는 시간은
+    엔진마다 달라서(DP 는 품목이 많으면 계획당 십여 µs, 반반 맞추기는 1µs 미만) 계획이 많은 문제를
+    끝까지 나열하면 고른 엔진이 더 느릴 수 있습니다. 화면은 계획을 쪽 단위로만 꺼내므로 개수를 세는
+    시간으로 고르고, 그 차이는 벤치마크가 단계별로 나눠 보여 줍니다.
+    """
+    item_count = len(prices)
+    plans = []
+    if item_count <= 2:
+        work = quantity_ranges(prices, limits, budget)[0]
+        plans.append(EnginePlan(ENGINE_CLOSED_FORM, work, work * CLOSED_FORM_SEC_PER_QTY))
+
+    cases = odometer_cases(prices, limits, budget)
+    plans.append(EnginePlan(ENGINE_ODOMETER, cases, cases * ODOMETER_SEC_PER_CASE))
+
+    steps = memo_dp_steps(prices, limits, budget)
+    plans.append(EnginePlan(ENGINE_MEMO_DP, steps, steps * MEMO_DP_SEC_PER_STEP))
+
+    cells = item_count * (budget + 1)
+    if cells <= DENSE_DP_MAX_CELLS:
+        per_cell = DENSE_DP_SEC_PER_CELL
+        if cases * quantity_ranges(prices, limits, budget)[-1] >= INT64_SAFE_BOUND:
+            per_cell = DENSE_DP_OBJECT_SEC_PER_CELL
+        plans.append(EnginePlan(ENGINE_DENSE_DP, cells, cells * per_cell))
+
+    if item_count >= 2:
+        _, half_states = choose_split(prices, limits, budget)
+        if half_states <= MITM_MAX_HALF_STATES:
+            work = 2 * half_states
+            plans.append(EnginePlan(ENGINE_MITM, work, work * MITM_SEC_PER_HALF_STATE))
+
+    return sorted(plans, key=lambda plan: plan.seconds)
+
+
+def choose_plan(prices, limits, budget, engines=None):
+    """예상 시간이 가장 짧은 엔진 (engines 를 주면 그 안에서만 고름)"""
+    plans = estimate_plans(prices, limits, budget)
+    if engines is not None:
+        plans = [plan for plan in plans if plan.engine in engines]
+    if not plans:
+        reasons = unavailable_engines(prices, limits, budget)
+        detail = ', '.join(f'{engine}: {reasons[engine]}' for engine in engines if engine in reasons)
+        raise ValueError(f'고른 엔진({", ".join(engines)})으로는 풀 수 없는 문제입니다. ({detail})')
+    return plans[0]
+
+
+def unavailable_engines(prices, limits, budget):
+    """estimate_plans 가 빼는 엔진과 그 조건 (고른 엔진이 하나도 남지 않았을 때 안내용)"""
+    item_count = len(prices)
+    reasons = {}
+    if item_count > 2:
+        reasons[ENGINE_CLOSED_FORM] = '품목(같은 단가는 하나로 묶음)이 2개 이하일 때만 씁니다'
+    if item_count * (budget + 1) > DENSE_DP_MAX_CELLS:
+        reasons[ENGINE_DENSE_DP] = f'테이블 칸이 {DENSE_DP_MAX_CELLS:,d}개 이하일 때만 씁니다'
+    if item_count < 2:
+        reasons[ENGINE_MITM] = '품목(같은 단가는 하나로 묶음)이 2개 이상일 때만 씁니다'
+    elif choose_split(prices, limits, budget)[1] > MITM_MAX_HALF_STATES:
+        reasons[ENGINE_MITM] = f'반쪽 부분합이 {MITM_MAX_HALF_STATES:,d}개 이하일 때만 씁니다'
+    return reasons
+
+
+def plan_purchase(budget, prices, base_quantity, limited_quantity, engines=None):
+    """화면에 입력한 그대로의 값으로 계산 전에 엔진과 예상 시간을 정함
+
+    calculate_budget 과 같은 순서로 정렬하고 같은 단가를 묶은 뒤, 정규화하고 기본 구매량을 뺀
+    문제를 기준으로 합니다.
+    """
+    items = sorted(zip(prices, base_quantity, limited_quantity), reverse=True)
+    groups = group_by_price(*map(list, zip(*items)))
+    unit, unit_prices, _, _ = normalize_by_gcd(groups.prices, budget)
+    fixed_budget = sum(price * base for price, base in zip(groups.prices, groups.base_quantity))
+    unit_budget = max(budget - fixed_budget, 0) // unit
+    limits = [limit - base for limit, base in zip(groups.limited_quantity, groups.base_quantity)]
+    return choose_plan(unit_prices, limits, unit_budget, engines)
+
+
+def describe_plan(plan, time_limit=None):
+    """계산 방법과 예상 시간 안내 문구 (제한 시간을 넘을 것 같으면 경고를 덧붙임)"""
+    text = f'계산 방법: {plan.engine} (예상 {plan.seconds:,.2f}초)\n'
+    if time_limit is not None and plan.seconds > time_limit:
+        text += (f'예상 계산 시간이 제한 시간({time_limit:,d}초)을 넘습니다. '
+                 '품목 수나 최대 구매량을 줄이거나 제한 시간을 늘려 보세요.\n')
+    return text
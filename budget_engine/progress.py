@@ -0,0 +1,75 @@
+import threading
+import time
+
+from .dense_dp import check_time
+
+
+class SolveCancelled(Exception):
+    """사용자가 계산을 취소함"""
+
+
+class SolveProgress:
+    """계산 진행 상황(탐색한 상태 수, 찾은 해 수, 진행률)과 취소·시간 제한을 함께 관리
+
+    계산 스레드는 값을 갱신하고 check()로 취소/시간 초과를 확인하며,
+    화면 스레드는 같은 객체를 읽어 진행 상황을 보여 줍니다.
+    """
+
+    def __init__(self, time_limit=None):
+        self.start_time = time.time()
+        self.time_limit = time_limit
+        self.states = 0
+        self.solutions = 0
+        self.fraction = 0.0
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check(self):
+        """취소되었거나 제한 시간을 넘겼으면 예외를 일으킴"""
+        if self.cancelled:
+            raise SolveCancelled("사용자가 계산을 취소했습니다.")
+        check_time(self.start_time, self.time_limit)
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def eta(self):
+        """진행률로 추정한 남은 시간(초), 아직 추정할 수 없으면 None"""
+        if self.fraction <= 0:
+            return None
+        elapsed = self.elapsed()
+        return elapsed * (1 - self.fraction) / self.fraction
+
+
+class BackgroundSolve:
+    """세션에 묶어 두는 백그라운드 계산 작업 (스레드 하나에서 solve_func 실행)
+
+    solve_func 는 progress 키워드 인자로 SolveProgress 를 받아야 합니다.
+    kwargs 로 그 밖의 키워드 인자를 함께 넘길 수 있습니다.
+    """
+
+    def __init__(self, solve_func, args, kwargs=None, time_limit=None):
+        self.progress = SolveProgress(time_limit)
+        self.result = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(solve_func, args, kwargs or {}), daemon=True)
+        self._thread.start()
+
+    def _run(self, solve_func, args, kwargs):
+        try:
+            self.result = solve_func(*args, progress=self.progress, **kwargs)
+        except Exception as e:
+            self.error = e
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    def cancel(self):
+        self.progress.cancel()
@@ -0,0 +1,212 @@
+import heapq
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .dense_dp import check_time, feasible_quantities
+from .duplicates import PriceGroups, expand_group_quantities
+
+# 순위 기준 (점수가 작을수록 좋은 계획)
+RANK_EVEN = '고르게 사기'             # 가장 많이 산 품목과 가장 적게 산 품목의 수량 차이가 작은 순
+RANK_FEWEST_ITEMS = '품목 수 적게'    # 1개 이상 사는 품목 수가 적은 순
+RANK_PREFERRED = '선호 품목 많이'     # preferred 품목을 많이 사는 순
+RANKING_OBJECTIVES = (RANK_EVEN, RANK_FEWEST_ITEMS, RANK_PREFERRED)
+
+# 순위 매기기 설정 (objective: 순위 기준, k: 남길 계획 수, preferred: 선호 품목 번호)
+# solve() 에서는 preferred 가 입력 순서의 품목 번호이고, 엔진 안에서는 정렬·묶음 후 번호입니다.
+Ranking = namedtuple('Ranking', 'objective k preferred', defaults=(None,))
+
+
+def plan_scores(plans, ranking):
+    """실제 수량(기본 구매량 포함) 계획 행렬의 행별 점수 (작을수록 좋음)"""
+    plans = np.asarray(plans)
+    if ranking.objective == RANK_EVEN:
+        return plans.max(axis=1) - plans.min(axis=1)
+    if ranking.objective == RANK_FEWEST_ITEMS:
+        return np.count_nonzero(plans, axis=1)
+    if ranking.objective == RANK_PREFERRED:
+        return -plans[:, ranking.preferred]
+    raise ValueError(f'알 수 없는 순위 기준입니다: {ranking.objective}')
+
+
+def optimistic_score(ranking, prefix, idx, remaining, prices, limits, base_quantity):
+    """앞 idx 개 품목의 실제 수량(prefix)이 정해졌을 때, 뒤를 어떻게 채워도 이보다 좋아질 수 없는 점수"""
+    if ranking.objective == RANK_EVEN:
+        # 남은 품목들이 쓰는 금액(기본 구매량 포함)을 단가 합으로 나눈 평균 수량보다
+        # 큰 품목과 작은 품목이 하나씩은 있으므로, 수량 차이는 그만큼 벌어집니다.
+        highest, lowest = int(prefix[:idx].max()), int(prefix[:idx].min())
+        if idx < len(prices):
+            rest_prices = np.asarray(prices[idx:], dtype=np.int64)
+            rest_base = base_quantity[idx:]
+            spend = remaining + int(rest_prices @ rest_base)
+            price_sum = int(rest_prices.sum())
+            highest = max(highest, -(-spend // price_sum), int(rest_base.max()))
+            lowest = min(lowest, spend // price_sum, int((rest_base + np.asarray(limits[idx:])).min()))
+        return highest - lowest
+    if ranking.objective == RANK_FEWEST_ITEMS:
+        # 이미 산 품목 + 기본 구매량이 있는 남은 품목 (+ 남은 예산을 쓰려면 한 품목은 더 필요)
+        forced = int(np.count_nonzero(base_quantity[idx:]))
+        extra = 1 if remaining > 0 and forced == 0 else 0
+        return int(np.count_nonzero(prefix[:idx])) + forced + extra
+    preferred = ranking.preferred
+    if preferred < idx:
+        return -int(prefix[preferred])
+    return -int(base_quantity[preferred] + min(limits[preferred], remaining // prices[preferred]))
+
+
+class TopPlans:
+    """점수가 가장 좋은 k 개 계획만 들고 있는 힙 (같은 점수면 먼저 넣은 계획이 앞)
+
+    힙 맨 위에는 남긴 계획 중 가장 나쁜 계획이 있어, 들어올 수 있는지 바로 판단합니다.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def full(self):
+        return len(self._heap) >= self.k
+
+    def worst(self):
+        """남긴 계획 중 가장 나쁜 점수 (아직 k 개가 안 되면 None)"""
+        return -self._heap[0][0] if self.full else None
+
+    def push_block(self, plans, scores):
+        """계획 행렬에서 힙에 들어갈 수 있는 행만 넣음"""
+        candidates = np.arange(len(plans))
+        if self.full:
+            candidates = candidates[scores < self.worst()]
+        for row in candidates.tolist():
+            score = int(scores[row])
+            if self.full and score >= -self._heap[0][0]:
+                continue
+            entry = (-score, -self._seq, plans[row].tolist())
+            self._seq += 1
+            if self.full:
+                heapq.heapreplace(self._heap, entry)
+            else:
+                heapq.heappush(self._heap, entry)
+
+    def sorted_plans(self, item_count):
+        """좋은 순서(점수, 넣은 순서)로 정렬한 (계획 행렬, 점수)"""
+        entries = sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))
+        plans = np.array([entry[2] for entry in entries], dtype=np.int64).reshape(-1, item_count)
+        scores = np.array([-entry[0] for entry in entries], dtype=np.int64)
+        return plans, scores
+
+
+def top_k_plans(tables, prices, limits, budget, base_quantity, ranking,
+                start_time=None, time_limit=None, stats=None):
+    """카운트 테이블을 따라 budget 을 정확히 쓰는 계획 중 점수가 가장 좋은 k 개를 찾음
+
+    iter_solution_batches 와 같은 사전순으로 내려가되, 힙이 찼을 때 낙관적 점수가
+    힙의 가장 나쁜 점수보다 좋지 않은 가지는 내려가지 않습니다. (들고 있는 계획은 k 개뿐)
+    돌려주는 계획은 기본 구매량(base_quantity)을 더한 실제 수량입니다.
+    """
+    if start_time is None:
+        start_time = time.time()
+    item_count = len(prices)
+    base_quantity = np.asarray(base_quantity, dtype=np.int64)
+    top = TopPlans(ranking.k)
+    if tables[0][budget] == 0 or ranking.k <= 0:
+        return top.sorted_plans(item_count)
+    prefix = np.zeros(item_count, dtype=np.int64)
+    tail_idx = max(item_count - 2, 0)
+
+    def walk(idx, remaining):
+        qtys = feasible_quantities(tables, prices, limits, idx, remaining)
+        if idx == tail_idx:
+            # 마지막 두 품목은 한 번에 만들어 점수를 매깁니다.
+            block = np.empty((len(qtys), item_count), dtype=np.int64)
+            block[:, :idx] = prefix[:idx]
+            block[:, idx] = qtys + base_quantity[idx]
+            if idx + 1 < item_count:
+                block[:, idx + 1] = (remaining - qtys * prices[idx]) // prices[idx + 1] + base_quantity[idx + 1]
+            top.push_block(block, plan_scores(block, ranking))
+            return
+        for qty in qtys.tolist():
+            check_time(start_time, time_limit)
+            prefix[idx] = qty + base_quantity[idx]
+            next_remaining = remaining - qty * prices[idx]
+            if top.full and optimistic_score(ranking, prefix, idx + 1, next_remaining,
+                                             prices, limits, base_quantity) >= top.worst():
+                if stats is not None:
+                    stats.count('순위 가지치기')
+                continue
+            walk(idx + 1, next_remaining)
+
+    walk(0, budget)
+    return top.sorted_plans(item_count)
+
+
+def top_k_from_batches(batches, item_count, ranking, start_time=None, time_limit=None):
+    """이미 나열한 계획 배치(실제 수량)에서 점수가 가장 좋은 k 개만 남김 (카운트 테이블이 없을 때)"""
+    if start_time is None:
+        start_time = time.time()
+    top = TopPlans(ranking.k)
+    if ranking.k > 0:
+        for batch in batches:
+            check_time(start_time, time_limit)
+            top.push_block(batch, plan_scores(batch, ranking))
+    return top.sorted_plans(item_count)
+
+
+def split_group_plans(plans, groups, base_quantity, limited_quantity, ranking):
+    """묶음 단위 계획(실제 수량)을 순위 기준에 가장 유리하게 품목별로 나눔 (품목 단위 테이블이 없을 때)
+
+    고르게 사기는 묶음 안에서 수량을 최대한 고르게(물 채우듯) 나누고, 선호 품목 많이는 선호 품목부터,
+    품목 수 적게는 이미 사야 하는 품목과 많이 담을 수 있는 품목부터 채웁니다.
+    ranking.preferred 는 정렬 후의 품목 번호입니다.
+    """
+    if ranking.objective == RANK_EVEN:
+        return even_group_quantities(plans, groups, base_quantity, limited_quantity)
+    base = np.asarray(base_quantity, dtype=np.int64)
+    room = np.asarray(limited_quantity, dtype=np.int64) - base
+    members = []
+    for group_members in groups.members:
+        if ranking.objective == RANK_PREFERRED:
+            order = sorted(group_members, key=lambda idx: idx != ranking.preferred)
+        else:
+            order = sorted(group_members, key=lambda idx: (base[idx] == 0, -room[idx]))
+        members.append(order)
+    # 앞 품목부터 채우는 규칙은 그대로 두고 채우는 순서만 바꿉니다.
+    reordered = PriceGroups(groups.prices, groups.base_quantity, groups.limited_quantity, members)
+    return expand_group_quantities(plans, reordered, base_quantity, limited_quantity)
+
+
+def even_group_quantities(plans, groups, base_quantity, limited_quantity):
+    """묶음 수량을 품목별 구매 범위 안에서 가장 고르게 나눔
+
+    묶음마다 clip(L, 기본, 최대)의 합이 묶음 수량을 넘지 않는 가장 큰 L 을 찾고,
+    남는 수량은 L+1 까지 올릴 수 있는 앞 품목들에 하나씩 더합니다.
+    이렇게 나누면 묶음 안의 가장 큰 수량은 가장 작고, 가장 작은 수량은 가장 큽니다.
+    """
+    plans = np.asarray(plans, dtype=np.int64)
+    base = np.asarray(base_quantity, dtype=np.int64)
+    limit = np.asarray(limited_quantity, dtype=np.int64)
+    expanded = np.empty((len(plans), len(base)), dtype=np.int64)
+    for group, members in enumerate(groups.members):
+        total = plans[:, group]
+        low_bound, high_bound = base[members], limit[members]
+        low = np.full(len(plans), low_bound.min(), dtype=np.int64)
+        high = np.full(len(plans), high_bound.max(), dtype=np.int64)
+        while True:
+            active = low < high
+            if not active.any():
+                break
+            middle = (low + high + 1) // 2
+            fits = np.clip(middle[:, None], low_bound, high_bound).sum(axis=1) <= total
+            low = np.where(active & fits, middle, low)
+            high = np.where(active & ~fits, middle - 1, high)
+        quantities = np.clip(low[:, None], low_bound, high_bound)
+        left = total - quantities.sum(axis=1)
+        can_raise = (low_bound <= low[:, None]) & (low[:, None] < high_bound)
+        raise_order = np.cumsum(can_raise, axis=1)
+        expanded[:, members] = quantities + (can_raise & (raise_order <= left[:, None]))
+    return expanded
@@ -0,0 +1,56 @@
+import random
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from .unranking import level_prefix_sums, unrank_plans
+
+# 무작위 표본 설정 (size: 뽑을 계획 수, seed: 같은 표본을 다시 얻고 싶을 때 주는 값)
+Sampling = namedtuple('Sampling', 'size seed', defaults=(None,))
+
+
+def sample_plans(tables, prices, limits, budget, sample_size, seed=None):
+    """budget 을 정확히 쓰는 계획 중 sample_size 개를 고르게(중복 없이) 무작위로 뽑음
+
+    전체 계획 수 안에서 서로 다른 번호를 뽑아 unrank_plans 로 복원하므로
+    해가 아무리 많아도 나열하지 않습니다. 같은 seed 면 같은 계획들이 나오며,
+    뽑은 계획은 사전순으로 정렬해 돌려줍니다.
+    """
+    ranks = sample_ranks(int(tables[0][budget]), sample_size, seed)
+    if not ranks:
+        return np.zeros((0, len(prices)), dtype=np.int64)
+    return unrank_plans(tables, level_prefix_sums(tables, prices), prices, limits, budget, ranks)
+
+
+def sample_ranks(total, sample_size, seed=None):
+    """0..total-1 에서 sample_size 개의 서로 다른 번호를 고르게 뽑아 오름차순으로 돌려줌"""
+    if total <= 0 or sample_size <= 0:
+        return []
+    rng = random.Random(seed)
+    if total <= sys.maxsize:
+        # random.sample 은 range 가 아무리 커도 뽑을 개수만큼만 일합니다.
+        return sorted(rng.sample(range(total), min(sample_size, total)))
+    # range 의 길이가 C 정수를 넘으면 random.sample 을 쓸 수 없으므로, 겹치지 않을 때까지 하나씩 뽑습니다.
+    # (전체가 이만큼 크면 겹칠 일이 거의 없습니다)
+    ranks = set()
+    while len(ranks) < sample_size:
+        ranks.add(rng.randrange(total))
+    return sorted(ranks)
+
+
+def reservoir_sample(batches, item_count, sample_size, seed=None):
+    """나열한 계획 배치에서 sample_size 개를 고르게 뽑음 (카운트 테이블이 없을 때, 저수지 표본 추출)"""
+    rng = random.Random(seed)
+    reservoir, seen = [], 0
+    for batch in batches:
+        for row in batch.tolist():
+            if len(reservoir) < sample_size:
+                reservoir.append((seen, row))
+            else:
+                slot = rng.randrange(seen + 1)
+                if slot < sample_size:
+                    reservoir[slot] = (seen, row)
+            seen += 1
+    reservoir.sort()
+    return np.array([row for _, row in reservoir], dtype=np.int64).reshape(-1, item_count)
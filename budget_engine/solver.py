@@ -0,0 +1,153 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .closed_form import solve_closed_form
+from .dense_dp import build_count_tables, closest_reachable, count_states, iter_solution_batches
+from .feasibility import proven_best_spend
+from .matrix import plan_totals
+from .memo_dp import solve_memo_dp
+from .mitm import solve_meet_in_the_middle
+from .odometer import odometer_search
+from .planner import (
+    ENGINE_CLOSED_FORM,
+    ENGINE_MEMO_DP,
+    ENGINE_MITM,
+    ENGINE_ODOMETER,
+    choose_plan,
+)
+from .stats import PHASE_CLOSEST, PHASE_COUNT, PHASE_PLAN, measure
+from .stream import SolutionStream
+from .unranking import PlanIndex
+
+# 엔진이 돌려주는 결과
+# solver_name: 사용한 엔진 이름, best_spend: 계획들이 쓰는 금액(단위), case_count: 계획 수,
+# exact: 예산을 정확히 맞췄는지, batch_factory: 부를 때마다 계획 배치를 새로 흘려보내는 함수,
+# state_count: 탐색한 상태 수,
+# index: 계획을 사전순 번호로 바로 꺼내는 PlanIndex (카운트 테이블을 만든 DP 엔진만, 나머지는 None)
+SolveResult = namedtuple(
+    'SolveResult', 'solver_name best_spend case_count exact batch_factory state_count index',
+    defaults=(None,))
+
+# 메모 DP 의 메모 딕셔너리 항목 하나가 차지하는 대략의 용량 (정수 키 + (금액, 계획 수) 튜플 + 해시 칸)
+MEMO_ENTRY_BYTES = 200
+
+
+def solve_normalized(unit_prices, limits, unit_budget, exact_possible=True,
+                     start_time=None, time_limit=None, progress=None, plan=None, stats=None, level_cache=None):
+    """정규화된 문제(단가 내림차순, 기본 구매량을 뺀 수량 범위)를 알맞은 엔진으로 풂
+
+    plan(EnginePlan)을 주지 않으면 플래너가 예상 시간이 가장 짧은 엔진을 고릅니다.
+    stats(SolveStats)를 주면 단계별 시간과 엔진 카운터를 기록합니다.
+    level_cache(ResultCache)를 주면 DP 엔진이 바뀌지 않은 품목 단계의 테이블을 다시 씁니다.
+    정확한 계획이 있으면 그 계획들을, 없으면(또는 exact_possible 이 False 이면)
+    예산 이하에서 가장 가까운 금액의 계획들을 돌려줍니다.
+    """
+    if plan is None:
+        with measure(stats, PHASE_PLAN):
+            plan = choose_plan(unit_prices, limits, unit_budget)
+
+    index = None
+    if plan.engine == ENGINE_CLOSED_FORM:
+        with measure(stats, PHASE_COUNT):
+            best_spend, case_count, batch_factory, state_count = solve_closed_form(
+                unit_prices, limits, unit_budget)
+    elif plan.engine == ENGINE_ODOMETER:
+        with measure(stats, PHASE_COUNT):
+            best_spend, case_count, batch_factory, state_count = solve_odometer(
+                unit_prices, limits, unit_budget, start_time, time_limit, progress, stats)
+    elif plan.engine == ENGINE_MEMO_DP:
+        best_spend, case_count, batch_factory, state_count = solve_memo_dp(
+            unit_prices, limits, unit_budget, start_time, time_limit, progress, stats)
+    elif plan.engine == ENGINE_MITM:
+        # 품목이 많고 품목당 수량 범위가 작으면 두 반쪽의 부분합을 맞춰 보는 편이 빠릅니다.
+        best_spend, case_count, batch_factory, state_count = solve_meet_in_the_middle(
+            unit_prices, limits, unit_budget, start_time, time_limit, progress, stats)
+    else:
+        tables, best_spend = dense_dp_tables(unit_prices, limits, unit_budget, start_time, time_limit,
+                                             progress, stats, level_cache)
+        # DP 엔진의 계획 순서는 사전순이므로 번호로 바로 꺼낼 수 있습니다.
+        index = PlanIndex(tables, unit_prices, limits, best_spend)
+        best_spend, case_count, batch_factory, state_count = dense_dp_result(tables, unit_prices, limits,
+                                                                             best_spend)
+    if progress is not None:
+        progress.solutions = case_count
+    if stats is not None:
+        stats.count('상태 수', state_count)
+
+    exact = exact_possible and best_spend == unit_budget
+    return SolveResult(plan.engine, best_spend, case_count, exact, batch_factory, state_count, index)
+
+
+def solve_dense_dp(unit_prices, limits, unit_budget, start_time=None, time_limit=None, progress=None,
+                   stats=None):
+    """남은 예산 크기의 카운트 테이블을 품목 단위로 쌓아 해의 개수를 세는 엔진"""
+    tables, best_spend = dense_dp_tables(unit_prices, limits, unit_budget, start_time, time_limit,
+                                         progress, stats)
+    return dense_dp_result(tables, unit_prices, limits, best_spend, start_time, time_limit, progress)
+
+
+def dense_dp_tables(unit_prices, limits, unit_budget, start_time=None, time_limit=None, progress=None,
+                    stats=None, level_cache=None):
+    """카운트 테이블과 예산 이하로 만들 수 있는 가장 큰 금액(단위)"""
+    with measure(stats, PHASE_COUNT):
+        tables = build_count_tables(unit_prices, limits, unit_budget, start_time, time_limit, progress,
+                                    level_cache, stats)
+    # 같은 테이블에서 예산 이하로 만들 수 있는 가장 큰 금액을 읽습니다.
+    # (정확한 해가 불가능하다고 증명되어 있으면 이 금액이 곧 근사치입니다.)
+    with measure(stats, PHASE_CLOSEST):
+        best_spend = closest_reachable(tables, unit_budget)
+    return tables, best_spend
+
+
+def dense_dp_result(tables, unit_prices, limits, best_spend, start_time=None, time_limit=None, progress=None):
+    """카운트 테이블에서 (사용 금액, 계획 수, 배치 생성 함수, 상태 수)
+
+    start_time, time_limit, progress 를 주면 배치를 복원하는 동안에도 제한 시간과 취소를 검사합니다.
+    (화면에서 나중에 다시 꺼내 쓰는 결과에는 주지 않습니다.)
+    """
+    def batch_factory():
+        return iter_solution_batches(tables, unit_prices, limits, best_spend,
+                                     start_time=start_time, time_limit=time_limit, progress=progress)
+
+    return best_spend, int(tables[0][best_spend]), batch_factory, count_states(tables)
+
+
+def solve_odometer(unit_prices, limits, unit_budget, start_time=None, time_limit=None, progress=None,
+                   stats=None):
+    """오도미터 완전 탐색 엔진 (케이스가 아주 적을 때)
+
+    잔액이 남는 계획 중에서는 가장 많이 쓰는 계획만 남깁니다.
+    예산 이하로 만들 수 있는 가장 큰 금액을 비트셋으로 미리 확인했으면 그 금액을 정확히
+    쓰는 계획만 찾으므로, 잔액이 남는 계획들을 모으며 끝까지 돌지 않습니다.
+    """
+    target = proven_best_spend(unit_prices, limits, unit_budget)
+    if target is None:
+        target = unit_budget
+    cases_count, cases_exact, cases_close = odometer_search(
+        unit_prices, limits, target, None, start_time, time_limit, progress, stats)
+    cases = (cases_exact or cases_close).rows
+    spent = plan_totals(cases, unit_prices)
+    best_spend = int(spent.max())
+    cases = cases[spent == best_spend]
+    stream = SolutionStream.from_cases(cases, np.zeros(len(unit_prices), dtype=np.int64))
+    return best_spend, len(cases), stream.batches, cases_count
+
+
+def approx_result_bytes(result, item_count):
+    """결과가 붙잡고 있는 메모리 용량 추정 (캐시 용량 제한용)
+
+    DP 엔진은 카운트 테이블과(만들었으면) PlanIndex 의 누적합을 배열 크기대로 재고,
+    메모 DP 는 메모 딕셔너리 항목 수, 오도미터는 모아 둔 계획 행렬 크기로 잽니다.
+    """
+    if result.index is not None:
+        return result.index.nbytes
+    if result.solver_name == ENGINE_MEMO_DP:
+        # 딕셔너리 항목 하나가 키와 (금액, 계획 수) 튜플까지 약 200바이트를 차지합니다.
+        return result.state_count * MEMO_ENTRY_BYTES
+    if result.solver_name == ENGINE_MITM:
+        # 두 반쪽의 부분합(int64)과 작은 정수 타입의 조합 행렬, 짝 맞춤용 정렬 순서·범위 배열
+        return result.state_count * (16 + 2 * item_count)
+    if result.solver_name == ENGINE_ODOMETER:
+        return result.case_count * 8 * item_count
+    return 0
@@ -0,0 +1,88 @@
+import json
+import time
+from contextlib import contextmanager
+
+# 단계 이름 (화면과 로그에 이 이름으로 나옵니다)
+PHASE_SORT = '정렬·정규화'
+PHASE_PLAN = '엔진 고르기'
+PHASE_COUNT = '개수 세기'
+PHASE_CLOSEST = '근사치 찾기'
+PHASE_RECONSTRUCT = '계획 복원'
+PHASE_RANK = '순위 매기기'
+PHASE_SAMPLE = '표본 뽑기'
+PHASE_DISTRIBUTION = '수량 분포'
+PHASE_REPORT = '보고서 만들기'
+PHASE_DATAFRAME = '표 만들기'
+PHASE_EXCEL = '엑셀 만들기'
+
+
+class SolveStats:
+    """계산 한 번의 단계별 시간(초)과 카운터(호출 수, 메모 적중, 가지치기, 최대 메모 크기 등)
+
+    같은 단계를 여러 번 재면 시간이 더해집니다. to_dict()로 JSON 에 쓸 수 있는 값을 얻습니다.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self.info = {}
+        self.logged = False
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def peak(self, name, value):
+        self.counters[name] = max(self.counters.get(name, 0), value)
+
+    def to_dict(self):
+        return {
+            'info': dict(self.info),
+            'timings': {name: round(seconds, 6) for name, seconds in self.timings.items()},
+            'counters': dict(self.counters),
+        }
+
+
+@contextmanager
+def measure(stats, name):
+    """stats 가 None 이어도 쓸 수 있는 phase()"""
+    if stats is None:
+        yield None
+    else:
+        with stats.phase(name):
+            yield stats
+
+
+def append_stats_log(path, stats, **fields):
+    """계산 통계를 JSON-lines 로그 파일 끝에 한 줄 덧붙임 (fields 는 함께 남길 값)"""
+    record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields, **stats.to_dict()}
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def timed_batches(batch_factory, stats):
+    """batch_factory 가 배치를 만드는 데 쓴 시간을 '계획 복원' 단계로 기록하는 배치 생성 함수
+
+    통계를 로그에 남긴 뒤(stats.logged)에 다시 꺼내는 배치는 기록하지 않습니다.
+    """
+    def factory():
+        if stats.logged:
+            yield from batch_factory()
+            return
+        batches = iter(batch_factory())
+        while True:
+            with stats.phase(PHASE_RECONSTRUCT):
+                batch = next(batches, None)
+            if batch is None:
+                return
+            stats.count('복원한 계획 수', len(batch))
+            yield batch
+
+    return factory
@@ -0,0 +1,121 @@
+import numpy as np
+
+from .dense_dp import SOLUTION_BATCH_SIZE
+
+
+class SolutionStream:
+    """구매 계획을 배치 단위로 몇 번이고 다시 흘려보낼 수 있는 스트림
+
+    batch_factory 는 부를 때마다 새 배치 이터레이터(행 = 구매 계획인 2차원 정수 배열)를
+    돌려줘야 합니다. 기본 구매량(offset)은 배치마다 더해져 나갑니다.
+    전체 계획 수(count)는 미리 알고 있으므로 나열하지 않고도 요약에 쓸 수 있습니다.
+    dtype 은 head()로 모은 행렬의 정수 타입입니다(수량이 int32 에 들어가면 int32 로 줄여 담습니다).
+    slice_factory(begin, end)와 rank_function(계획 행렬)을 주면 계획을 순서 번호로 바로 꺼내고
+    계획에서 번호를 되찾을 수 있습니다. (기본 구매량을 빼고 주고받음, 없으면 배치를 넘기며 찾음)
+    """
+
+    def __init__(self, batch_factory, count, offset, dtype=np.int64, slice_factory=None, rank_function=None):
+        self._batch_factory = batch_factory
+        self.count = count
+        self.offset = np.asarray(offset, dtype=np.int64)
+        self.dtype = dtype
+        self._slice_factory = slice_factory
+        self._rank_function = rank_function
+
+    @classmethod
+    def from_cases(cls, cases, offset, batch_size=SOLUTION_BATCH_SIZE):
+        """이미 모은 계획(리스트 또는 정수 행렬)을 스트림으로 감쌈 (행렬이면 복사하지 않음)"""
+        cases = np.asarray(cases)
+        if cases.dtype.kind != 'i':
+            cases = cases.astype(np.int64)
+        cases = cases.reshape(len(cases), len(offset))
+
+        def batches():
+            for begin in range(0, len(cases), batch_size):
+                yield cases[begin:begin + batch_size]
+
+        return cls(batches, len(cases), offset)
+
+    def __bool__(self):
+        return self.count > 0
+
+    @property
+    def item_count(self):
+        return len(self.offset)
+
+    @property
+    def random_access(self):
+        """앞 계획을 나열하지 않고 번호로 바로 꺼낼 수 있는지"""
+        return self._slice_factory is not None
+
+    def batches(self):
+        """기본 구매량을 더한 배치를 차례로 돌려줌"""
+        for batch in self._batch_factory():
+            yield batch + self.offset
+
+    def head(self, limit):
+        """앞에서부터 최대 limit 개의 계획을 미리 잡아 둔 dtype 행렬 하나에 바로 모아 돌려줌
+
+        배치를 쌓았다가 이어 붙이지 않고, 기본 구매량을 더한 값을 행렬 자리에 바로 씁니다.
+        """
+        size = max(0, min(limit, self.count))
+        plans = np.empty((size, self.item_count), dtype=self.dtype)
+        taken = 0
+        if size > 0:
+            for batch in self._batch_factory():
+                batch = batch[:size - taken]
+                np.add(batch, self.offset, out=plans[taken:taken + len(batch)], casting='unsafe')
+                taken += len(batch)
+                if taken >= size:
+                    break
+        return plans[:taken]
+
+    def slice(self, begin, end):
+        """begin 번째부터 end 번째 앞까지(0부터)의 계획을 dtype 행렬로 돌려줌 (기본 구매량 포함)
+
+        random_access 이면 번호로 바로 복원하고, 아니면 앞 배치들을 넘기며 모읍니다.
+        """
+        begin, end = max(0, begin), min(end, self.count)
+        plans = np.empty((max(0, end - begin), self.item_count), dtype=self.dtype)
+        if end <= begin:
+            return plans
+        if self._slice_factory is not None:
+            np.add(self._slice_factory(begin, end), self.offset, out=plans, casting='unsafe')
+            return plans
+        seen, taken = 0, 0
+        for batch in self._batch_factory():
+            part = batch[max(begin - seen, 0):end - seen]
+            seen += len(batch)
+            if len(part):
+                np.add(part, self.offset, out=plans[taken:taken + len(part)], casting='unsafe')
+                taken += len(part)
+            if seen >= end:
+                break
+        return plans[:taken]
+
+    def window(self, begin, end, batch_size=SOLUTION_BATCH_SIZE):
+        """begin 번째부터 end 번째 앞까지의 계획만 흘려보내는 스트림 (내보내기에 그대로 씀)"""
+        begin, end = max(0, begin), min(end, self.count)
+
+        def batches():
+            if self._slice_factory is not None:
+                for start in range(begin, end, batch_size):
+                    yield self._slice_factory(start, min(start + batch_size, end))
+                return
+            seen = 0
+            for batch in self._batch_factory():
+                part = batch[max(begin - seen, 0):end - seen]
+                seen += len(batch)
+                if len(part):
+                    yield part
+                if seen >= end:
+                    break
+
+        return SolutionStream(batches, max(0, end - begin), self.offset, self.dtype)
+
+    def rank(self, plans):
+        """계획(기본 구매량 포함) 행렬의 행별 순서 번호 (random_access 가 아니면 ValueError)"""
+        if self._rank_function is None:
+            raise ValueError('이 결과는 계획에서 번호를 바로 찾을 수 없습니다.')
+        plans = np.asarray(plans, dtype=np.int64).reshape(-1, self.item_count)
+        return self._rank_function(plans - self.offset)
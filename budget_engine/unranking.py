@@ -0,0 +1,125 @@
+import numpy as np
+
+from .dense_dp import level_table_bytes, strided_prefix_sum
+
+
+def level_prefix_sums(tables, prices):
+    """품목별로 다음 단계 카운트 테이블을 단가 간격으로 누적한 배열들
+
+    sums[idx][r] = tables[idx+1][r] + tables[idx+1][r - p] + ... (p = prices[idx])
+    idx번째 품목을 q개 이하로 사는 방법 수를 뺄셈 한 번으로 구할 때 씁니다.
+    """
+    return [strided_prefix_sum(tables[idx + 1], price) for idx, price in enumerate(prices[:-1])]
+
+
+def _prefix_at(sums, index):
+    """sums[index] (index 가 음수면 0)"""
+    values = sums[np.maximum(index, 0)]
+    return np.where(index >= 0, values, 0)
+
+
+def unrank_plans(tables, prefix_sums, prices, limits, budget, ranks):
+    """사전순 번호(ranks, 0부터)에 해당하는 정확한 계획들을 한꺼번에 복원
+
+    iter_solution_batches 가 내놓는 순서와 같은 번호입니다. 품목마다 '이 수량보다 적게 사는
+    계획 수'가 번호를 넘지 않는 가장 큰 수량을 이진 탐색으로 고르므로,
+    계획 하나에 품목 수 × log(수량 범위) 번의 계산만 듭니다.
+    """
+    item_count = len(prices)
+    exact_dtype = tables[0].dtype
+    ranks = np.array(ranks, dtype=exact_dtype).reshape(-1)
+    remaining = np.full(len(ranks), budget, dtype=np.int64)
+    plans = np.zeros((len(ranks), item_count), dtype=np.int64)
+    for idx in range(item_count - 1):
+        price, sums = prices[idx], prefix_sums[idx]
+        top = sums[remaining]
+        # fewer(q) = top - sums[r - q*p] : idx번째 품목을 q개보다 적게 사는 계획 수
+        # fewer(q) <= rank 인 가장 큰 q 를 찾습니다.
+        low = np.zeros(len(ranks), dtype=np.int64)
+        high = np.minimum(limits[idx], remaining // price)
+        while True:
+            active = low < high
+            if not active.any():
+                break
+            middle = (low + high + 1) // 2
+            fewer = top - _prefix_at(sums, remaining - middle * price)
+            fits = fewer <= ranks
+            low = np.where(active & fits, middle, low)
+            high = np.where(active & ~fits, middle - 1, high)
+        ranks = ranks - (top - _prefix_at(sums, remaining - low * price))
+        plans[:, idx] = low
+        remaining -= low * price
+    plans[:, -1] = remaining // prices[-1]
+    return plans
+
+
+def plan_ranks(tables, prefix_sums, prices, limits, budget, plans):
+    """정확한 계획들의 사전순 번호 (unrank_plans 의 역함수)
+
+    품목마다 '이 계획보다 그 품목을 적게 사는 계획 수'를 더하면 번호가 됩니다.
+    budget 을 정확히 쓰지 않거나 수량 범위를 벗어난 계획이 있으면 ValueError.
+    """
+    prices = np.asarray(prices, dtype=np.int64)
+    plans = np.asarray(plans, dtype=np.int64).reshape(-1, len(prices))
+    valid = (plans >= 0).all(axis=1) & (plans <= np.asarray(limits)).all(axis=1) & (plans @ prices == budget)
+    if not valid.all():
+        row = int(np.flatnonzero(~valid)[0])
+        raise ValueError(f'예산을 정확히 쓰는 계획이 아닙니다: {plans[row].tolist()}')
+    ranks = np.zeros(len(plans), dtype=tables[0].dtype)
+    remaining = np.full(len(plans), budget, dtype=np.int64)
+    for idx in range(len(prices) - 1):
+        sums = prefix_sums[idx]
+        spent = plans[:, idx] * prices[idx]
+        ranks = ranks + (sums[remaining] - _prefix_at(sums, remaining - spent))
+        remaining -= spent
+    return ranks
+
+
+class PlanIndex:
+    """budget 을 정확히 쓰는 계획을 사전순 번호(0부터)로 바로 꺼내고, 계획에서 번호를 되찾는 색인
+
+    iter_solution_batches 와 같은 순서의 번호이므로 "120만 개 중 25만 번째 계획"을
+    앞 계획들을 나열하지 않고 계획 하나에 품목 수 × log(수량 범위) 번의 계산으로 꺼냅니다.
+    단가 간격 누적합은 처음 쓸 때 한 번만 만듭니다. 캐시에 담긴 결과라면 on_grow 에 넣어 둔 함수를
+    누적합을 만든 뒤 불러 캐시가 늘어난 용량을 다시 재게 합니다.
+    """
+
+    def __init__(self, tables, prices, limits, budget):
+        self.tables = tables
+        self.prices = prices
+        self.limits = limits
+        self.budget = budget
+        self.count = int(tables[0][budget])
+        self.on_grow = None
+        self._prefix_sums = None
+
+    @property
+    def prefix_sums(self):
+        if self._prefix_sums is None:
+            self._prefix_sums = level_prefix_sums(self.tables, self.prices)
+            if self.on_grow is not None:
+                self.on_grow()
+        return self._prefix_sums
+
+    @property
+    def nbytes(self):
+        """카운트 테이블과(만들었으면) 누적합이 차지하는 용량 추정"""
+        arrays = list(self.tables) + (self._prefix_sums or [])
+        return sum(level_table_bytes(array) for array in arrays)
+
+    def plans(self, ranks):
+        """번호들에 해당하는 계획 행렬 (번호가 범위를 벗어나면 IndexError)"""
+        ranks = list(ranks)
+        if ranks and not 0 <= min(ranks) <= max(ranks) < self.count:
+            raise IndexError(f'계획 번호는 0 이상 {self.count:,d} 미만이어야 합니다.')
+        if not ranks:
+            return np.zeros((0, len(self.prices)), dtype=np.int64)
+        return unrank_plans(self.tables, self.prefix_sums, self.prices, self.limits, self.budget, ranks)
+
+    def between(self, begin, end):
+        """begin 번째부터 end 번째 앞까지 이어진 계획들 (범위는 전체 계획 수 안으로 자름)"""
+        return self.plans(range(max(begin, 0), min(end, self.count)))
+
+    def ranks(self, plans):
+        """계획 행렬의 행별 번호"""
+        return plan_ranks(self.tables, self.prefix_sums, self.prices, self.limits, self.budget, plans)
@@ -0,0 +1,67 @@
+import numpy as np
+
+from .matrix import plan_totals
+
+
+class PlanTable:
+    """서버에 들고 있는 구매 계획 표 (한 쪽씩 꺼내 보여 주는 용도)
+
+    열 번호 0..품목 수-1 은 품목별 수량, 품목 수(total_column)는 금액입니다.
+    열마다 정렬 순서(argsort)를 처음 쓸 때 한 번 만들어 두고, 정렬과 범위 필터에 같이 씁니다.
+    범위 필터는 정렬된 값에서 이진 탐색으로 시작과 끝만 찾으므로 행 전체를 비교하지 않습니다.
+    """
+
+    def __init__(self, plans, prices):
+        self.plans = np.asarray(plans)
+        self.prices = prices
+        self.totals = plan_totals(self.plans, prices)
+        self._orders = {}
+        self._ranks = {}
+
+    def __len__(self):
+        return len(self.plans)
+
+    @property
+    def total_column(self):
+        return self.plans.shape[1]
+
+    def column(self, col):
+        return self.totals if col == self.total_column else self.plans[:, col]
+
+    def order(self, col):
+        """열 값의 오름차순 행 순서 (같은 값은 원래 순서 유지)"""
+        if col not in self._orders:
+            self._orders[col] = np.argsort(self.column(col), kind='stable')
+        return self._orders[col]
+
+    def rank(self, col):
+        """행별로 order(col) 안에서의 위치 (걸러 낸 행들을 다시 정렬할 때 씀)"""
+        if col not in self._ranks:
+            rank = np.empty(len(self), dtype=np.int64)
+            rank[self.order(col)] = np.arange(len(self))
+            self._ranks[col] = rank
+        return self._ranks[col]
+
+    def select(self, sort_col=None, descending=False, filter_col=None, low=None, high=None):
+        """필터(filter_col 값이 low 이상 high 이하)를 통과한 행 번호를 정렬 순서대로 돌려줌
+
+        sort_col 이 None 이면 원래(계산한) 순서입니다. low, high 가 None 이면 그쪽은 제한이 없습니다.
+        """
+        if filter_col is None:
+            rows = self.order(sort_col) if sort_col is not None else np.arange(len(self))
+        else:
+            order = self.order(filter_col)
+            values = self.column(filter_col)[order]
+            begin = 0 if low is None else np.searchsorted(values, low, side='left')
+            end = len(order) if high is None else np.searchsorted(values, high, side='right')
+            rows = order[begin:end]
+            if sort_col is None:
+                rows = np.sort(rows)
+            elif sort_col != filter_col:
+                rows = rows[np.argsort(self.rank(sort_col)[rows], kind='stable')]
+        return rows[::-1] if descending and sort_col is not None else rows
+
+    def page(self, rows, page, page_size):
+        """rows 중 page 번째 쪽(1부터)의 (행 번호, 수량 행렬, 금액) (보이는 쪽만 복사)"""
+        picked = rows[(page - 1) * page_size:page * page_size]
+        return picked, self.plans[picked], self.totals[picked]
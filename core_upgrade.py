@@ -3,7 +3,23 @@ import numpy as np
 import pandas as pd
 import unicodedata
 import time
-from functools import reduce
+
+from budget_engine import (
+    ENGINE_ODOMETER,
+    array_odometer_search,
+    choose_plan,
+    count_item_plans,
+    describe_grouping,
+    describe_item_count,
+    describe_plan,
+    describe_reduction,
+    expand_group_quantities,
+    group_by_price,
+    has_merged_items,
+    normalize_by_gcd,
+    plan_purchase,
+    plan_totals,
+)
 
 result_text = '''예산과 단가를 입력한 후\n계산하기 버튼을 누르면,
 예산에 딱 맞게 물건을\n살 수 있는 방법을 찾아줍니다.\n
@@ -66,14 +82,10 @@ st.markdown(
     </style>""", unsafe_allow_html=True)
 
 # ＊함수 구역＊
-# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
-
+# 초 단위 연산시간제한
+TIME_LIMIT = 20
 
-def get_conmplexcity(price, max, min):
-    last_index = price.label(min(price))
-    combination = [x-y+1 for x, y in zip(max, min)]
-    combination[last_index] = 1
-    return reduce(lambda x, y: x * y, combination)
+# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
 
 
 def get_print_length(s):
@@ -189,20 +201,14 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
     try:
         text_out = f'사용해야 할 예산은 {format(budget,",")}원입니다.\n'
         item_count = len(prices)
-        quantities = np.zeros(item_count, dtype=int)
-        balances = np.zeros(item_count, dtype=int)
-        last_index = item_count - 1
-        last_node = last_index - 1
-        node = last_node
-        is_overrun = False
-
-        cases_count = 0
-        cases_exact = []
-        cases_close = []
 
         combined = zip(prices, labels, base_quantity, limited_quantity)
         sorted_combined = sorted(combined, reverse=True)
         prices, labels, base_quantity, limited_quantity = zip(*sorted_combined)
+        # 단가의 최대공약수로 단가와 예산을 나눠 연산 숫자를 줄입니다.
+        # 같은 단가의 품목은 기본·최대 구매량을 더한 묶음 하나로 계산하고, 결과를 품목별로 나눕니다.
+        groups = group_by_price(prices, base_quantity, limited_quantity)
+        unit, unit_prices, _, budget_residue = normalize_by_gcd(groups.prices, budget)
 
         text_width = 25
         text_out += '_' * text_width + '정렬된 데이터' + '_' * text_width + '\n'
@@ -210,67 +216,53 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
             label = cut_string(labels[n_prt], 28)
             text_out += f"품목 #{n_prt + 1:02d} {label} = {prices[n_prt]:7,d} 원 ({base_quantity[n_prt]:3d}  ~ {limited_quantity[n_prt]:3d})\n"
         text_out += '_' * (text_width*2+13) + '\n'
+        text_out += describe_reduction(unit, budget_residue)
+        text_out += describe_grouping(groups, labels)
 
         total_budget = budget
         fixed_budget = np.sum(np.array(base_quantity) * np.array(prices))
         budget -= fixed_budget
-        limits = np.array(limited_quantity) - np.array(base_quantity)
-        complexity = np.prod(limits[:-1] + 1)
+        budget //= unit
+        limits = np.array(groups.limited_quantity) - np.array(groups.base_quantity)
+        # 오도미터가 검토할 케이스 수(복잡도)와 예상 시간
+        plan = choose_plan(unit_prices, limits.tolist(), int(budget), (ENGINE_ODOMETER,))
 
-        time_limit = 20
+        time_limit = TIME_LIMIT
         start_time = time.time()
-
-        while not (node == -1 and is_overrun == True):
-            current_time = time.time()
-            execution_time = current_time - start_time
-            if execution_time > time_limit:
-                raise TimeoutError(
-                    f"시간초과 에러 {execution_time:,.4f}초 경과: 연산이 너무 복잡합니다.\n복잡도: {complexity:,}")
-
-            balances[-1] = budget
-            for n in range(last_index):
-                balances[n] = balances[n - 1] - (quantities[n] * prices[n])
-
-            quantities[last_index] = min(
-                balances[last_index - 1] // prices[last_index], limits[last_index])
-            balances[last_index] = balances[last_index - 1] - \
-                (quantities[last_index] * prices[last_index])
-
-            if any(quantities[i] > limits[i] for i in range(item_count)):
-                is_overrun = True
-                quantities[node] = 0
-                node -= 1
-            elif any(balances < 0):
-                is_overrun = True
-                quantities[node] = 0
-                node -= 1
-            else:
-                is_overrun = False
-                node = last_node
-                if balances[last_index] == 0:
-                    cases_exact.append(list(quantities))
-                elif cases_exact:
-                    pass
-                else:
-                    cases_close.append(list(quantities))
-
-            quantities[node] += 1
-            cases_count += 1
+        # 연산 코어 모듈(NumPy 배열 오도미터, 마지막 품목은 '남은 예산//단가')
+        try:
+            cases_count, cases_exact, cases_close = array_odometer_search(
+                unit_prices, limits, budget, start_time, time_limit)
+        except TimeoutError as e:
+            raise TimeoutError(f"{e}: 연산이 너무 복잡합니다.\n복잡도: {plan.work:,}")
 
         end_time = time.time()
         execution_time = end_time - start_time
         print(f"실행 시간: {execution_time}초")
 
+        if budget_residue and cases_exact:
+            cases_close, cases_exact = cases_exact, []
+
         if len(cases_exact) == 0:
             text_out += f'{total_budget:,d}원의 예산에 맞게 구입할 방법이 없습니다.\n'
             text_out += '예산에 근접한 구입 계획은 아래와 같습니다.\n'
             list_show = cases_close
         else:
-            text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
+            if has_merged_items(groups):
+                # 같은 단가 품목을 나눠 사는 방법까지 셉니다. (기본 구매량을 더하기 전의 묶음 계획으로 셈)
+                item_count = count_item_plans([cases_exact.rows], groups, base_quantity, limited_quantity)
+                text_out += f'예산에 맞는 {item_count:,d}개의 완벽한 방법을 찾았습니다.\n'
+                text_out += describe_item_count(item_count, len(cases_exact))
+            else:
+                text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
             list_show = cases_exact
 
-        list_show = (np.array(list_show) + np.array(base_quantity)).tolist()
-        text_out += f'이 프로그램은 {cases_count + 1:,d}개의 케이스를 계산했습니다.\n'
+        # 계획 행렬에 기본 구매량을 제자리에서 더한 뒤, 묶인 품목이 있으면 품목별로 나눠 담습니다.
+        list_show = list_show.add_offset(groups.base_quantity).rows
+        if has_merged_items(groups):
+            list_show = expand_group_quantities(list_show, groups, base_quantity, limited_quantity)
+            text_out += '표에는 묶음마다 앞 품목부터 채운 대표 나눔 하나씩만 보여 줍니다.\n'
+        text_out += f'이 프로그램은 {cases_count:,d}개의 케이스를 계산했습니다.\n'
         return text_out, list_show, prices
 
     except Exception as e:
@@ -403,9 +395,11 @@ with col_right:
             result_text = f'최대구매금액({max_limit:,d}원)이 예산({budget_input:,d}원)보다 작아 예산을 다 쓸 수 없습니다.'
         elif fixed_budget > budget_input:
             result_text = f'최소구매금액({fixed_budget:,d}원)이 예산({budget_input:,d}원)보다 많아 예산 내에서 쓸 수 없습니다.'
-        elif len(item_prices) != len(set(item_prices)):
-            result_text = '중복된 단가가 있습니다.'
         else:
+            # 계산 전에 예상 시간을 따져 제한 시간을 넘을 것 같으면 미리 알립니다.
+            solve_plan = plan_purchase(budget_input, item_prices, min_quantities, max_quantities, (ENGINE_ODOMETER,))
+            if solve_plan.seconds > TIME_LIMIT:
+                st.warning(describe_plan(solve_plan, TIME_LIMIT))
             # 스피너를 표시하면서 계산 진행 오버레이와 스피너를 위한 컨테이너 생성
             overlay_container = st.empty()
             # 오버레이와 스피너 추가
@@ -432,10 +426,13 @@ else:
     st.text_area("결과 출력", result_text, height=300)
 
 try:
+    # 같은 단가가 여러 개면 품목 번호를 붙여 열 이름을 구분합니다.
+    # 계획 행렬을 복사하지 않고 그대로 표로 씁니다.
     df = pd.DataFrame(result_list, columns=[
-                      f'{price:,d}원' for price in result_prices])
-    # 새로운 열 '금액'을 계산하고 데이터프레임에 추가합니다.
-    df['금액'] = df.mul(result_prices).sum(axis=1)
+                      f'{price:,d}원' if result_prices.count(price) == 1 else f'{price:,d}원 #{idx + 1:02d}'
+                      for idx, price in enumerate(result_prices)], copy=False)
+    # 새로운 열 '금액'은 계획 행렬 × 단가 벡터 한 번으로 계산합니다.
+    df['금액'] = plan_totals(result_list, result_prices)
     if df.__len__() != 0:
         # 결과를 화면에 표시합니다.
         st.dataframe(df, hide_index=True, use_container_width=True)
@@ -1,9 +1,25 @@
 import streamlit as st
-import numpy as np
 import pandas as pd
 import unicodedata
 import time
-from functools import reduce
+
+from budget_engine import (
+    SolutionMatrix,
+    choose_plan,
+    describe_grouping,
+    describe_item_count,
+    describe_plan,
+    describe_reduction,
+    expand_group_quantities,
+    group_by_price,
+    has_merged_items,
+    item_plan_count,
+    normalize_by_gcd,
+    plan_purchase,
+    plan_totals,
+    quantity_dtype,
+    solve_normalized,
+)
 
 # startupdate
 st.markdown(
@@ -88,14 +104,12 @@ st.markdown(
     </style>""", unsafe_allow_html=True)
 
 # ＊함수 구역＊
-# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
+# 초 단위 연산시간제한
+TIME_LIMIT = 20
+# 결과로 모을 최대 계획 수 (넘으면 앞에서부터 이만큼만 보여 줌)
+MAX_RESULT_ROWS = 1_000_000
 
-
-def get_conmplexcity(price, max, min):
-    last_index = price.label(min(price))
-    combination = [x-y+1 for x, y in zip(max, min)]
-    combination[last_index] = 1
-    return reduce(lambda x, y: x * y, combination)
+# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
 
 
 def get_print_length(s):
@@ -206,7 +220,7 @@ def on_max_change(index):
 
 
 def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
-    """메모이제이션 + 마지막 아이템 나눗셈 처리"""
+    """NumPy 카운트 테이블(bottom-up DP) + 해가 있는 가지만 역추적"""
     try:
         text_out = f'사용해야 할 예산은 {format(budget,",")}원입니다.\n'
         item_count = len(prices)
@@ -215,6 +229,10 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
         combined = zip(prices, labels, base_quantity, limited_quantity)
         sorted_combined = sorted(combined, reverse=True)
         prices, labels, base_quantity, limited_quantity = map(list, zip(*sorted_combined))
+        # 단가의 최대공약수로 단가와 예산을 나눠 탐색 공간을 줄입니다.
+        # 같은 단가의 품목은 기본·최대 구매량을 더한 묶음 하나로 계산하고, 결과를 품목별로 나눕니다.
+        groups = group_by_price(prices, base_quantity, limited_quantity)
+        unit, unit_prices, _, budget_residue = normalize_by_gcd(groups.prices, budget)
         
         # 정렬된 데이터 출력
         text_width = 25
@@ -223,135 +241,63 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
             label = cut_string(labels[n_prt], 28)
             text_out += f"품목 #{n_prt + 1:02d} {label} = {prices[n_prt]:7,d} 원 ({base_quantity[n_prt]:3d}  ~ {limited_quantity[n_prt]:3d})\n"
         text_out += '_' * (text_width * 2 + 13) + '\n'
+        text_out += describe_reduction(unit, budget_residue)
+        text_out += describe_grouping(groups, labels)
         
         # 전처리
         total_budget = budget
         fixed_budget = sum(a * b for a, b in zip(base_quantity, prices))
         remaining_budget = budget - fixed_budget
-        limits = [lim - base for lim, base in zip(limited_quantity, base_quantity)]
-        last_idx = item_count - 1
+        # 남은 예산을 단위로 바꿉니다. (나머지는 어떤 조합으로도 쓸 수 없는 금액)
+        unit_budget = remaining_budget // unit
+        limits = [lim - base for lim, base in zip(groups.limited_quantity, groups.base_quantity)]
         
-        time_limit = 20
+        time_limit = TIME_LIMIT
         start_time = time.time()
-        memo = {}
-        call_count = 0
-        
-        # 1단계: 마지막 아이템 제외하고 해 존재 여부 계산
-        def count_solutions(idx, remaining):
-            nonlocal call_count
-            call_count += 1
-            
-            if call_count % 100000 == 0:
-                if time.time() - start_time > time_limit:
-                    raise TimeoutError(f"시간초과: {time_limit}초 경과")
-            
-            if remaining < 0:
-                return 0
-            
-            # 마지막 직전 아이템까지 왔으면, 마지막 아이템으로 나눠떨어지는지 체크
-            if idx == last_idx:
-                qty = remaining // prices[last_idx]
-                if qty <= limits[last_idx] and remaining % prices[last_idx] == 0:
-                    return 1
-                return 0
-            
-            if (idx, remaining) in memo:
-                return memo[(idx, remaining)]
-            
-            total = 0
-            for qty in range(limits[idx] + 1):
-                cost = qty * prices[idx]
-                if cost > remaining:
-                    break
-                total += count_solutions(idx + 1, remaining - cost)
-            
-            memo[(idx, remaining)] = total
-            return total
-        
-        exact_count = count_solutions(0, remaining_budget)
-        
-        # 2단계: 역추적
-        cases_exact = []
-        
-        def reconstruct(idx, remaining, current):
+
+        # 예상 시간이 가장 짧은 엔진으로 풀고, 정확히 맞출 수 없으면(나머지가 있거나 해가 0개)
+        # 예산 이하로 만들 수 있는 가장 큰 금액의 계획만 복원합니다.
+        plan = choose_plan(unit_prices, limits, unit_budget)
+        solve_result = solve_normalized(unit_prices, limits, unit_budget, budget_residue == 0,
+                                        start_time, time_limit, None, plan)
+        best_spend, state_count = solve_result.best_spend, solve_result.state_count
+        exact_count = solve_result.case_count if solve_result.exact else 0
+        # 같은 단가 품목을 나눠 사는 방법까지 센 수 (세기에 너무 크면 None)
+        item_count = item_plan_count(groups, unit_prices, base_quantity, limited_quantity, solve_result)
+        # 계획은 리스트 대신 미리 잡아 둔 정수 행렬에 배치째로 씁니다.
+        # 계획을 꺼내는 동안에도 제한 시간을 검사하고, 최대 계획 수에 닿으면 그만 모읍니다.
+        cases = SolutionMatrix(len(unit_prices), quantity_dtype(max(limited_quantity)))
+        for batch in solve_result.batch_factory():
             if time.time() - start_time > time_limit:
                 raise TimeoutError(f"시간초과: {time_limit}초 경과")
-            
-            # 마지막 아이템: 나눗셈으로 처리
-            if idx == last_idx:
-                if remaining % prices[last_idx] == 0:
-                    qty = remaining // prices[last_idx]
-                    if qty <= limits[last_idx]:
-                        cases_exact.append(current + [qty])
-                return
-            
-            for qty in range(limits[idx] + 1):
-                cost = qty * prices[idx]
-                if cost > remaining:
-                    break
-                
-                next_remaining = remaining - cost
-                # 해가 존재하는 경로만 탐색
-                if memo.get((idx + 1, next_remaining), 0) > 0:
-                    current.append(qty)
-                    reconstruct(idx + 1, next_remaining, current)
-                    current.pop()
-                # 마지막 직전이면 직접 체크
-                elif idx + 1 == last_idx:
-                    if next_remaining % prices[last_idx] == 0:
-                        qty_last = next_remaining // prices[last_idx]
-                        if qty_last <= limits[last_idx]:
-                            cases_exact.append(current + [qty, qty_last])
-        
-        if exact_count > 0:
-            reconstruct(0, remaining_budget, [])
-        
-        # 근사치 처리 (정확한 해가 없을 때)
-        cases_close = []
-        if exact_count == 0:
-            best_remaining = remaining_budget
-            
-            def find_closest(idx, remaining, current):
-                nonlocal best_remaining
-                if time.time() - start_time > time_limit:
-                    return
-                
-                if idx == last_idx:
-                    qty = min(remaining // prices[last_idx], limits[last_idx])
-                    leftover = remaining - qty * prices[last_idx]
-                    if leftover < best_remaining:
-                        best_remaining = leftover
-                        cases_close.clear()
-                        cases_close.append(current + [qty])
-                    elif leftover == best_remaining:
-                        cases_close.append(current + [qty])
-                    return
-                
-                for qty in range(limits[idx] + 1):
-                    cost = qty * prices[idx]
-                    if cost > remaining:
-                        break
-                    current.append(qty)
-                    find_closest(idx + 1, remaining - cost, current)
-                    current.pop()
-            
-            find_closest(0, remaining_budget, [])
+            cases.extend(batch[:MAX_RESULT_ROWS - len(cases)])
+            if len(cases) >= MAX_RESULT_ROWS:
+                break
         
         end_time = time.time()
         execution_time = end_time - start_time
-        print(f"실행 시간: {execution_time:.4f}초, 메모 상태 수: {len(memo):,}")
+        print(f"실행 시간: {execution_time:.4f}초, {plan.engine} 상태 수: {state_count:,}")
         
         # 결과 출력
         if exact_count == 0:
             text_out += f'{total_budget:,d}원의 예산에 맞게 구입할 방법이 없습니다.\n'
-            text_out += '예산에 근접한 구입 계획은 아래와 같습니다.\n'
-            list_show = cases_close
+            leftover = remaining_budget - best_spend * unit
+            text_out += f'예산에 근접한 구입 계획은 아래와 같습니다.(잔액 {leftover:,d}원)\n'
         else:
-            text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
-            list_show = cases_exact
+            found = exact_count if item_count is None else item_count
+            text_out += f'예산에 맞는 {found:,d}개의 완벽한 방법을 찾았습니다.\n'
+            if item_count != exact_count:
+                text_out += describe_item_count(item_count, exact_count)
+        if solve_result.case_count > len(cases):
+            text_out += f'그중 앞의 {len(cases):,d}개만 보여 줍니다.\n'
         
-        list_show = (np.array(list_show) + np.array(base_quantity)).tolist() if list_show else []
-        text_out += f'이 프로그램은 {call_count:,d}개의 상태를 계산했습니다.\n'
+        # 계획 행렬에 기본 구매량을 제자리에서 더한 뒤, 묶인 품목이 있으면 품목별로 나눠 담습니다.
+        list_show = cases.add_offset(groups.base_quantity).rows
+        if has_merged_items(groups):
+            list_show = expand_group_quantities(list_show, groups, base_quantity, limited_quantity)
+            text_out += '표에는 묶음마다 앞 품목부터 채운 대표 나눔 하나씩만 보여 줍니다.\n'
+        text_out += f'이 프로그램은 {state_count:,d}개의 상태를 계산했습니다.\n'
+        text_out += f'계산 방법: {plan.engine} (예상 {plan.seconds:,.2f}초, 실제 {execution_time:,.2f}초)\n'
         
         return text_out, list_show, prices
     
@@ -485,9 +431,11 @@ with col_right:
             result_text = f'최대구매금액({max_limit:,d}원)이 예산({budget_input:,d}원)보다 작아 예산을 다 쓸 수 없습니다.'
         elif fixed_budget > budget_input:
             result_text = f'최소구매금액({fixed_budget:,d}원)이 예산({budget_input:,d}원)보다 많아 예산 내에서 쓸 수 없습니다.'
-        elif len(item_prices) != len(set(item_prices)):
-            result_text = '중복된 단가가 있습니다.'
         else:
+            # 계산 전에 예상 시간을 따져 제한 시간을 넘을 것 같으면 미리 알립니다.
+            solve_plan = plan_purchase(budget_input, item_prices, min_quantities, max_quantities)
+            if solve_plan.seconds > TIME_LIMIT:
+                st.warning(describe_plan(solve_plan, TIME_LIMIT))
             # 스피너를 표시하면서 계산 진행 오버레이와 스피너를 위한 컨테이너 생성
             overlay_container = st.empty()
             # 오버레이와 스피너 추가
@@ -514,10 +462,13 @@ else:
     st.text_area("결과 출력", result_text, height=300)
 
 try:
+    # 같은 단가가 여러 개면 품목 번호를 붙여 열 이름을 구분합니다.
+    # 계획 행렬을 복사하지 않고 그대로 표로 씁니다.
     df = pd.DataFrame(result_list, columns=[
-                      f'{price:,d}원' for price in result_prices])
-    # 새로운 열 '금액'을 계산하고 데이터프레임에 추가합니다.
-    df['금액'] = df.mul(result_prices).sum(axis=1)
+                      f'{price:,d}원' if result_prices.count(price) == 1 else f'{price:,d}원 #{idx + 1:02d}'
+                      for idx, price in enumerate(result_prices)], copy=False)
+    # 새로운 열 '금액'은 계획 행렬 × 단가 벡터 한 번으로 계산합니다.
+    df['금액'] = plan_totals(result_list, result_prices)
     if df.__len__() != 0:
         # 결과를 화면에 표시합니다.
         st.dataframe(df, hide_index=True, use_container_width=True)
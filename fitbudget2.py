@@ -2,10 +2,40 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import unicodedata
+import os
 import time
-from functools import reduce
 from io import BytesIO
 
+from budget_engine import (
+    RANK_PREFERRED,
+    RANKING_OBJECTIVES,
+    BackgroundSolve,
+    PlanTable,
+    Ranking,
+    Sampling,
+    ResultCache,
+    SolveCancelled,
+    SolveStats,
+    append_stats_log,
+    arrow_available,
+    describe_grouping,
+    describe_item_count,
+    describe_plan,
+    describe_reduction,
+    plan_column_names,
+    plan_purchase,
+    plan_totals,
+    preflight,
+    solve,
+    sweep_budgets,
+    write_result_arrow,
+    write_result_csv_gz,
+    write_result_excel,
+    write_result_parquet,
+    write_sweep_csv,
+)
+from budget_engine.stats import PHASE_DATAFRAME, PHASE_EXCEL, PHASE_REPORT, measure
+
 # ＊스타일 구역＊
 st.markdown(
     """
@@ -184,151 +214,74 @@ def on_max_change(i):
     elif current_min > current_max:
         st.session_state[f'item_max_{i}'] = current_min
 
-def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
-    """메모이제이션 + 마지막 아이템 나눗셈 처리"""
+def calculate_budget(budget, labels, prices, base_quantity, limited_quantity, time_limit=20, progress=None,
+                     solve_cache=None, ranking=None, sample=None, level_cache=None):
+    """계산 엔진(budget_engine.solve)으로 구매 계획을 구하고 결과 문장을 만듦
+
+    progress(SolveProgress)를 주면 진행 상황을 갱신하고 취소 요청을 확인합니다.
+    solve_cache(ResultCache)를 주면 같은 문제의 결과를 세션 사이에서 재사용합니다.
+    level_cache(ResultCache)를 주면 품목 하나만 고쳐 다시 풀 때 그보다 싼 품목들의 DP 단계를 재사용합니다.
+    ranking(Ranking)을 주면 순위 기준으로 가장 좋은 k 개 계획만 좋은 순서로 돌려주고,
+    sample(Sampling)을 주면 고르게 무작위로 뽑은 계획만 돌려줍니다.
+    단계별 시간과 카운터(SolveStats)를 다섯 번째 값으로, 전체 계획의 품목별 수량 분포를
+    여섯 번째 값으로 함께 돌려줍니다.
+    """
+    stats = SolveStats()
     try:
         text_out = f'사용해야 할 예산은 {format(budget,",")}원입니다.\n'
-        item_count = len(prices)
-        
-        combined = zip(prices, labels, base_quantity, limited_quantity)
-        sorted_combined = sorted(combined, reverse=True)
-        prices, labels, base_quantity, limited_quantity = map(list, zip(*sorted_combined))
+        solution = solve(budget, zip(labels, prices, base_quantity, limited_quantity),
+                         {'time_limit': time_limit, 'progress': progress, 'cache': solve_cache, 'stats': stats,
+                          'ranking': ranking, 'sample': sample, 'distribution': True,
+                          'level_cache': level_cache})
+        prices, labels = solution.prices, solution.labels
+        report_started = time.perf_counter()
         
         text_width = 25
         text_out += '_' * text_width + '정렬된 데이터' + '_' * text_width + '\n'
-        for n_prt in range(item_count):
+        for n_prt in range(len(prices)):
             label = cut_string(labels[n_prt], 28)
-            text_out += f"품목 #{n_prt + 1:02d} {label} = {prices[n_prt]:7,d} 원 ({base_quantity[n_prt]:3d}  ~ {limited_quantity[n_prt]:3d})\n"
+            text_out += f"품목 #{n_prt + 1:02d} {label} = {prices[n_prt]:7,d} 원 ({solution.base_quantity[n_prt]:3d}  ~ {solution.limited_quantity[n_prt]:3d})\n"
         text_out += '_' * (text_width * 2 + 13) + '\n'
+        text_out += describe_reduction(solution.unit, solution.budget_residue)
+        text_out += describe_grouping(solution.groups, labels)
+        print(f"실행 시간: {solution.elapsed:.4f}초, {solution.engine} 상태 수: {solution.state_count:,}")
         
-        total_budget = budget
-        fixed_budget = sum(a * b for a, b in zip(base_quantity, prices))
-        remaining_budget = budget - fixed_budget
-        limits = [lim - base for lim, base in zip(limited_quantity, base_quantity)]
-        last_idx = item_count - 1
-        
-        time_limit = 20
-        start_time = time.time()
-        memo = {}
-        call_count = 0
-        
-        def count_solutions(idx, remaining):
-            nonlocal call_count
-            call_count += 1
-            
-            if call_count % 100000 == 0:
-                if time.time() - start_time > time_limit:
-                    raise TimeoutError(f"시간초과: {time_limit}초 경과")
-            
-            if remaining < 0:
-                return 0
-            
-            if idx == last_idx:
-                qty = remaining // prices[last_idx]
-                if qty <= limits[last_idx] and remaining % prices[last_idx] == 0:
-                    return 1
-                return 0
-            
-            if (idx, remaining) in memo:
-                return memo[(idx, remaining)]
-            
-            total = 0
-            for qty in range(limits[idx] + 1):
-                cost = qty * prices[idx]
-                if cost > remaining:
-                    break
-                total += count_solutions(idx + 1, remaining - cost)
-            
-            memo[(idx, remaining)] = total
-            return total
-        
-        exact_count = count_solutions(0, remaining_budget)
-        
-        cases_exact = []
-        
-        def reconstruct(idx, remaining, current):
-            if time.time() - start_time > time_limit:
-                raise TimeoutError(f"시간초과: {time_limit}초 경과")
-            
-            if idx == last_idx:
-                if remaining % prices[last_idx] == 0:
-                    qty = remaining // prices[last_idx]
-                    if qty <= limits[last_idx]:
-                        cases_exact.append(current + [qty])
-                return
-            
-            for qty in range(limits[idx] + 1):
-                cost = qty * prices[idx]
-                if cost > remaining:
-                    break
-                
-                next_remaining = remaining - cost
-                if memo.get((idx + 1, next_remaining), 0) > 0:
-                    current.append(qty)
-                    reconstruct(idx + 1, next_remaining, current)
-                    current.pop()
-                elif idx + 1 == last_idx:
-                    if next_remaining % prices[last_idx] == 0:
-                        qty_last = next_remaining // prices[last_idx]
-                        if qty_last <= limits[last_idx]:
-                            cases_exact.append(current + [qty, qty_last])
-        
-        if exact_count > 0:
-            reconstruct(0, remaining_budget, [])
-        
-        cases_close = []
-        if exact_count == 0:
-            best_remaining = remaining_budget
-            
-            def find_closest(idx, remaining, current):
-                nonlocal best_remaining
-                if time.time() - start_time > time_limit:
-                    return
-                
-                if idx == last_idx:
-                    qty = min(remaining // prices[last_idx], limits[last_idx])
-                    leftover = remaining - qty * prices[last_idx]
-                    if leftover < best_remaining:
-                        best_remaining = leftover
-                        cases_close.clear()
-                        cases_close.append(current + [qty])
-                    elif leftover == best_remaining:
-                        cases_close.append(current + [qty])
-                    return
-                
-                for qty in range(limits[idx] + 1):
-                    cost = qty * prices[idx]
-                    if cost > remaining:
-                        break
-                    current.append(qty)
-                    find_closest(idx + 1, remaining - cost, current)
-                    current.pop()
-            
-            find_closest(0, remaining_budget, [])
-        
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(f"실행 시간: {execution_time:.4f}초, 메모 상태 수: {len(memo):,}")
+        if not solution.exact:
+            text_out += f'{budget:,d}원의 예산에 맞게 구입할 방법이 없습니다.\n'
+            text_out += f'예산에 근접한 구입 계획은 아래와 같습니다.(잔액 {solution.leftover:,d}원)\n'
+        else:
+            found = solution.item_case_count if solution.item_case_count is not None else solution.case_count
+            text_out += f'예산에 맞는 {found:,d}개의 완벽한 방법을 찾았습니다.\n'
+        if solution.item_case_count != solution.case_count:
+            # 같은 단가 묶음 하나를 품목별로 나누는 방법들은 표에서 대표 나눔 한 행으로 보여 줍니다.
+            if solution.exact:
+                text_out += describe_item_count(solution.item_case_count, solution.case_count)
+            if ranking is None:
+                text_out += '표에는 묶음마다 앞 품목부터 채운 대표 나눔 하나씩만 보여 줍니다.\n'
+        if ranking is not None:
+            text_out += f"'{ranking.objective}' 기준으로 가장 좋은 {solution.plans.count:,d}개를 좋은 순서로 보여 줍니다.\n"
+        elif sample is not None:
+            seed_text = f'seed {sample.seed}' if sample.seed is not None else 'seed 없음'
+            text_out += f'전체 계획 중 {solution.plans.count:,d}개를 고르게 무작위로 뽑아 보여 줍니다.({seed_text})\n'
         
-        if exact_count == 0:
-            text_out += f'{total_budget:,d}원의 예산에 맞게 구입할 방법이 없습니다.\n'
-            text_out += '예산에 근접한 구입 계획은 아래와 같습니다.\n'
-            list_show = cases_close
+        if solution.from_cache:
+            text_out += f'같은 문제를 앞서 계산한 결과를 캐시에서 가져왔습니다.(당시 {solution.state_count:,d}개 상태 계산)\n'
         else:
-            text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
-            list_show = cases_exact
+            text_out += f'이 프로그램은 {solution.state_count:,d}개의 상태를 계산했습니다.\n'
+            text_out += f'계산 방법: {solution.engine} (예상 {solution.plan.seconds:,.2f}초, 실제 {solution.elapsed:,.2f}초)\n'
         
-        list_show = (np.array(list_show) + np.array(base_quantity)).tolist() if list_show else []
-        text_out += f'이 프로그램은 {call_count:,d}개의 상태를 계산했습니다.\n'
+        stats.timings[PHASE_REPORT] = time.perf_counter() - report_started
         
-        # labels도 함께 반환
-        return text_out, list_show, prices, labels
+        # 구매 계획은 스트림 그대로 돌려주고, 화면과 엑셀이 필요할 때 배치 단위로 꺼내 씁니다.
+        return text_out, solution.plans, prices, labels, stats, solution.distribution
     
+    except SolveCancelled as e:
+        return f'{e}', [], prices, labels, stats, None
     except TimeoutError as e:
-        return f'에러입니다.: {e}', [], prices, labels
+        return f'에러입니다.: {e}', [], prices, labels, stats, None
     except Exception as e:
         print('Error Message:', e)
-        return f'에러입니다.: {e}', [], prices, labels
+        return f'에러입니다.: {e}', [], prices, labels, stats, None
 
 def create_template_excel():
     """엑셀 양식 생성 (단일 시트)"""
@@ -420,84 +373,100 @@ def load_from_excel(uploaded_file):
         st.error(f"파일 로드 오류: {e}")
         return None, None
 
-def create_result_excel(result_text, df_result, result_labels=None, progress_callback=None):
-    """결과를 엑셀 파일로 생성 (단일 시트) - 품목 이름 행 추가, 필터 및 셀 병합"""
-    from openpyxl.utils import get_column_letter
-    
-    if progress_callback:
-        progress_callback(0.1, "데이터 준비 중...")
-    
+def result_columns(prices):
+    """결과 표 열 이름 (같은 단가가 여러 개면 품목 번호를 붙여 구분)"""
+    return [f'{price:,d}원' if prices.count(price) == 1 else f'{price:,d}원 #{idx + 1:02d}'
+            for idx, price in enumerate(prices)]
+
+def create_result_excel(result_text, result_stream, result_prices, result_labels=None, progress_callback=None):
+    """결과를 엑셀 파일로 생성 - 품목 이름 행 추가, 필터 및 셀 병합
+
+    구매 계획은 result_stream 에서 배치 단위로 받아 쓰기 전용 통합 문서에 바로 흘려 쓰고,
+    한 시트의 행 수 한도를 넘으면 다음 시트로 이어 씁니다. 앞의 MAX_EXCEL_ROWS 개까지만 씁니다.
+    """
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # 텍스트 결과를 행으로 변환
-        text_lines = result_text.split('\n')
-        rows = [[line] for line in text_lines]
-        
-        # 결과요약 행 수 저장 (셀 병합용)
-        summary_row_count = len(rows)
-        
-        # 빈 행 추가
-        rows.append([''])
-        summary_row_count += 1
-        
-        # 가격 헤더 행 번호 저장 (필터용)
-        price_header_row = None
-        
-        if progress_callback:
-            progress_callback(0.2, "데이터 구성 중...")
-        
-        # DataFrame 헤더 추가
-        if df_result is not None and len(df_result) > 0:
-            # 품목 번호 행 추가 (#01, #02, ... 형식, 금액 컬럼은 빈 문자열)
-            if result_labels:
-                num_row = [f'#{i+1:02d}' for i in range(len(result_labels))] + ['']
-                rows.append(num_row)
-            
-            # 품목 이름 행 추가 (금액 컬럼은 빈 문자열)
-            if result_labels:
-                name_row = result_labels + ['']
-                rows.append(name_row)
-            
-            # 가격 헤더 행
-            price_header_row = len(rows) + 1  # 1-based index for Excel
-            rows.append(df_result.columns.tolist())
-            
-            # DataFrame 데이터 추가
-            for _, row in df_result.iterrows():
-                rows.append(row.tolist())
-        
-        if progress_callback:
-            progress_callback(0.4, "Excel 파일 생성 중...")
-        
-        df_output = pd.DataFrame(rows)
-        df_output.to_excel(writer, sheet_name='계산결과', index=False, header=False)
-        
-        if progress_callback:
-            progress_callback(0.7, "서식 적용 중...")
-        
-        # openpyxl로 추가 작업
-        ws = writer.sheets['계산결과']
-        
-        # 1. 상단 결과요약 A-G열 행별 셀 병합
-        for row_idx in range(1, summary_row_count + 1):
-            ws.merge_cells(f'A{row_idx}:G{row_idx}')
-        
-        if progress_callback:
-            progress_callback(0.9, "필터 적용 중...")
-        
-        # 2. 가격 헤더 행에 필터 적용
-        if price_header_row and df_result is not None and len(df_result) > 0:
-            num_cols = len(df_result.columns)
-            last_col = get_column_letter(num_cols)
-            last_row = price_header_row + len(df_result)
-            ws.auto_filter.ref = f'A{price_header_row}:{last_col}{last_row}'
-    
-    if progress_callback:
-        progress_callback(1.0, "완료!")
-    
+    write_result_excel(output, result_text, result_stream, result_prices, result_labels,
+                       result_columns(result_prices), progress_callback, plan_limit=MAX_EXCEL_ROWS)
     output.seek(0)
     return output
 
+def make_column_export(writer, result_stream, result_prices, result_labels):
+    """다운로드 버튼을 누를 때 열 형식 파일(CSV.gz, Parquet, Arrow)을 만들어 돌려줄 함수"""
+    def export():
+        output = BytesIO()
+        writer(output, result_stream, result_prices, result_labels, result_columns(result_prices))
+        return output.getvalue()
+    return export
+
+@st.fragment
+def show_result_table(plan_table, columns, plan_stream=None):
+    """결과 표를 한 쪽씩 보여 줌 (정렬·범위 필터는 서버에서 열 인덱스로 처리)
+
+    plan_stream 이 번호로 바로 꺼낼 수 있는 스트림이면, 정렬·필터 없이 볼 때는
+    plan_table 에 담지 못한 뒤쪽 계획도 그 쪽만 번호로 복원해 보여 줍니다.
+    """
+    column_names = list(columns) + ['금액']
+    col_sort, col_desc, col_filter, col_low, col_high = st.columns([3, 1.5, 3, 2, 2])
+    with col_sort:
+        sort_name = st.selectbox("정렬 기준", ['계산 순서'] + column_names, key='view_sort')
+    with col_desc:
+        descending = st.toggle("내림차순", key='view_desc')
+    with col_filter:
+        filter_name = st.selectbox("필터 열", ['없음'] + column_names, key='view_filter')
+    with col_low:
+        low = st.number_input("최소", value=None, step=1, key='view_low', disabled=filter_name == '없음')
+    with col_high:
+        high = st.number_input("최대", value=None, step=1, key='view_high', disabled=filter_name == '없음')
+    sort_col = column_names.index(sort_name) if sort_name in column_names else None
+    filter_col = column_names.index(filter_name) if filter_name in column_names else None
+    # 정렬·필터 없이 보면 전체 계획을 번호로 바로 꺼내 씁니다. (앞 계획을 나열하지 않음)
+    random_view = (sort_col is None and filter_col is None and plan_stream is not None
+                   and plan_stream.random_access and plan_stream.count > len(plan_table))
+    rows = None if random_view else plan_table.select(sort_col, descending, filter_col, low, high)
+    row_count = plan_stream.count if random_view else len(rows)
+    
+    col_size, col_page, col_info = st.columns([2, 2, 6])
+    with col_size:
+        page_size = st.selectbox("쪽 크기", PAGE_SIZES, key='view_page_size')
+    page_count = max(1, min(-(-row_count // page_size), MAX_PAGE_NUMBER))
+    # 필터로 쪽 수가 줄면 마지막 쪽으로 옮깁니다.
+    if st.session_state.get('view_page', 1) > page_count:
+        st.session_state['view_page'] = page_count
+    with col_page:
+        page = st.number_input(f"쪽 (전체 {page_count:,d})", min_value=1, max_value=page_count, step=1,
+                               key='view_page')
+    with col_info:
+        first_row = (page - 1) * page_size
+        st.caption(f"조건에 맞는 계획 {row_count:,d}개 중 {min(first_row + 1, row_count):,d}~"
+                   f"{min(first_row + page_size, row_count):,d}번째")
+    
+    if random_view:
+        page_plans = plan_stream.slice(first_row, first_row + page_size)
+        picked = np.arange(first_row, first_row + len(page_plans))
+        page_totals = plan_totals(page_plans, plan_table.prices)
+    else:
+        picked, page_plans, page_totals = plan_table.page(rows, page, page_size)
+    df_page = pd.DataFrame(page_plans, columns=columns, index=picked + 1, copy=False)
+    df_page['금액'] = page_totals
+    df_page.index.name = '번호'
+    st.dataframe(df_page, use_container_width=True)
+
+@st.fragment
+def show_quantity_distribution(distribution, labels, prices):
+    """품목별 수량 분포 막대그래프 (계획을 나열하지 않고 센 전체 계획 기준)"""
+    names = [f'#{idx + 1:02d} {label}' if label else f'#{idx + 1:02d} {price:,d}원'
+             for idx, (label, price) in enumerate(zip(labels, prices))]
+    picked = st.selectbox("품목", range(len(names)), format_func=lambda idx: names[idx], key='dist_item')
+    quantities, counts = distribution[picked]
+    case_count = sum(counts.tolist())
+    # 계획 수가 int64 를 넘을 수 있으므로 비율(%)로 바꿔 그립니다.
+    shares = np.array([count * 100 / case_count for count in counts.tolist()], dtype=float)
+    chart = pd.DataFrame({'계획 비율(%)': shares}, index=pd.Index(quantities, name='수량'))
+    st.bar_chart(chart)
+    top = int(np.argmax(shares))
+    st.caption(f"전체 {case_count:,d}개 계획 중 {quantities[top]:,d}개를 사는 계획이 "
+               f"{int(counts[top]):,d}개({shares[top]:.1f}%)로 가장 많습니다.")
+
 # ＊메인 UI＊
 result_text = '''예산과 단가를 입력한 후\n계산하기 버튼을 누르면,
 예산에 딱 맞게 물건을\n살 수 있는 방법을 찾아줍니다.\n
@@ -511,6 +480,25 @@ result_text = '''예산과 단가를 입력한 후\n계산하기 버튼을 누
 '''
 
 result_list, result_prices, result_labels = [], [], []  # result_labels 추가
+result_stats = None
+result_distribution = None
+
+# 계산 통계(JSON-lines)를 덧붙일 로그 파일 (느린 입력을 찾는 용도)
+STATS_LOG_PATH = os.environ.get('SIMBUD_STATS_LOG', 'solve_stats.jsonl')
+
+# 무작위 표본 모드 이름 ('보여 줄 계획' 선택지)
+SAMPLE_MODE = '무작위 표본'
+
+# 서버에 들고 있으며 화면에서 정렬·필터할 수 있는 최대 계획 수 (전체 결과는 파일 다운로드로 제공)
+MAX_VIEWER_ROWS = 1_000_000
+# 계산이 끝나면 바로 만드는 엑셀 파일에 담을 최대 계획 수 (행 쓰기가 느려 화면이 멈추지 않도록)
+MAX_EXCEL_ROWS = 100_000
+# 결과 표 한 쪽에 보여 줄 행 수 선택지 (브라우저에는 보이는 쪽만 보냅니다)
+PAGE_SIZES = (50, 100, 500, 1000)
+# 예산 범위 보기에서 한 번에 계산할 수 있는 예산 수
+MAX_SWEEP_POINTS = 2000
+# 쪽 번호 입력의 최댓값 (브라우저가 정확히 다루는 정수 범위)
+MAX_PAGE_NUMBER = 2 ** 53 - 1
 
 st.title("편리한 예산🍞만들기")
 st.markdown('<p style="color: #a8a888;text-align: right;">SimBud beta (Budget Simulator V2.00)by 교사 박현수, 버그 및 개선 문의: <a href="mailto:hanzch84@gmail.com">hanzch84@gmail.com</a></p>', unsafe_allow_html=True)
@@ -578,42 +566,6 @@ with col_input_budget:
 if 'item_count' not in st.session_state:
     st.session_state.item_count = 5
 
-# 중복 단가 상태 초기화
-if 'has_duplicate_prices' not in st.session_state:
-    st.session_state.has_duplicate_prices = False
-
-def find_duplicate_price_indices(prices_with_indices):
-    """중복된 단가의 인덱스 찾기 (첫 번째 제외한 중복 항목 반환)"""
-    seen = {}
-    duplicates_to_uncheck = []
-    
-    for idx, price in prices_with_indices:
-        if price in seen:
-            duplicates_to_uncheck.append(idx)
-        else:
-            seen[price] = idx
-    
-    return duplicates_to_uncheck
-
-def uncheck_duplicate_prices():
-    """중복된 단가 항목의 체크 해제 (첫 번째만 유지)"""
-    # 활성화된 항목의 (원본 인덱스, 단가) 수집
-    prices_with_indices = []
-    for i in range(st.session_state.item_count):
-        if st.session_state.get(f'item_usable_{i}', True):
-            price = st.session_state.get(f'item_price_{i}', 0)
-            if price > 0:
-                prices_with_indices.append((i, price))
-    
-    # 중복 항목 찾기
-    duplicates_to_uncheck = find_duplicate_price_indices(prices_with_indices)
-    
-    # 중복 항목 체크 해제
-    for idx in duplicates_to_uncheck:
-        st.session_state[f'item_usable_{idx}'] = False
-    
-    st.session_state.has_duplicate_prices = False
-
 # 정렬 상태 초기화
 if 'sort_key' not in st.session_state:
     st.session_state.sort_key = None
@@ -700,6 +652,7 @@ item_names = []
 item_prices = []
 min_quantities = []
 max_quantities = []
+item_rows = []  # 계산에 넣은 물품의 입력 행 번호 (선호 품목 찾기용)
 
 for i in range(st.session_state.item_count):
     col1, col2, col3, col4, col5 = st.columns([3.5, 1.4, 1.4, 3, 0.7])
@@ -770,6 +723,117 @@ for i in range(st.session_state.item_count):
         item_prices.append(item_price)
         min_quantities.append(item_min)
         max_quantities.append(item_max)
+        item_rows.append(i)
+
+@st.cache_resource
+def get_solve_cache():
+    """모든 세션이 함께 쓰는 계산 결과 캐시"""
+    return ResultCache()
+
+@st.cache_resource
+def get_level_cache():
+    """모든 세션이 함께 쓰는 DP 단계 테이블 캐시
+
+    품목 하나를 고쳐 다시 계산하면 그보다 싼 품목들의 단계만 다시 씁니다. (품목마다 한 번씩 고치면
+    평균 절반 가까이, 가장 싼 품목을 고치거나 단가의 최대공약수가 바뀌면 하나도 못 씀)
+    """
+    return ResultCache(max_entries=256)
+
+# 계산 설정
+with st.expander("⚙️ 계산 설정", expanded=False):
+    time_limit_input = st.number_input(
+        "계산 제한 시간(초)",
+        min_value=1,
+        max_value=600,
+        value=20,
+        key="time_limit",
+        help="이 시간이 지나면 계산을 멈춥니다. 계산 중에는 취소 버튼으로 언제든 멈출 수 있습니다.",
+        format="%d"
+    )
+    # 순위 기준을 고르면 전체 계획 대신 가장 좋은 k 개만 찾고(가망 없는 가지는 건너뜀),
+    # 무작위 표본을 고르면 계획을 나열하지 않고 고르게 k 개만 뽑습니다.
+    col_rank, col_rank_k, col_preferred, col_seed = st.columns([4, 2, 4, 2])
+    with col_rank:
+        rank_objective = st.selectbox("보여 줄 계획", ('순위 없이 모두', SAMPLE_MODE) + RANKING_OBJECTIVES,
+                                      key="rank_objective")
+    with col_rank_k:
+        rank_k = st.number_input("몇 개", min_value=1, max_value=100_000, value=100, key="rank_k",
+                                 disabled=rank_objective == '순위 없이 모두', format="%d")
+    with col_preferred:
+        # 계산에 넣는 물품만 고를 수 있고, 고른 물품을 지우거나 계산에서 빼면 선택을 비웁니다.
+        # (남은 첫 물품으로 조용히 바뀌어 고르지 않은 물품으로 순위를 매기지 않도록)
+        if st.session_state.get('rank_preferred') not in item_rows:
+            st.session_state['rank_preferred'] = None
+        rank_preferred = st.selectbox(
+            "선호 품목", item_rows, key="rank_preferred", placeholder="물품을 고르세요",
+            format_func=lambda i: st.session_state.get(f'item_name_{i}') or f'물품{i+1}',
+            disabled=rank_objective != RANK_PREFERRED)
+    with col_seed:
+        sample_seed = st.number_input("seed", min_value=0, value=None, step=1, key="sample_seed",
+                                      help="같은 seed 면 같은 표본이 나옵니다. 비우면 매번 다르게 뽑습니다.",
+                                      disabled=rank_objective != SAMPLE_MODE)
+    cache_hits, cache_misses, cache_entries, cache_bytes = get_solve_cache().stats()
+    level_hits, _, level_entries, level_bytes = get_level_cache().stats()
+    st.caption(
+        f"결과 캐시: 적중 {cache_hits:,d}회 · 미적중 {cache_misses:,d}회 · "
+        f"보관 {cache_entries:,d}건({cache_bytes / 1024 / 1024:,.1f}MB) · "
+        f"DP 단계 재사용 {level_hits:,d}회(고친 품목보다 싼 품목의 단계만) · "
+        f"보관 {level_entries:,d}단계({level_bytes / 1024 / 1024:,.1f}MB)"
+    )
+
+# 예산 범위 보기 (여러 예산을 DP 테이블 한 번으로 풀어 비교)
+with st.expander("📈 예산 범위로 보기", expanded=False):
+    col_sweep_start, col_sweep_end, col_sweep_step, col_sweep_run = st.columns([3, 3, 3, 2])
+    with col_sweep_start:
+        sweep_start = st.number_input("시작 예산", min_value=1, value=None, step=10000, key="sweep_start",
+                                      placeholder="예산", format="%d")
+    with col_sweep_end:
+        sweep_end = st.number_input("끝 예산", min_value=1, value=None, step=10000, key="sweep_end",
+                                    placeholder="예산 + 100,000", format="%d")
+    with col_sweep_step:
+        sweep_step = st.number_input("간격", min_value=1, value=10000, step=1000, key="sweep_step", format="%d")
+    with col_sweep_run:
+        run_sweep = st.button("범위 계산", key="run_sweep", use_container_width=True)
+    if run_sweep:
+        st.session_state.pop('budget_sweep', None)
+        # 비워 두면 입력한 예산부터 10만 원 위까지 봅니다.
+        sweep_start = sweep_start or max(int(budget_input or 0), 1)
+        sweep_end = sweep_end or sweep_start + 100000
+        sweep_points = range(sweep_start, sweep_end + 1, sweep_step)
+        if len(item_prices) == 0:
+            st.error('물품을 하나 이상 입력하세요.')
+        elif len(sweep_points) == 0:
+            st.error('끝 예산이 시작 예산보다 작습니다.')
+        elif len(sweep_points) > MAX_SWEEP_POINTS:
+            st.error(f'예산은 한 번에 {MAX_SWEEP_POINTS:,d}개까지 계산할 수 있습니다. 간격을 늘려 주세요.')
+        else:
+            try:
+                st.session_state['budget_sweep'] = sweep_budgets(
+                    sweep_points, zip(item_names, item_prices, min_quantities, max_quantities),
+                    {'time_limit': time_limit_input, 'level_cache': get_level_cache()})
+            except (ValueError, TimeoutError) as e:
+                st.error(f'에러입니다.: {e}')
+    budget_sweep = st.session_state.get('budget_sweep')
+    if budget_sweep is not None:
+        sweep_labels = plan_column_names(budget_sweep.prices, budget_sweep.labels)
+        df_sweep = pd.DataFrame(
+            [[point.budget, '예' if point.exact else '아니오', point.case_count, point.best_total, point.leftover]
+             + point.plan for point in budget_sweep.points],
+            columns=['예산', '정확히 맞춤', '계획 수', '사용 금액', '잔액'] + sweep_labels)
+        col_count_chart, col_leftover_chart = st.columns(2)
+        with col_count_chart:
+            # 계획 수가 int64 를 넘을 수 있으므로 실수로 바꿔 그립니다.
+            st.line_chart(pd.DataFrame({'계획 수': [float(count) for count in df_sweep['계획 수']]},
+                                       index=df_sweep['예산']))
+        with col_leftover_chart:
+            st.bar_chart(df_sweep.set_index('예산')[['잔액']])
+        st.caption(f"예산 {len(budget_sweep.points):,d}개를 한 번에 계산했습니다. "
+                   f"(상태 {budget_sweep.state_count:,d}개, {budget_sweep.elapsed:,.2f}초) 예시 계획은 예산마다 첫 번째 계획입니다.")
+        st.dataframe(df_sweep, hide_index=True, use_container_width=True)
+        sweep_output = BytesIO()
+        write_sweep_csv(sweep_output, budget_sweep)
+        st.download_button("📥 예산 범위 결과 (CSV)", data=sweep_output.getvalue(), file_name="예산범위_결과.csv",
+                           mime="text/csv", on_click="ignore")
 
 # 버튼 및 정보 표시
 col_left, col_label_fixed, col_right = st.columns([2, 9, 2])
@@ -784,87 +848,129 @@ with col_left:
 with col_label_fixed:
     fixed_budget = sum(a * b for a, b in zip(min_quantities, item_prices))
     max_limit_total = sum(a * b for a, b in zip(max_quantities, item_prices))
+    # 계산하기 전에 정확한 계획이 있는지 비트셋으로 바로 확인합니다. (입력이 같으면 캐시에서 꺼냄)
+    preflight_text = ''
+    if budget_input and item_prices:
+        try:
+            feasibility = preflight(budget_input, zip(item_names, item_prices, min_quantities, max_quantities))
+        except ValueError as e:
+            preflight_text = f" · ❌ {e}"
+        else:
+            # 예산이 아주 커서 미리 보기를 건너뛰면(None) 합계만 보여 줍니다.
+            if feasibility is not None and feasibility.exact:
+                preflight_text = " · ✅ 예산에 딱 맞는 계획이 있습니다"
+            elif feasibility is not None:
+                preflight_text = (f" · ⚠️ 딱 맞는 계획 없음, 가장 가까운 금액 {feasibility.best_total:,d}원"
+                                  f"(잔액 {feasibility.leftover:,d}원)")
     st.warning(
         f"확정: {fixed_budget:,d}원(남은 예산: {(budget_input - fixed_budget):,d}원) 구매제한: {max_limit_total:,d}원"
+        f"{preflight_text}"
     )
 
 # 계산 버튼
 with col_right:
     if st.button("계산하기", type="primary"):
-        # 이전 엑셀 캐시 초기화
+        # 이전 엑셀 캐시와 결과 표 보기 설정 초기화
         if 'excel_data' in st.session_state:
             del st.session_state['excel_data']
+        for key in [key for key in st.session_state if key.startswith('view_')]:
+            del st.session_state[key]
         if 'last_result_hash' in st.session_state:
             del st.session_state['last_result_hash']
+        # 이전 계산 작업 정리 (아직 돌고 있으면 취소)
+        previous_job = st.session_state.pop('solve_job', None)
+        if previous_job is not None:
+            previous_job.cancel()
         
         if budget_input == "" or budget_input <= 0:
             result_text = '예산을 정확히 입력하세요.(*0보다 큰 자연수)'
-            st.session_state.has_duplicate_prices = False
         elif len(item_prices) <= 1:
             result_text = '최소 2종류 이상의 단가를 입력하세요.'
-            st.session_state.has_duplicate_prices = False
         elif min(item_prices) <= 0:
             result_text = '단가가 0보다 작거나 같습니다.'
-            st.session_state.has_duplicate_prices = False
         elif max(item_prices) > budget_input:
             result_text = '예산이 부족합니다.'
-            st.session_state.has_duplicate_prices = False
         elif max_limit_total < budget_input:
             result_text = f'최대구매금액({max_limit_total:,d}원)이 예산({budget_input:,d}원)보다 작아 예산을 다 쓸 수 없습니다.'
-            st.session_state.has_duplicate_prices = False
         elif fixed_budget > budget_input:
             result_text = f'최소구매금액({fixed_budget:,d}원)이 예산({budget_input:,d}원)보다 많아 예산 내에서 쓸 수 없습니다.'
-            st.session_state.has_duplicate_prices = False
-        elif len(item_prices) != len(set(item_prices)):
-            result_text = '중복된 단가가 있습니다.'
-            st.session_state.has_duplicate_prices = True
+        elif rank_objective == RANK_PREFERRED and rank_preferred not in item_rows:
+            result_text = '계산 설정에서 선호 품목을 고르세요.'
         else:
-            st.session_state.has_duplicate_prices = False
-            overlay_container = st.empty()
-            overlay_container.markdown("""
-            <style>
-            .overlay {
-                position: fixed;top: 0;left: 0;width: 100%;height: 100%;
-                background: rgba(0, 0, 0, 0.7);z-index: 9999;display: flex;
-                justify-content: center;align-items: center;flex-direction: column;}
-            .spinner {
-                width: 50px;height: 50px;border: 5px solid #333;
-                border-top: 5px solid #FFC83D;border-radius: 50%;
-                animation: spin 1s linear infinite;margin-bottom: 15px;}
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }}
-            .calc-text {color: #FFC83D;font-size: 18px;font-weight: bold;}
-            </style>
-            <div class="overlay">
-                <div class="spinner"></div>
-                <div class="calc-text">20초간 계산을 시도합니다.</div>
-            </div>""", unsafe_allow_html=True)
-
-            result_text, result_list, result_prices, result_labels = calculate_budget(
-                budget_input, item_names, item_prices, min_quantities, max_quantities
+            # 시작하기 전에 엔진과 예상 시간을 정해 두고, 제한 시간을 넘을 것 같으면 진행 화면에서 경고합니다.
+            st.session_state['solve_plan'] = (
+                plan_purchase(budget_input, item_prices, min_quantities, max_quantities), time_limit_input)
+            ranking, sample = None, None
+            if rank_objective in RANKING_OBJECTIVES:
+                preferred = item_rows.index(rank_preferred) if rank_objective == RANK_PREFERRED else None
+                ranking = Ranking(rank_objective, rank_k, preferred)
+            elif rank_objective == SAMPLE_MODE:
+                sample = Sampling(rank_k, sample_seed)
+            # 계산은 세션에 묶인 백그라운드 스레드에서 돌리고, 화면은 진행 상황만 주기적으로 갱신합니다.
+            st.session_state['solve_job'] = BackgroundSolve(
+                calculate_budget,
+                (budget_input, item_names, item_prices, min_quantities, max_quantities, time_limit_input),
+                {'solve_cache': get_solve_cache(), 'ranking': ranking, 'sample': sample,
+                 'level_cache': get_level_cache()}
             )
-            overlay_container.empty()
 
-# 중복 단가 해제 버튼 (중복이 있을 때만 표시)
-if st.session_state.get('has_duplicate_prices', False):
-    col_dup_left, col_dup_btn, col_dup_right = st.columns([4, 4, 4])
-    with col_dup_btn:
-        if st.button("🔄 중복 단가 일괄 해제", type="primary", key="uncheck_duplicates"):
-            uncheck_duplicate_prices()
-            st.rerun()
+@st.fragment(run_every=0.5)
+def show_solve_progress():
+    """백그라운드 계산 진행 상황 표시 (0.5초마다 이 부분만 다시 그림)"""
+    solve_job = st.session_state.get('solve_job')
+    if solve_job is None:
+        return
+    if solve_job.done:
+        # 계산이 끝나면 화면 전체를 다시 그려 결과를 표시합니다.
+        st.rerun()
+    solve_plan, plan_time_limit = st.session_state.get('solve_plan', (None, None))
+    if solve_plan is not None:
+        if solve_plan.seconds > plan_time_limit:
+            st.warning(describe_plan(solve_plan, plan_time_limit))
+        else:
+            st.caption(describe_plan(solve_plan))
+    progress = solve_job.progress
+    eta = progress.eta()
+    eta_text = f"약 {eta:,.1f}초" if eta is not None else "추정 중"
+    st.progress(
+        min(progress.fraction, 1.0),
+        text=f"탐색한 상태 {progress.states:,d}개 · 찾은 해 {progress.solutions:,d}개"
+    )
+    col_status, col_cancel = st.columns([10, 3])
+    with col_status:
+        st.caption(f"경과 {progress.elapsed():,.1f}초 · 남은 시간 {eta_text}")
+    with col_cancel:
+        if st.button("계산 취소", key="cancel_solve"):
+            solve_job.cancel()
+
+# 백그라운드 계산 결과 반영 (계산 중이면 진행 상황 표시)
+solve_job = st.session_state.get('solve_job')
+if solve_job is not None:
+    if not solve_job.done:
+        result_text = '계산 중입니다...'
+        show_solve_progress()
+    elif solve_job.error is not None:
+        result_text = f'에러입니다.: {solve_job.error}'
+    else:
+        result_text, result_list, result_prices, result_labels, result_stats, result_distribution = solve_job.result
 
 # 프로그레스 바 및 다운로드 버튼 영역 (계산하기 버튼과 코드박스 사이)
 download_area = st.empty()
 
-# DataFrame 준비 (다운로드 버튼용)
-df_result = None
+# 결과 표 준비 (계획은 서버에 두고 화면에는 보이는 쪽만 보내며, 전체는 파일로 흘려 씁니다)
+# 단계별 시간은 결과를 처음 그릴 때만 잽니다. (다시 그릴 때마다 더해지지 않도록)
+first_stats = result_stats if result_stats is not None and not result_stats.logged else None
+plan_table = None
 try:
     if result_list and result_prices:
-        df_result = pd.DataFrame(result_list, columns=[f'{price:,d}원' for price in result_prices])
-        df_result['금액'] = df_result.mul(result_prices).sum(axis=1)
+        # 계산 결과마다 한 번만 계획 행렬과 금액 열을 만들어 세션에 들고 있습니다.
+        if st.session_state.get('plan_table_job') is not solve_job:
+            with measure(first_stats, PHASE_DATAFRAME):
+                st.session_state['plan_table'] = PlanTable(result_list.head(MAX_VIEWER_ROWS), result_prices)
+            st.session_state['plan_table_job'] = solve_job
+        plan_table = st.session_state['plan_table']
         
-        if len(df_result) > 0:
+        if len(plan_table) > 0:
             # 프로그레스 바로 엑셀 생성
             if 'excel_data' not in st.session_state or st.session_state.get('last_result_hash') != hash(result_text):
                 with download_area.container():
@@ -875,7 +981,8 @@ try:
                         progress_bar.progress(value)
                         status_text.text(message)
                     
-                    result_excel = create_result_excel(result_text, df_result, result_labels, update_progress)
+                    with measure(first_stats, PHASE_EXCEL):
+                        result_excel = create_result_excel(result_text, result_list, result_prices, result_labels, update_progress)
                     
                     time.sleep(0.3)  # 완료 상태 잠시 표시
                     progress_bar.empty()
@@ -886,25 +993,86 @@ try:
             
             # 다운로드 버튼
             with download_area.container():
+                excel_label = "📥 결과 다운로드 (Excel)"
+                if result_list.count > MAX_EXCEL_ROWS:
+                    excel_label = f"📥 결과 다운로드 (Excel, 앞 {MAX_EXCEL_ROWS:,d}개)"
                 st.download_button(
-                    label="📥 결과 다운로드 (Excel)",
+                    label=excel_label,
                     data=st.session_state['excel_data'],
                     file_name="예산계산_결과.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     type="primary"
                 )
+                # 분석용 열 형식 파일은 버튼을 누를 때 같은 계획 스트림에서 만들어 내려받습니다.
+                column_formats = [('CSV.gz', write_result_csv_gz, "예산계산_결과.csv.gz", "application/gzip")]
+                if arrow_available():
+                    column_formats += [
+                        ('Parquet', write_result_parquet, "예산계산_결과.parquet", "application/vnd.apache.parquet"),
+                        ('Arrow', write_result_arrow, "예산계산_결과.arrow", "application/vnd.apache.arrow.file"),
+                    ]
+                for col_format, (format_name, writer, file_name, mime) in zip(
+                        st.columns(len(column_formats)), column_formats):
+                    with col_format:
+                        st.download_button(
+                            label=f"📦 {format_name}",
+                            data=make_column_export(writer, result_list, result_prices, result_labels),
+                            file_name=file_name,
+                            mime=mime,
+                            on_click="ignore",
+                            use_container_width=True
+                        )
 except:
     pass
 
+# 계산 통계를 로그에 한 번만 남깁니다. (쓸 수 없는 환경이면 건너뜀)
+if first_stats is not None:
+    first_stats.logged = True
+    try:
+        append_stats_log(STATS_LOG_PATH, first_stats)
+    except OSError as e:
+        print('통계 로그를 쓸 수 없습니다:', e)
+
 # 결과 출력
 if len(result_text.split('\n')) < 30:
     st.code(result_text, language="java")
 else:
     st.text_area("결과 출력", result_text, height=300)
 
-# DataFrame 결과 표시
+# 결과 표 표시 (정렬·필터·쪽 이동은 이 부분만 다시 그립니다)
 try:
-    if df_result is not None and len(df_result) > 0:
-        st.dataframe(df_result, hide_index=True, use_container_width=True)
+    if plan_table is not None and len(plan_table) > 0:
+        if result_list.count > len(plan_table) and result_list.random_access:
+            st.caption(f"정렬·필터는 처음 {len(plan_table):,d}개에서 할 수 있고, 계산 순서로는 전체 "
+                       f"{result_list.count:,d}개 중 원하는 쪽으로 바로 갈 수 있습니다.")
+        elif result_list.count > len(plan_table):
+            st.caption(f"화면에서는 처음 {len(plan_table):,d}개를 볼 수 있습니다. 전체 {result_list.count:,d}개는 파일로 받으세요.")
+        if len(set(result_prices)) < len(result_prices):
+            st.caption("단가가 같은 품목(#번호가 붙은 열)은 한 행에 여러 나눔 중 하나만 보여 줍니다. "
+                       "같은 묶음 합계라면 그 품목들끼리 수량을 바꿔 사도 금액이 같습니다.")
+        show_result_table(plan_table, result_columns(result_prices), result_list)
+        if result_distribution is not None:
+            with st.expander("📊 품목별 수량 분포", expanded=False):
+                show_quantity_distribution(result_distribution, result_labels, result_prices)
 except:
     pass
+
+# 성능 정보 (단계별 시간과 엔진 카운터)
+if result_stats is not None and result_stats.timings:
+    with st.expander("📊 성능 정보", expanded=False):
+        stats_data = result_stats.to_dict()
+        col_timings, col_counters = st.columns(2)
+        with col_timings:
+            st.dataframe(
+                pd.DataFrame(list(stats_data['timings'].items()), columns=['단계', '시간(초)']),
+                hide_index=True, use_container_width=True
+            )
+        with col_counters:
+            st.dataframe(
+                pd.DataFrame([(name, f'{value:,}') for name, value in stats_data['counters'].items()],
+                             columns=['항목', '값']),
+                hide_index=True, use_container_width=True
+            )
+        info = stats_data['info']
+        if info:
+            st.caption(f"엔진: {info.get('engine')} · 예상 {info.get('predicted_seconds', 0):,.2f}초 · "
+                       f"캐시 사용: {'예' if info.get('from_cache') else '아니오'}")
@@ -1,9 +1,26 @@
 import streamlit as st
-import numpy as np
 import pandas as pd
 import unicodedata
 import time
-from functools import reduce
+import os
+
+from budget_engine import (
+    ENGINE_ODOMETER,
+    choose_plan,
+    count_item_plans,
+    describe_grouping,
+    describe_item_count,
+    describe_plan,
+    describe_reduction,
+    expand_group_quantities,
+    group_by_price,
+    has_merged_items,
+    normalize_by_gcd,
+    odometer_search,
+    parallel_odometer_search,
+    plan_purchase,
+    plan_totals,
+)
 
 # startupdate
 st.markdown(
@@ -88,14 +105,10 @@ st.markdown(
     </style>""", unsafe_allow_html=True)
 
 # ＊함수 구역＊
-# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
-
+# 초 단위 연산시간제한
+TIME_LIMIT = 20
 
-def get_conmplexcity(price, max, min):
-    last_index = price.label(min(price))
-    combination = [x-y+1 for x, y in zip(max, min)]
-    combination[last_index] = 1
-    return reduce(lambda x, y: x * y, combination)
+# 문자열의 출력 길이를 구하는 함수(텍스트박스, 콘솔 출력용)
 
 
 def get_print_length(s):
@@ -205,27 +218,20 @@ def on_max_change(index):
 # 예산 계산 함수
 
 
-def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
+def calculate_budget(budget, labels, prices, base_quantity, limited_quantity, workers=1):
     try:
         text_out = f'사용해야 할 예산은 {format(budget,",")}원입니다.\n'
         item_count = len(prices)  # 계산해야 할 물품의 종류가 몇 개인지 저장합니다.
-        quantities = [0] * item_count  # 배열은 각 아이템의 구매 수량을 저장하는 리스트입니다.
-        balances = [0] * item_count  # 배열은 각 단계에서 남은 예산을 추적합니다.
-        last_index = item_count - 1  # 마지막 인덱스 번호를 아이템 개수-1로 정합니다.
-        # 순차적으로 조작할 마지막 노드를 마지막 인덱스 -1로 정합니다.(마지막 인덱스는 '남은 예산//단가'계산)
-        last_node = last_index - 1
-        node = last_node  # 노드(현재 처리 중인 아이템을 가리킵니다.) 넘버를 마지막 노드에 위치시킵니다.
-        is_overrun = False  # 예산을 초과하는지 상태를 체크합니다.
-
-        cases_count = 0  # 얼마나 많은 케이스를 검토했는지 체크하는 변수(연산량 확인용)
-        cases_exact = []  # 잔액 없이 예산을 소진하는 케이스(조합)를 저장하는 리스트
-        cases_close = []  # 잔액이 남지만 최대한 예산을 소진하는 케이스(조합)를 저장하는 리스트
 
         # labels와 prices를 결합하여 prices 기준으로 내림차순 정렬
         combined = zip(prices, labels, base_quantity, limited_quantity)
         sorted_combined = sorted(combined, reverse=True)
         # 정렬된 데이터를 다시 분리
         prices, labels, base_quantity, limited_quantity = zip(*sorted_combined)
+        # 단가의 최대공약수로 단가와 예산을 나눠 연산 숫자를 줄입니다.
+        # 같은 단가의 품목은 기본·최대 구매량을 더한 묶음 하나로 계산하고, 결과를 품목별로 나눕니다.
+        groups = group_by_price(prices, base_quantity, limited_quantity)
+        unit, unit_prices, _, budget_residue = normalize_by_gcd(groups.prices, budget)
         # 내림차순 정렬된 아이템 데이터를 출력
         text_width = 25
         text_out += '_' * text_width + '정렬된 데이터' + '_' * text_width + '\n'
@@ -233,72 +239,43 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
             label = cut_string(labels[n_prt], 28)
             text_out += f"품목 #{n_prt + 1:02d} {label} = {prices[n_prt]:7,d} 원 ({base_quantity[n_prt]:3d}  ~ {limited_quantity[n_prt]:3d})\n"
         text_out += '_' * (text_width*2+13) + '\n'
+        text_out += describe_reduction(unit, budget_residue)
+        text_out += describe_grouping(groups, labels)
 
         # 기본 구매량을 구매한 후 남는 예산을 예산으로 잡고 전 예산을 저장합니다.
         total_budget = budget
         fixed_budget = sum(a * b for a, b in zip(base_quantity, prices))
         budget -= fixed_budget
+        # 남은 예산을 단위로 바꿉니다.(나머지는 어떤 조합으로도 쓸 수 없는 금액)
+        budget //= unit
         # 최소 구매량을 뺀 최대 구매 개수를 구합니다.
         limits = [lim - base for lim,
-                  base in zip(limited_quantity, base_quantity)]
-        complexity = np.prod(np.array(limits[:-1])+1)
+                  base in zip(groups.limited_quantity, groups.base_quantity)]
+        # 오도미터가 검토할 케이스 수(복잡도)와 예상 시간
+        plan = choose_plan(unit_prices, limits, budget, (ENGINE_ODOMETER,))
 
-        time_limit = 20  # 초 단위 연산시간제한
+        time_limit = TIME_LIMIT
         start_time = time.time()
-        # 연산 코어 모듈
-        while not (node == -1 and is_overrun == True):
-            # 현재 시간 확인
-            current_time = time.time()
-            execution_time = current_time - start_time
-            # 시간 제한 초과 검사
-            if execution_time > time_limit:
-                raise TimeoutError(
-                    f"시간초과 에러 {execution_time:,.4f}초 경과: 연산이 너무 복잡합니다.\n복잡도: {complexity:,}")
-            # 랙 연산의 첫 인덱스를 위해 balances[-1]에 budget을저장합니다.
-            balances[-1] = budget
-            # quantity[n]의 아이템 개수와 단가의 곱만큼 예산에서 빼고 잔액에 저장합니다.(마지막 아이템 제외)
-            for n in range(last_index):
-                balances[n] = balances[n - 1] - (quantities[n] * prices[n])
-            # 마지막 아이템을 몇 개 살 수 있는지 계산합니다.(마지막 아이템에 구매제한이 있으면 더 작은 값을 선택)
-            quantities[last_index] = min(
-                balances[last_index - 1] // prices[last_index], limits[last_index])
-            balances[last_index] = balances[last_index - 1] - \
-                (quantities[last_index] * prices[last_index])
-
-            # 에러체크
-            if any(quantities[i] > limits[i] for i in range(item_count)):  # 최대구매수초과검사
-                is_overrun = True  # 오버런 상태 선언
-                quantities[node] = 0  # 노드 구매량 초기화
-                node -= 1  # 노드 수준 1 올림
-            elif any([i < 0 for i in balances]):  # 예산 초과 검사
-                is_overrun = True  # 오버런 상태 선언
-                quantities[node] = 0  # 노드 구매량 초기화
-                node -= 1  # 노드 수준 1 올림
-
-            #  IF there is no ERROR, Set over to False.
-            # and reset node to the end(index of just before the last item in the list)
-            else:  # 에러가 없을 때 결과 저장
-                is_overrun = False  # 오버런 상태 초기화(해제)
-                node = last_node  # 노드 수준 초기화
-                # 예산에 정확히 맞는 경우, case_exact 리스트에 결과를 추가합니다.
-                if (balances[last_index] == 0):
-                    cases_exact.append(list(quantities))
-                # 완벽한 케이스를 하나라도 찾으면 가속을 위해 나머지는 무시합니다.
-                elif len(cases_exact) > 0:
-                    pass
-                # 예산이 남는 경우, case_close 리스트에 결과를 추가합니다.
-                # and (balances[last_index] < prices[last_index]):
-                elif (balances[last_index] > 0):
-                    cases_close.append(list(quantities))
-
-            # 다음 케이스 계산 준비
-            quantities[node] += 1
-            cases_count += 1
+        # 연산 코어 모듈(앞 품목부터 수량을 올려 보는 오도미터, 마지막 품목은 '남은 예산//단가')
+        try:
+            if workers > 1:
+                # 첫 품목의 수량 범위를 나눠 여러 프로세스에서 동시에 탐색합니다.
+                cases_count, cases_exact, cases_close, speedup = parallel_odometer_search(
+                    unit_prices, limits, budget, workers, start_time, time_limit)
+            else:
+                cases_count, cases_exact, cases_close = odometer_search(
+                    unit_prices, limits, budget, None, start_time, time_limit)
+        except TimeoutError as e:
+            raise TimeoutError(f"{e}: 연산이 너무 복잡합니다.\n복잡도: {plan.work:,}")
 
         end_time = time.time()
         execution_time = end_time - start_time
         print(f"실행 시간: {execution_time}초")
 
+        # 나머지가 있으면 잔액 0인 케이스도 실제로는 나머지만큼 남는 최선의 근사치입니다.
+        if budget_residue and len(cases_exact) > 0:
+            cases_close, cases_exact = cases_exact, []
+
         # 계산 결과 출력 부분
         if len(cases_exact) == 0:  # 완벽한 결과가 없으면 근사치 리스트를 결과로 설정
             text_out += f'{total_budget:,d}원의 예산에 맞게 구입할 방법이 없습니다.\n'
@@ -306,12 +283,24 @@ def calculate_budget(budget, labels, prices, base_quantity, limited_quantity):
             list_show = cases_close
 
         else:  # 완벽한 결과가 있으면 결과로 설정
-            text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
+            if has_merged_items(groups):
+                # 같은 단가 품목을 나눠 사는 방법까지 셉니다. (기본 구매량을 더하기 전의 묶음 계획으로 셈)
+                item_count = count_item_plans([cases_exact.rows], groups, base_quantity, limited_quantity)
+                text_out += f'예산에 맞는 {item_count:,d}개의 완벽한 방법을 찾았습니다.\n'
+                text_out += describe_item_count(item_count, len(cases_exact))
+            else:
+                text_out += f'예산에 맞는 {len(cases_exact):,d}개의 완벽한 방법을 찾았습니다.\n'
             list_show = cases_exact
 
         # 모든 행에 더하기
-        list_show = (np.array(list_show) + np.array(base_quantity)).tolist()
-        text_out += f'이 프로그램은 {cases_count + 1:,d}개의 케이스를 계산했습니다.\n'
+        # 계획 행렬에 기본 구매량을 제자리에서 더한 뒤, 묶인 품목이 있으면 품목별로 나눠 담습니다.
+        list_show = list_show.add_offset(groups.base_quantity).rows
+        if has_merged_items(groups):
+            list_show = expand_group_quantities(list_show, groups, base_quantity, limited_quantity)
+            text_out += '표에는 묶음마다 앞 품목부터 채운 대표 나눔 하나씩만 보여 줍니다.\n'
+        text_out += f'이 프로그램은 {cases_count:,d}개의 케이스를 계산했습니다.\n'
+        if workers > 1:
+            text_out += f'{workers}개 프로세스로 나눠 계산했습니다.(속도 향상 약 {speedup:.1f}배)\n'
         return text_out, list_show, prices  # 결과를 리턴
 
     except Exception as e:
@@ -406,6 +395,12 @@ for i in range(st.session_state.item_count):
         min_quantities.append(item_min)
         max_quantities.append(item_max)
 
+# 병렬 계산 설정(첫 품목의 수량 범위를 여러 프로세스에 나눠 계산합니다)
+with st.expander("고급 설정", expanded=False):
+    workers_input = st.number_input("병렬 계산 프로세스 수", min_value=1, max_value=os.cpu_count() or 1,
+                                    value=1, key="workers", format="%d",
+                                    help="2 이상이면 첫 품목의 수량 범위를 나눠 여러 코어에서 동시에 계산합니다.")
+
 col_left, col_label_fixed, col_right = st.columns([2, 9, 2])
 
 # 물품추가 버튼 클릭 시 호출되는 함수
@@ -443,9 +438,13 @@ with col_right:
             result_text = f'최대구매금액({max_limit:,d}원)이 예산({budget_input:,d}원)보다 작아 예산을 다 쓸 수 없습니다.'
         elif fixed_budget > budget_input:
             result_text = f'최소구매금액({fixed_budget:,d}원)이 예산({budget_input:,d}원)보다 많아 예산 내에서 쓸 수 없습니다.'
-        elif len(item_prices) != len(set(item_prices)):
-            result_text = '중복된 단가가 있습니다.'
         else:
+            # 계산 전에 예상 시간을 따져 제한 시간을 넘을 것 같으면 미리 알립니다.
+            solve_plan = plan_purchase(budget_input, item_prices, min_quantities, max_quantities, (ENGINE_ODOMETER,))
+            # 여러 프로세스로 나누면 그만큼 빨라진다고 봅니다.
+            solve_plan = solve_plan._replace(seconds=solve_plan.seconds / workers_input)
+            if solve_plan.seconds > TIME_LIMIT:
+                st.warning(describe_plan(solve_plan, TIME_LIMIT))
             # 스피너를 표시하면서 계산 진행 오버레이와 스피너를 위한 컨테이너 생성
             overlay_container = st.empty()
             # 오버레이와 스피너 추가
@@ -463,7 +462,7 @@ with col_right:
 
             # 계산 결과를 구합니다.
             result_text, result_list, result_prices = calculate_budget(
-                budget_input, item_names, item_prices, min_quantities, max_quantities)
+                budget_input, item_names, item_prices, min_quantities, max_quantities, workers_input)
             # 작업이 완료되면 오버레이와 스피너를 제거합니다.
             overlay_container.empty()
 if len(result_text.split('\n')) < 30:
@@ -472,10 +471,13 @@ else:
     st.text_area("결과 출력", result_text, height=300)
 
 try:
+    # 같은 단가가 여러 개면 품목 번호를 붙여 열 이름을 구분합니다.
+    # 계획 행렬을 복사하지 않고 그대로 표로 씁니다.
     df = pd.DataFrame(result_list, columns=[
-                      f'{price:,d}원' for price in result_prices])
-    # 새로운 열 '금액'을 계산하고 데이터프레임에 추가합니다.
-    df['금액'] = df.mul(result_prices).sum(axis=1)
+                      f'{price:,d}원' if result_prices.count(price) == 1 else f'{price:,d}원 #{idx + 1:02d}'
+                      for idx, price in enumerate(result_prices)], copy=False)
+    # 새로운 열 '금액'은 계획 행렬 × 단가 벡터 한 번으로 계산합니다.
+    df['금액'] = plan_totals(result_list, result_prices)
     if df.__len__() != 0:
         # 결과를 화면에 표시합니다.
         st.dataframe(df, hide_index=True, use_container_width=True)
@@ -0,0 +1,71 @@
+"""작은 문제를 모든 수량 조합으로 풀어 엔진 결과와 비교하는 테스트 도우미"""
+import itertools
+
+import numpy as np
+
+from budget_engine import BudgetItem
+
+
+def all_plans(prices, limits, budget):
+    """budget 이하로 쓰는 모든 계획 (첫 품목부터 사전순)"""
+    ranges = [range(min(limit, budget // price) + 1) for price, limit in zip(prices, limits)]
+    return [plan for plan in itertools.product(*ranges)
+            if sum(price * qty for price, qty in zip(prices, plan)) <= budget]
+
+
+def best_plans(prices, limits, budget):
+    """예산 이하에서 가장 많이 쓰는 금액과 그 금액을 쓰는 계획들 (사전순)"""
+    plans = all_plans(prices, limits, budget)
+    spends = [sum(price * qty for price, qty in zip(prices, plan)) for plan in plans]
+    best = max(spends)
+    return best, [plan for plan, spend in zip(plans, spends) if spend == best]
+
+
+def best_item_plans(budget, items):
+    """BudgetItem 목록을 그대로(기본 구매량 포함) 풀어 가장 많이 쓰는 금액과 그 계획 행렬 (입력 순서 열)"""
+    ranges = [range(item.base_quantity, item.limited_quantity + 1) for item in items]
+    best, plans = -1, []
+    for plan in itertools.product(*ranges):
+        spend = sum(item.price * qty for item, qty in zip(items, plan))
+        if spend > budget:
+            continue
+        if spend > best:
+            best, plans = spend, [plan]
+        elif spend == best:
+            plans.append(plan)
+    return best, np.array(plans, dtype=np.int64).reshape(-1, len(items))
+
+
+def random_unit_problem(rng, max_items=5, max_price=12, max_limit=5, max_budget=60):
+    """서로 다른 단가를 내림차순으로 정렬한 정규화된 문제 (단가, 추가 구매 가능 수량, 예산)"""
+    item_count = rng.randint(1, max_items)
+    prices = sorted(rng.sample(range(1, max_price + 1), item_count), reverse=True)
+    limits = [rng.randint(0, max_limit) for _ in prices]
+    return prices, limits, rng.randint(0, max_budget)
+
+
+def random_items(rng, price_choices, max_items=5, max_base=1, max_extra=4, distinct=False):
+    """화면 입력 그대로의 물품 목록 (distinct 가 아니면 단가가 겹칠 수 있음)"""
+    item_count = rng.randint(1, min(max_items, len(price_choices)) if distinct else max_items)
+    prices = rng.sample(price_choices, item_count) if distinct else [rng.choice(price_choices) for _ in range(item_count)]
+    items = []
+    for idx, price in enumerate(prices):
+        base = rng.randint(0, max_base)
+        items.append(BudgetItem(f'물품{idx + 1}', price, base, base + rng.randint(0, max_extra)))
+    return items
+
+
+def sorted_items(items):
+    """solve() 와 같은 순서(단가 내림차순, 같으면 이름·기본·최대 구매량 내림차순)로 정렬한 (순서, 물품)"""
+    order = sorted(range(len(items)), reverse=True,
+                   key=lambda idx: (items[idx].price, items[idx].label, items[idx].base_quantity,
+                                    items[idx].limited_quantity))
+    return order, [items[idx] for idx in order]
+
+
+def stream_rows(stream):
+    """SolutionStream 의 모든 계획을 행렬 하나로 모음"""
+    batches = list(stream.batches())
+    if not batches:
+        return np.zeros((0, stream.item_count), dtype=np.int64)
+    return np.concatenate(batches).astype(np.int64)
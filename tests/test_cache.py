@@ -0,0 +1,34 @@
+from budget_engine import ENGINE_DENSE_DP, ENGINE_MEMO_DP, BudgetItem, ResultCache, solve
+
+ITEMS = [BudgetItem(f'물품{idx + 1}', price, 0, 20) for idx, price in enumerate([97, 91, 83, 77, 71])]
+
+
+def test_resize_reaccounts_and_evicts():
+    cache = ResultCache(max_entries=8, max_bytes=100)
+    cache.put('가', 1, 40)
+    cache.put('나', 2, 40)
+    cache.resize('나', 50)
+    assert cache.stats()[2:] == (2, 90)
+    # 커진 항목 때문에 제한을 넘으면 가장 오래 안 쓴 항목부터 버립니다.
+    cache.resize('나', 70)
+    assert cache.get('가') is None and cache.stats()[2:] == (1, 70)
+    cache.resize('나', 200)
+    assert cache.stats()[2:] == (0, 0)
+    cache.resize('없음', 10)
+    assert cache.stats()[2:] == (0, 0)
+
+
+def test_cached_dp_result_grows_when_its_index_builds_prefix_sums():
+    cache = ResultCache()
+    solve(3000, ITEMS, {'cache': cache, 'engines': [ENGINE_DENSE_DP]})
+    before = cache.total_bytes
+    solution = solve(3000, ITEMS, {'cache': cache, 'engines': [ENGINE_DENSE_DP], 'sample': (5, 1)})
+    assert solution.from_cache
+    # 표본을 번호로 뽑으며 붙은 누적합(테이블과 같은 크기)만큼 캐시 용량이 늘어납니다.
+    assert cache.total_bytes > before
+
+
+def test_memo_dp_result_is_sized_by_its_memo():
+    cache = ResultCache()
+    solution = solve(3000, ITEMS, {'cache': cache, 'engines': [ENGINE_MEMO_DP]})
+    assert cache.total_bytes >= 100 * solution.state_count
@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import budget_engine.api as api
+from brute_force import all_plans, best_plans, random_items, random_unit_problem, stream_rows
+from budget_engine import build_count_tables, quantity_distributions, solve
+from budget_engine.distribution import leave_one_out_counts
+
+PROBLEMS = [random_unit_problem(random.Random(seed)) for seed in range(80)]
+
+
+def test_leave_one_out_counts_match_brute_force():
+    for prices, limits, budget in PROBLEMS:
+        full = build_count_tables(prices, limits, budget)[0]
+        for idx, (price, limit) in enumerate(zip(prices, limits)):
+            rest_prices, rest_limits = prices[:idx] + prices[idx + 1:], limits[:idx] + limits[idx + 1:]
+            spends = Counter(sum(p * q for p, q in zip(rest_prices, plan))
+                             for plan in all_plans(rest_prices, rest_limits, budget))
+            expected = [spends.get(spend, 0) for spend in range(budget + 1)]
+            assert leave_one_out_counts(full, price, limit).tolist() == expected
+
+
+def test_quantity_distributions_match_brute_force():
+    for prices, limits, budget in PROBLEMS:
+        best, plans = best_plans(prices, limits, budget)
+        tables = build_count_tables(prices, limits, best)
+        for idx, distribution in enumerate(quantity_distributions(tables, prices, limits, best)):
+            expected = Counter(plan[idx] for plan in plans)
+            got = {int(qty): int(count) for qty, count in zip(distribution.quantities, distribution.counts) if count}
+            assert got == expected
+
+
+@pytest.mark.parametrize('max_cells', [api.DENSE_DP_MAX_CELLS, 0])
+@pytest.mark.parametrize('seed', range(40))
+def test_solve_distribution_matches_listed_plans(seed, max_cells, monkeypatch):
+    # 분포는 표에 오르는 계획(묶음마다 대표 나눔)의 품목별 실제 수량을 센 것과 같아야 합니다.
+    monkeypatch.setattr(api, 'DENSE_DP_MAX_CELLS', max_cells)
+    rng = random.Random(seed)
+    items = random_items(rng, [1000, 2000, 3000, 3000, 5000, 7000], max_base=2, max_extra=6)
+    budget = sum(item.price * item.base_quantity for item in items) + 1000 * rng.randint(1, 40)
+    solution = solve(budget, items, {'distribution': True})
+    rows = stream_rows(solution.plans)
+    for idx, distribution in enumerate(solution.distribution):
+        expected = Counter(rows[:, idx].tolist())
+        got = {int(qty): int(count) for qty, count in zip(distribution.quantities, distribution.counts) if count}
+        assert got == expected
+        assert int(np.sum(distribution.counts)) == solution.case_count
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+import budget_engine.api as api
+from brute_force import best_item_plans, random_items, sorted_items, stream_rows
+from budget_engine import (
+    count_item_plans,
+    expand_group_quantities,
+    group_by_price,
+    group_quantities,
+    solve,
+)
+
+PRICE_CHOICES = [300, 300, 500, 700, 700, 1200]
+
+
+def test_group_by_price_merges_equal_prices():
+    groups = group_by_price([700, 700, 500, 300, 300, 300], [1, 0, 0, 2, 0, 1], [3, 2, 4, 5, 1, 2])
+    assert groups.prices == [700, 500, 300]
+    assert groups.base_quantity == [1, 0, 3]
+    assert groups.limited_quantity == [5, 4, 8]
+    assert groups.members == [[0, 1], [2], [3, 4, 5]]
+
+
+def test_expand_group_quantities_fills_front_items_first():
+    groups = group_by_price([700, 700, 500], [1, 0, 0], [3, 2, 4])
+    expanded = expand_group_quantities(np.array([[1, 2], [3, 0], [5, 4]]), groups, [1, 0, 0], [3, 2, 4])
+    assert expanded.tolist() == [[1, 0, 2], [3, 0, 0], [3, 2, 4]]
+    assert group_quantities(expanded, groups).tolist() == [[1, 2], [3, 0], [5, 4]]
+
+
+def test_count_item_plans_matches_brute_force():
+    base, limited = [1, 0, 0, 0], [3, 2, 4, 1]
+    groups = group_by_price([5, 5, 3, 3], base, limited)
+    # 기본 구매량을 뺀 묶음 수량 (5원 묶음 e, 3원 묶음 f)
+    extras = np.array([[0, 0], [2, 1], [4, 5], [3, 2]])
+    expected = 0
+    for extra_five, extra_three in extras.tolist():
+        five_splits = sum(1 for a in range(1, 4) for b in range(3) if a - 1 + b == extra_five)
+        three_splits = sum(1 for c in range(5) for d in range(2) if c + d == extra_three)
+        expected += five_splits * three_splits
+    assert count_item_plans([extras], groups, base, limited) == expected
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_duplicate_prices_match_item_level_brute_force(seed):
+    rng = random.Random(seed)
+    items = random_items(rng, PRICE_CHOICES)
+    fixed = sum(item.price * item.base_quantity for item in items)
+    budget = fixed + 100 * rng.randint(1, 40)
+    _, ordered = sorted_items(items)
+    best, expected = best_item_plans(budget, ordered)
+    for max_cells in (api.ITEM_COUNT_MAX_CELLS, 0):
+        # 품목 단위 카운트와, 묶음 계획마다 나누는 방법 수를 곱해 더하는 길 모두 같은 수를 내야 합니다.
+        api.ITEM_COUNT_MAX_CELLS, saved = max_cells, api.ITEM_COUNT_MAX_CELLS
+        try:
+            solution = solve(budget, items)
+        finally:
+            api.ITEM_COUNT_MAX_CELLS = saved
+        assert solution.best_total == best
+        assert solution.item_case_count == len(expected)
+    # 표에 오르는 계획은 묶음마다 대표 나눔 하나씩이며, 묶음 합계로는 모든 경우를 빠짐없이 한 번씩 담습니다.
+    rows = stream_rows(solution.plans)
+    prices = np.array([item.price for item in ordered])
+    assert (rows @ prices == best).all()
+    assert (rows >= [item.base_quantity for item in ordered]).all()
+    assert (rows <= [item.limited_quantity for item in ordered]).all()
+    group_rows = {tuple(row) for row in group_quantities(rows, solution.groups).tolist()}
+    assert len(group_rows) == len(rows) == solution.case_count
+    assert group_rows == {tuple(row) for row in group_quantities(expected, solution.groups).tolist()}
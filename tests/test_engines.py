@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from brute_force import best_plans, random_unit_problem
+from budget_engine import (
+    ENGINE_CLOSED_FORM,
+    ENGINE_DENSE_DP,
+    ENGINE_MEMO_DP,
+    ENGINE_MITM,
+    ENGINE_ODOMETER,
+    solve_normalized,
+)
+from budget_engine.benchmark import ENGINES
+from budget_engine.planner import estimate_plans
+
+PROBLEMS = [random_unit_problem(random.Random(seed)) for seed in range(120)]
+
+
+def enumerate_plans(batch_factory):
+    rows = [batch for batch in batch_factory() if len(batch)]
+    if not rows:
+        return []
+    return [tuple(row) for row in np.concatenate(rows).tolist()]
+
+
+@pytest.mark.parametrize('engine', list(ENGINES))
+def test_engine_matches_brute_force(engine):
+    # 모든 엔진이 가장 가까운 금액, 계획 수, 계획(사전순)까지 모두 같아야 합니다.
+    solve_func, applicable = ENGINES[engine]
+    checked = 0
+    for prices, limits, budget in PROBLEMS:
+        if not applicable(prices, limits, budget):
+            continue
+        best, expected = best_plans(prices, limits, budget)
+        best_spend, case_count, batch_factory, _ = solve_func(prices, limits, budget, None, None)
+        assert best_spend == best, (prices, limits, budget)
+        assert case_count == len(expected), (prices, limits, budget)
+        assert enumerate_plans(batch_factory) == expected, (prices, limits, budget)
+        checked += 1
+    assert checked > 0
+
+
+@pytest.mark.parametrize('engine', [ENGINE_CLOSED_FORM, ENGINE_ODOMETER, ENGINE_MEMO_DP, ENGINE_DENSE_DP,
+                                    ENGINE_MITM])
+def test_solve_normalized_with_each_planned_engine(engine):
+    for prices, limits, budget in PROBLEMS:
+        plans = {plan.engine: plan for plan in estimate_plans(prices, limits, budget)}
+        if engine not in plans:
+            continue
+        best, expected = best_plans(prices, limits, budget)
+        result = solve_normalized(prices, limits, budget, plan=plans[engine])
+        assert result.solver_name == engine
+        assert (result.best_spend, result.case_count) == (best, len(expected))
+        assert result.exact == (best == budget)
+        assert enumerate_plans(result.batch_factory) == expected
+
+
+def test_inexact_budget_is_never_exact():
+    # 정규화에서 나머지가 남으면 금액이 맞아도 정확한 해로 보지 않습니다.
+    result = solve_normalized([5, 3], [4, 4], 11, exact_possible=False)
+    assert result.best_spend == 11 and not result.exact
@@ -0,0 +1,71 @@
+import numpy as np
+
+from budget_engine import ENGINE_DENSE_DP, BudgetItem, ResultCache, SolveStats, build_count_tables, solve
+
+# 값이 서로 다른 단가 (내림차순으로 정렬된 품목 순서 그대로)
+PRICES = [97, 89, 83, 79, 73, 71, 67, 61]
+LIMITS = [6, 5, 7, 4, 6, 5, 8, 6]
+BUDGET = 1500
+
+
+def reused_levels(prices, limits, budget, level_cache):
+    """build_count_tables 한 번에 캐시에서 다시 쓴 단계 수와 테이블"""
+    stats = SolveStats()
+    tables = build_count_tables(prices, limits, budget, level_cache=level_cache, stats=stats)
+    return stats.counters.get('재사용한 DP 단계', 0), tables
+
+
+def assert_same_tables(tables, prices, limits, budget):
+    fresh = build_count_tables(prices, limits, budget)
+    for table, expected in zip(tables, fresh):
+        np.testing.assert_array_equal(table, expected)
+
+
+def test_limit_edit_reuses_only_cheaper_levels():
+    # 한 품목의 최대 구매량을 고치면 그보다 싼(뒤쪽) 품목들의 단계만 그대로 씁니다.
+    reused_total = 0
+    for edited in range(len(PRICES)):
+        level_cache = ResultCache(max_entries=256)
+        reused_levels(PRICES, LIMITS, BUDGET, level_cache)
+        limits = list(LIMITS)
+        limits[edited] += 1
+        reused, tables = reused_levels(PRICES, limits, BUDGET, level_cache)
+        assert reused == len(PRICES) - 1 - edited
+        assert_same_tables(tables, PRICES, limits, BUDGET)
+        reused_total += reused
+    # 품목마다 한 번씩 고쳐 보면 다시 쓰는 비율은 (n - 1) / 2n 입니다. (8품목이면 28/64)
+    assert reused_total == len(PRICES) * (len(PRICES) - 1) // 2
+
+
+def test_budget_decrease_reuses_every_level():
+    level_cache = ResultCache(max_entries=256)
+    reused_levels(PRICES, LIMITS, BUDGET, level_cache)
+    reused, tables = reused_levels(PRICES, LIMITS, BUDGET - 200, level_cache)
+    assert reused == len(PRICES)
+    assert_same_tables(tables, PRICES, LIMITS, BUDGET - 200)
+    # 예산을 늘리면 캐시된 테이블이 짧아 처음부터 다시 쌓습니다.
+    reused, _ = reused_levels(PRICES, LIMITS, BUDGET + 200, level_cache)
+    assert reused == 0
+
+
+def test_solve_reuse_depends_on_normalized_prices():
+    # solve 는 최대공약수로 나눈 단가로 단계를 찾으므로, 최대공약수가 바뀌는 수정은 하나도 다시 쓰지 못합니다.
+    items = [BudgetItem(f'품목{idx}', price * 10, 0, limit) for idx, (price, limit) in enumerate(zip(PRICES, LIMITS))]
+    level_cache = ResultCache(max_entries=256)
+    options = {'level_cache': level_cache, 'engines': [ENGINE_DENSE_DP]}
+    solve(BUDGET * 10, items, dict(options))
+
+    cheapest_edit = items[:-1] + [items[-1]._replace(limited_quantity=LIMITS[-1] + 1)]
+    stats = SolveStats()
+    edited = solve(BUDGET * 10, cheapest_edit, dict(options, stats=stats))
+    assert stats.counters.get('재사용한 DP 단계', 0) == 0
+
+    stats = SolveStats()
+    solve(BUDGET * 10, [items[0]._replace(limited_quantity=LIMITS[0] + 1)] + items[1:], dict(options, stats=stats))
+    assert stats.counters.get('재사용한 DP 단계', 0) == len(PRICES) - 1
+
+    gcd_edit = items[:-1] + [items[-1]._replace(price=PRICES[-1] * 10 + 5)]
+    stats = SolveStats()
+    solve(BUDGET * 10, gcd_edit, dict(options, stats=stats))
+    assert stats.counters.get('재사용한 DP 단계', 0) == 0
+    assert edited.case_count == solve(BUDGET * 10, cheapest_edit, {'engines': [ENGINE_DENSE_DP]}).case_count
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from brute_force import best_item_plans
+from budget_engine import BudgetItem, normalize_by_gcd, solve
+
+
+def test_normalize_by_gcd():
+    assert normalize_by_gcd([3000, 1500, 4500], 10_700) == (1500, [2, 1, 3], 7, 200)
+    assert normalize_by_gcd([7, 5], 30) == (1, [7, 5], 30, 0)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_solve_on_scaled_prices_matches_brute_force(seed):
+    # 단가에 공약수를 곱하고 예산에 나머지를 붙여도 원래 금액으로 푼 답과 같아야 합니다.
+    rng = random.Random(seed)
+    factor = rng.choice([10, 100, 1000])
+    items = [BudgetItem(f'물품{idx + 1}', factor * unit, base, base + extra)
+             for idx, (unit, base, extra) in enumerate(
+                 (rng.randint(1, 15), rng.randint(0, 1), rng.randint(0, 4)) for _ in range(rng.randint(1, 4)))]
+    fixed = sum(item.price * item.base_quantity for item in items)
+    budget = fixed + factor * rng.randint(0, 40) + rng.choice([0, rng.randint(1, factor - 1)])
+    best, plans = best_item_plans(budget, items)
+    solution = solve(budget, items)
+    assert solution.unit % factor == 0
+    assert solution.best_total == best
+    assert solution.leftover == budget - best
+    assert solution.exact == (best == budget)
+    assert solution.item_case_count == len(plans)
+
+
+def test_common_scale_gives_the_same_plans():
+    items = [BudgetItem('가', 7, 0, 5), BudgetItem('나', 5, 1, 6), BudgetItem('다', 3, 0, 4)]
+    scaled = [item._replace(price=item.price * 250) for item in items]
+    small, large = solve(60, items), solve(60 * 250, scaled)
+    assert (small.case_count, small.exact) == (large.case_count, large.exact)
+    assert (small.plans.head(100) == large.plans.head(100)).all()
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+import pytest
+
+from brute_force import best_plans, random_unit_problem
+from budget_engine import array_odometer_search, odometer_search, parallel_odometer_search
+from budget_engine.odometer import SEARCH_ALL, SEARCH_EXACT
+
+PROBLEMS = [problem for problem in (random_unit_problem(random.Random(seed)) for seed in range(80))
+            if len(problem[0]) >= 2]
+
+
+def closest_rows(cases_exact, cases_close, prices):
+    cases = (cases_exact or cases_close).rows
+    if not len(cases):
+        return []
+    spent = cases @ np.asarray(prices)
+    return [tuple(row) for row in cases[spent == spent.max()].tolist()]
+
+
+@pytest.mark.parametrize('search', [odometer_search, array_odometer_search])
+def test_odometer_closest_plans_match_brute_force(search):
+    for prices, limits, budget in PROBLEMS:
+        _, expected = best_plans(prices, limits, budget)
+        _, cases_exact, cases_close = search(prices, limits, budget)
+        assert closest_rows(cases_exact, cases_close, prices) == expected, (prices, limits, budget)
+
+
+def test_exact_search_mode_skips_close_plans():
+    # 단가가 모두 짝수라 홀수 예산은 정확히 맞출 수 없습니다.
+    prices, limits = [10, 6, 4], [3, 3, 3]
+    _, cases_exact, cases_close = odometer_search(prices, limits, 25, search=SEARCH_EXACT)
+    assert not cases_exact and not cases_close
+    _, cases_exact, cases_close = odometer_search(prices, limits, 25, search=SEARCH_ALL)
+    assert not cases_exact and closest_rows(cases_exact, cases_close, prices) == best_plans(prices, limits, 25)[1]
+
+
+def test_parallel_search_matches_serial():
+    # 정확한 계획이 일부 구간에만 있는 문제와, 하나도 없어 잔액이 남는 계획을 모으는 문제
+    for prices, limits, budget in [([9, 7, 5, 2], [6, 6, 6, 1], 40), ([10, 6, 4], [5, 5, 5], 33)]:
+        serial = odometer_search(prices, limits, budget)
+        parallel = parallel_odometer_search(prices, limits, budget, workers=2)
+        assert parallel[0] == serial[0]
+        assert np.array_equal(parallel[1].rows, serial[1].rows)
+        assert np.array_equal(parallel[2].rows, serial[2].rows)
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+import budget_engine.api as api
+from brute_force import best_item_plans, random_items, sorted_items
+from budget_engine import RANK_PREFERRED, RANKING_OBJECTIVES, Ranking, solve
+from budget_engine.ranking import plan_scores
+
+CASES = [(seed, objective) for seed in range(40) for objective in RANKING_OBJECTIVES]
+
+
+def ranked_case(seed, objective, price_choices, distinct=False):
+    rng = random.Random(seed)
+    items = random_items(rng, price_choices, distinct=distinct)
+    fixed = sum(item.price * item.base_quantity for item in items)
+    budget = fixed + rng.randint(1, 4000)
+    preferred = rng.randrange(len(items)) if objective == RANK_PREFERRED else None
+    return items, budget, Ranking(objective, rng.randint(1, 6), preferred)
+
+
+def check_ranked(items, budget, ranking):
+    # 순위는 품목별 실제 수량으로 매기므로, 품목 단위로 모두 나열해 고른 점수와 같아야 합니다.
+    order, ordered = sorted_items(items)
+    best, plans = best_item_plans(budget, ordered)
+    sorted_ranking = ranking._replace(
+        preferred=None if ranking.preferred is None else order.index(ranking.preferred))
+    expected = np.sort(plan_scores(plans, sorted_ranking))[:ranking.k]
+    solution = solve(budget, items, {'ranking': tuple(ranking)})
+    ranked = solution.plans.head(ranking.k + 1)
+    assert len(ranked) == len(expected)
+    assert (ranked @ np.array([item.price for item in ordered]) == best).all()
+    assert plan_scores(ranked, sorted_ranking).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('seed, objective', CASES)
+def test_ranking_with_count_tables(seed, objective):
+    check_ranked(*ranked_case(seed, objective, [100, 150, 200, 70, 90], distinct=True))
+
+
+@pytest.mark.parametrize('seed, objective', CASES)
+def test_ranking_with_duplicate_prices(seed, objective):
+    check_ranked(*ranked_case(seed, objective, [100, 100, 200, 70, 150, 70]))
+
+
+@pytest.mark.parametrize('seed, objective', CASES)
+def test_ranking_without_count_tables(seed, objective, monkeypatch):
+    # 테이블을 만들 수 없을 때는 엔진이 나열한 계획을 훑습니다.
+    monkeypatch.setattr(api, 'DENSE_DP_MAX_CELLS', 0)
+    items, budget, ranking = ranked_case(seed, objective, [100, 150, 200, 70, 90], distinct=True)
+    check_ranked(items, budget, ranking)
+
+
+@pytest.mark.parametrize('seed, objective', CASES)
+def test_ranking_without_count_tables_keeps_the_best_score(seed, objective, monkeypatch):
+    # 테이블이 없으면 묶음마다 순위 기준에 가장 유리하게 나눠 점수를 매기므로,
+    # 가장 좋은 점수는 찾지만 그 다음 순위는 묶음 단위입니다.
+    monkeypatch.setattr(api, 'DENSE_DP_MAX_CELLS', 0)
+    items, budget, ranking = ranked_case(seed, objective, [100, 100, 200, 70, 150, 70])
+    order, ordered = sorted_items(items)
+    _, plans = best_item_plans(budget, ordered)
+    sorted_ranking = ranking._replace(
+        preferred=None if ranking.preferred is None else order.index(ranking.preferred))
+    ranked = solve(budget, items, {'ranking': tuple(ranking)}).plans.head(ranking.k)
+    assert plan_scores(ranked, sorted_ranking)[0] == plan_scores(plans, sorted_ranking).min()
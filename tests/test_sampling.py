@@ -0,0 +1,70 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import budget_engine.api as api
+from brute_force import best_item_plans, best_plans, random_items, random_unit_problem, sorted_items, stream_rows
+from budget_engine import build_count_tables, solve
+from budget_engine.duplicates import group_quantities
+from budget_engine.sampling import reservoir_sample, sample_plans, sample_ranks
+
+PROBLEMS = [random_unit_problem(random.Random(seed)) for seed in range(60)]
+
+
+def test_sample_ranks_are_distinct_sorted_and_reproducible():
+    ranks = sample_ranks(10 ** 30, 50, seed=3)
+    assert ranks == sorted(set(ranks)) and len(ranks) == 50
+    assert ranks == sample_ranks(10 ** 30, 50, seed=3)
+    assert sample_ranks(5, 10, seed=1) == [0, 1, 2, 3, 4]
+    assert sample_ranks(0, 10) == []
+
+
+def test_sample_plans_are_exact_plans():
+    for prices, limits, budget in PROBLEMS:
+        best, expected = best_plans(prices, limits, budget)
+        tables = build_count_tables(prices, limits, best)
+        picked = [tuple(row) for row in sample_plans(tables, prices, limits, best, 4, seed=7).tolist()]
+        assert len(set(picked)) == len(picked) == min(4, len(expected))
+        assert set(picked) <= set(expected)
+        assert picked == sorted(picked)
+
+
+def test_sample_plans_are_uniform():
+    # 계획 12개 중 3개씩 여러 번 뽑으면 계획마다 뽑힌 횟수가 고르게 나와야 합니다.
+    prices, limits, budget = [5, 3, 2, 1], [2, 3, 3, 2], 9
+    _, expected = best_plans(prices, limits, budget)
+    tables = build_count_tables(prices, limits, budget)
+    seen = Counter()
+    for seed in range(3000):
+        seen.update(tuple(row) for row in sample_plans(tables, prices, limits, budget, 3, seed).tolist())
+    assert set(seen) == set(expected)
+    mean = 3000 * 3 / len(expected)
+    assert all(abs(count - mean) < 0.15 * mean for count in seen.values())
+
+
+def test_reservoir_sample_matches_size_and_membership():
+    plans = np.array([[idx, 0] for idx in range(100)])
+    picked = reservoir_sample([plans[:40], plans[40:]], 2, 10, seed=5)
+    assert len(picked) == len({tuple(row) for row in picked.tolist()}) == 10
+    assert picked[:, 0].tolist() == sorted(picked[:, 0].tolist())
+
+
+@pytest.mark.parametrize('max_cells', [api.DENSE_DP_MAX_CELLS, 0])
+@pytest.mark.parametrize('seed', range(30))
+def test_solve_sample_with_duplicate_prices(seed, max_cells, monkeypatch):
+    # 표본은 묶음 기준으로 뽑고 묶음마다 대표 나눔으로 보여 주므로, 묶음 합계가 서로 달라야 합니다.
+    monkeypatch.setattr(api, 'DENSE_DP_MAX_CELLS', max_cells)
+    rng = random.Random(seed)
+    items = random_items(rng, [100, 100, 250, 300, 300])
+    budget = sum(item.price * item.base_quantity for item in items) + 50 * rng.randint(1, 60)
+    _, ordered = sorted_items(items)
+    best, _ = best_item_plans(budget, ordered)
+    solution = solve(budget, items, {'sample': (5, seed)})
+    rows = stream_rows(solution.plans)
+    assert len(rows) == min(5, solution.case_count)
+    assert (rows @ np.array([item.price for item in ordered]) == best).all()
+    assert len({tuple(row) for row in group_quantities(rows, solution.groups).tolist()}) == len(rows)
+    again = stream_rows(solve(budget, items, {'sample': (5, seed)}).plans)
+    assert np.array_equal(rows, again)
@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+import pytest
+
+from brute_force import best_plans, random_items, random_unit_problem, stream_rows
+from budget_engine import ENGINE_DENSE_DP, PlanIndex, build_count_tables, solve
+
+PROBLEMS = [random_unit_problem(random.Random(seed)) for seed in range(80)]
+
+
+def test_unrank_every_rank_in_enumeration_order():
+    for prices, limits, budget in PROBLEMS:
+        best, expected = best_plans(prices, limits, budget)
+        index = PlanIndex(build_count_tables(prices, limits, best), prices, limits, best)
+        assert index.count == len(expected)
+        assert [tuple(row) for row in index.plans(range(index.count)).tolist()] == expected
+        assert index.ranks(np.array(expected)).tolist() == list(range(len(expected)))
+
+
+def test_between_clips_and_plans_rejects_out_of_range():
+    prices, limits, budget = [5, 3, 2], [3, 3, 3], 12
+    _, expected = best_plans(prices, limits, budget)
+    index = PlanIndex(build_count_tables(prices, limits, budget), prices, limits, budget)
+    assert [tuple(row) for row in index.between(-3, 2).tolist()] == expected[:2]
+    assert [tuple(row) for row in index.between(len(expected) - 1, 10 ** 9).tolist()] == expected[-1:]
+    with pytest.raises(IndexError):
+        index.plans([len(expected)])
+    with pytest.raises(ValueError):
+        index.ranks([[1, 1, 1]])
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_solution_stream_slice_and_rank(seed):
+    # 화면의 쪽 넘기기(slice)와 계획 찾기(rank)는 처음부터 나열한 순서와 같은 번호를 씁니다.
+    rng = random.Random(seed)
+    items = random_items(rng, [400, 400, 300, 200, 100, 700])
+    budget = sum(item.price * item.base_quantity for item in items) + 100 * rng.randint(1, 30)
+    solution = solve(budget, items, {'engines': [ENGINE_DENSE_DP]})
+    rows = stream_rows(solution.plans)
+    assert solution.plans.random_access
+    for begin in range(0, len(rows), 3):
+        assert np.array_equal(solution.plans.slice(begin, begin + 3), rows[begin:begin + 3])
+    assert solution.plans.rank(rows).tolist() == list(range(len(rows)))
+    # 묶음 안에서 다르게 나눠 산 계획도 묶음 합계가 같으면 같은 번호입니다.
+    moved = rows.copy()
+    for members in solution.groups.members:
+        for first, second in zip(members, members[1:]):
+            can_move = ((moved[:, first] > solution.base_quantity[first])
+                        & (moved[:, second] < solution.limited_quantity[second]))
+            moved[can_move, first] -= 1
+            moved[can_move, second] += 1
+    assert solution.plans.rank(moved).tolist() == list(range(len(rows)))